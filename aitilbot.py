@@ -1,10 +1,11 @@
 import logging
 import httpx
 import asyncio
+import uuid
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import tool_dispatch
 from gemini_function_schemas import gemini_function_schemas
+from response_templates import ChatReply, RENDER_TEMPLATE, fill_free_text
 
 AITIL_API_URL = "https://chat.aitil.kg/suroo"
 
@@ -42,16 +43,8 @@ def cast_param_value(param_name, value, func_name):
 
 async def call_mcp_tool(tool_name, **kwargs):
     try:
-        params = StdioServerParameters(
-            command="python",
-            args=["banking_mcp_server.py"],
-            env={}
-        )
-        async with stdio_client(params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(tool_name, arguments=kwargs)
-                return result.content[0].text if result.content else "Пустой ответ"
+        result = await tool_dispatch.call_tool(tool_name, kwargs)
+        return result.content[0].text if result.content else "Пустой ответ"
     except Exception as e:
         logging.exception(f"MCP tool {tool_name} failed")
         return f"{tool_name} ишке ашкан жок."
@@ -151,11 +144,14 @@ class AitilBankingChatbot:
             for k, v in call.items():
                 if k in allowed or k == "user_id":
                     filtered_call[k] = cast_param_value(k, v, func_name)
+            if func_name == "transfer_money":
+                filtered_call["idempotency_key"] = str(uuid.uuid4())
 
             print(f"[AitilBot] Вызов функции: {func_name} с параметрами: {filtered_call}")
             result = await call_mcp_tool(func_name, **filtered_call)
             print(f"[AitilBot] Ответ функции {func_name}: {result}")
-            return result
+            # Product text stays in Kyrgyz here; only the markers are dropped
+            return ChatReply(fill_free_text(result), RENDER_TEMPLATE)
         except Exception as e:
             logging.exception("handle_function_call failed")
             return "Функцияны чакырууда ката кетти."
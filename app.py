@@ -34,7 +34,10 @@ db.init_app(app)
 with app.app_context():
     # Import models to ensure tables are created
     import models
+    import transaction_rollups
+    import recipient_lookup
     db.create_all()
+    # Schema migrations and the rollup backfill are a deploy step: supporting/migrate_db.py
     
     # Initialize categories
     from supporting.categorization_service import question_categorizer
@@ -1,7 +1,12 @@
 from models import Account, Transaction, User
 from sqlalchemy import func
+from sqlalchemy.orm import aliased
 from decimal import Decimal
 from database import db
+from transaction_rollups import period_sum, to_decimal
+import transfer_engine
+from recipient_lookup import find_recipient, recent_recipients, recent_recipients_cache
+from response_templates import render, transaction_type
 import pytz
 
 
@@ -15,100 +20,110 @@ def format_local_time(dt):
         dt = dt.astimezone(pytz.utc)
     return dt.astimezone(LOCAL_TZ).strftime('%Y-%m-%d %H:%M')
 
-def get_balance(user):
-    accounts = Account.query.filter_by(user_id=user.id).all()
-    if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
-    total = sum([float(a.balance) for a in accounts])
-    return total, f"Сиздин бардык эсептериңиздеги жалпы сумма: {total:.2f} сом."
-
-def get_transactions(user, limit=5):
-    account_types_kg = {
-        'savings': 'Жинак',
-        'checking': 'Агымдагы',
-    }
-    tx_types_kg = {
-        'deposit': 'Толуктоо',
-        'withdrawal': 'Чыгым',
-        'transfer': 'Которуу',
-    }
+def transactions_with_counterparties(*criteria):
+    """
+    Transactions joined to the sender's and recipient's names in one query.
+    Rows are (Transaction, sender name, recipient name); a name is None when
+    that side has no account or user.
+    """
+    from_acc, to_acc = aliased(Account), aliased(Account)
+    from_user, to_user = aliased(User), aliased(User)
+    return db.session.query(Transaction, from_user.name, to_user.name) \
+        .outerjoin(from_acc, Transaction.account_from_id == from_acc.id) \
+        .outerjoin(from_user, from_acc.user_id == from_user.id) \
+        .outerjoin(to_acc, Transaction.account_to_id == to_acc.id) \
+        .outerjoin(to_user, to_acc.user_id == to_user.id) \
+        .filter(*criteria)
+
+def transaction_direction(t, acc_ids, sender, recipient, language="ky"):
+    if t.account_from_id in acc_ids and t.account_to_id:
+        return f"-> {recipient or render('unknown', language)}"
+    if t.account_to_id in acc_ids and t.account_from_id:
+        return f"<- {sender or render('unknown', language)}"
+    return ""
+
+def get_balance(user, language="ky"):
+    count, total = db.session.query(func.count(Account.id), func.sum(Account.balance)) \
+        .filter(Account.user_id == user.id).one()
+    if not count:
+        return None, render("no_account", language)
+    total = to_decimal(total)
+    return total, render("balance_total", language, total=total)
+
+def get_transactions(user, limit=5, language="ky"):
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     acc_ids = [a.id for a in accounts]
-    txs = Transaction.query.filter(
+    rows = transactions_with_counterparties(
         (Transaction.account_from_id.in_(acc_ids)) | (Transaction.account_to_id.in_(acc_ids))
     ).order_by(Transaction.timestamp.desc()).limit(limit).all()
-    if not txs:
-        return [], "Акыркы транзакциялар табылган жок."
+    if not rows:
+        return [], render("no_recent_transactions", language)
     resp = []
-    for t in txs:
-        tx_type = tx_types_kg.get(t.type, t.type)
-        if t.account_from_id in acc_ids and t.account_to_id:
-            to_acc = Account.query.get(t.account_to_id)
-            to_user = User.query.get(to_acc.user_id) if to_acc else None
-            direction = f"-> {to_user.name}" if to_user else "-> белгисиз"
-        elif t.account_to_id in acc_ids and t.account_from_id:
-            from_acc = Account.query.get(t.account_from_id)
-            from_user = User.query.get(from_acc.user_id) if from_acc else None
-            direction = f"<- {from_user.name}" if from_user else "<- белгисиз"
-        else:
-            direction = ""
+    for t, sender, recipient in rows:
         resp.append({
-            'type': tx_type,
+            'type': transaction_type(t.type, language),
             'amount': float(t.amount),
-            'direction': direction,
+            'direction': transaction_direction(t, acc_ids, sender, recipient, language),
             'timestamp': format_local_time(t.timestamp),
         })
     return resp, None
 
-def get_last_incoming_transaction(user):
+def get_last_incoming_transaction(user, language="ky"):
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     acc_ids = [a.id for a in accounts]
-    tx = Transaction.query.filter(
+    row = transactions_with_counterparties(
         Transaction.account_to_id.in_(acc_ids)
     ).order_by(Transaction.timestamp.desc()).first()
-    if not tx:
-        return None, "Сизге акыркы убакта акча которулган эмес."
-    from_acc = Account.query.get(tx.account_from_id)
-    from_user = User.query.get(from_acc.user_id) if from_acc else None
-    sender = from_user.name if from_user else "белгисиз"
-    return None, f"Сизге акыркы акчаны {sender} {float(tx.amount):.2f} сом которгон ({format_local_time(tx.timestamp)})."
-
-
-def transfer_money(user, to_name, amount=0):
-    users = User.query.all()
-    
-    to_user = User.query.filter(func.trim(User.name) == to_name.strip()).first()
+    if not row:
+        return None, render("no_incoming", language)
+    tx, sender, _ = row
+    incoming = {
+        'sender': sender or render("unknown", language),
+        'amount': float(tx.amount),
+        'timestamp': format_local_time(tx.timestamp),
+    }
+    return incoming, render("last_incoming", language, **incoming)
+
+
+def transfer_money(user, to_name, amount=0, idempotency_key=None, language="ky"):
+    previous = transfer_engine.previous_result(user.id, idempotency_key)
+    if previous is not None:
+        return True, previous
+    to_user = find_recipient(user, to_name)
     if not to_user:
-        return False, f"{to_name} аттуу колдонуучу табылган жок."
-    if not amount:
-        return False, "Акча которуу суммасын көрсөтүңүз."
+        return False, render("recipient_not_found", language, name=to_name)
+    if not amount or amount <= 0:
+        return False, render("amount_required", language)
     if user.id == to_user.id:
-        return False, "Сиз өзүңүзгө которо албайсыз."
-    from_acc = Account.query.filter_by(user_id=user.id).first()
-    to_acc = Account.query.filter_by(user_id=to_user.id).first()
+        return False, render("self_transfer", language)
+    from_acc = Account.query.filter_by(user_id=user.id).order_by(Account.id).first()
+    to_acc = Account.query.filter_by(user_id=to_user.id).order_by(Account.id).first()
     if not from_acc or not to_acc:
-        return False, "Эсептер табылган жок."
-    if from_acc.balance < amount:
-        return False, "Сиздин эсебиңизде жетиштүү каражат жок."
+        return False, render("accounts_not_found", language)
     amount = Decimal(str(amount))
-    from_acc.balance -= amount
-    to_acc.balance += amount
-    tx = Transaction(account_from_id=from_acc.id, account_to_id=to_acc.id, type="Которуу", amount=amount, description=f"{user.name} -> {to_user.name}")
-    db.session.add(tx)
-    db.session.commit()
-    return True, f"{amount:.2f} сом {to_user.name} аттуу адамга ийгиликтүү которулду!"
-
-def get_accounts_info(user):
+    message = render("transfer_done", language, amount=amount, name=to_user.name)
+    try:
+        transfer_engine.transfer(from_acc.id, to_acc.id, amount, user_id=user.id,
+                                 description=f"{user.name} -> {to_user.name}",
+                                 message=message, idempotency_key=idempotency_key)
+    except transfer_engine.TransferError as e:
+        return False, render(e.key, language)
+    except transfer_engine.DuplicateTransfer:
+        return True, transfer_engine.previous_result(user.id, idempotency_key)
+    recent_recipients_cache.remember(user.id, to_user)
+    return True, message
+
+def get_accounts_info(user, language="ky"):
     """
     Колдонуучунун бардык эсептеринин тизмеси жана балансы.
     """
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     resp = []
     for acc in accounts:
         resp.append({
@@ -118,86 +133,60 @@ def get_accounts_info(user):
     return resp, None
 
 
-def get_incoming_sum_for_period(user, start_date, end_date):
+def get_incoming_sum_for_period(user, start_date, end_date, language="ky"):
     """
     Көрсөтүлгөн аралыкта кирген которуулар (входящие) жалпы суммасы.
     start_date, end_date — строки 'YYYY-MM-DD' формата
     """
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     acc_ids = [a.id for a in accounts]
-    txs = Transaction.query.filter(
-        Transaction.account_to_id.in_(acc_ids),
-        Transaction.timestamp >= start_date,
-        Transaction.timestamp <= end_date
-    ).all()
-    total = sum([float(t.amount) for t in txs])
-    return total, f"{start_date} - {end_date} аралыгында кирген которуулар: {total:.2f} сом."
+    total, _ = period_sum(user, acc_ids, "incoming", start_date, end_date)
+    return total, render("incoming_for_period", language, start=start_date, end=end_date, total=total)
 
 
-def get_outgoing_sum_for_period(user, start_date, end_date):
+def get_outgoing_sum_for_period(user, start_date, end_date, language="ky"):
     """
     Көрсөтүлгөн аралыкта чыккан которуулар (исходящие) жалпы суммасы.
     start_date, end_date — строки 'YYYY-MM-DD' формата
     """
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     acc_ids = [a.id for a in accounts]
-    txs = Transaction.query.filter(
-        Transaction.account_from_id.in_(acc_ids),
-        Transaction.timestamp >= start_date,
-        Transaction.timestamp <= end_date
-    ).all()
-    total = sum([float(t.amount) for t in txs])
-    return total, f"{start_date} - {end_date} аралыгында чыккан которуулар: {total:.2f} сом."
+    total, _ = period_sum(user, acc_ids, "outgoing", start_date, end_date)
+    return total, render("outgoing_for_period", language, start=start_date, end=end_date, total=total)
 
 
-def get_last_3_transfer_recipients(user):
+def get_last_3_transfer_recipients(user, language="ky"):
     """
     Акыркы 3 которуунун алуучуларынын тизмеси.
     """
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     acc_ids = [a.id for a in accounts]
-    txs = Transaction.query.filter(
-        Transaction.account_from_id.in_(acc_ids),
-        Transaction.type == 'Которуу'
-    ).order_by(Transaction.timestamp.desc()).limit(3).all()
-    recipients = []
-    for t in txs:
-        to_acc = Account.query.get(t.account_to_id)
-        to_user = User.query.get(to_acc.user_id) if to_acc else None
-        recipients.append(to_user.name if to_user else "белгисиз")
+    recipients = [name or render("unknown", language) for _, name in recent_recipients(acc_ids, limit=3)]
     return recipients, None
 
 
-def get_largest_transaction(user):
+def get_largest_transaction(user, language="ky"):
     """
     Эң чоң транзакция (суммасы боюнча) жана анын багыты.
     """
     accounts = Account.query.filter_by(user_id=user.id).all()
     if not accounts:
-        return None, "Сиздин банк эсебиңиз табылган жок."
+        return None, render("no_account", language)
     acc_ids = [a.id for a in accounts]
-    tx = Transaction.query.filter(
+    row = transactions_with_counterparties(
         (Transaction.account_from_id.in_(acc_ids)) | (Transaction.account_to_id.in_(acc_ids))
     ).order_by(Transaction.amount.desc()).first()
-    if not tx:
-        return None, "Транзакциялар табылган жок."
-    direction = ""
-    if tx.account_from_id in acc_ids and tx.account_to_id:
-        to_acc = Account.query.get(tx.account_to_id)
-        to_user = User.query.get(to_acc.user_id) if to_acc else None
-        direction = f"-> {to_user.name}" if to_user else "-> белгисиз"
-    elif tx.account_to_id in acc_ids and tx.account_from_id:
-        from_acc = Account.query.get(tx.account_from_id)
-        from_user = User.query.get(from_acc.user_id) if from_acc else None
-        direction = f"<- {from_user.name}" if from_user else "<- белгисиз"
+    if not row:
+        return None, render("no_transactions", language)
+    tx, sender, recipient = row
     return {
         'amount': float(tx.amount),
-        'direction': direction,
+        'direction': transaction_direction(tx, acc_ids, sender, recipient, language),
         'timestamp': format_local_time(tx.timestamp)
     }, None
@@ -19,11 +19,13 @@ from demir_functions import (
     list_all_deposit_names, get_deposit_details, compare_deposits, get_deposits_by_currency,
     get_deposits_by_term_range, get_deposits_by_min_amount, get_deposits_by_rate_range,
     get_deposits_with_replenishment, get_deposits_with_capitalization, get_deposits_by_withdrawal_type,
-    get_deposit_recommendations, get_government_securities, get_child_deposits, get_online_deposits
+    get_deposit_recommendations, get_government_securities, get_child_deposits, get_online_deposits,
+    search_faq
 )
 
 from models import User
 from app import app
+from response_templates import render, label, free_text, account_type
 import json
 import logging
 
@@ -36,13 +38,13 @@ server = FastMCP("banking-mcp-server")
     name="get_balance",
     description="Колдонуучунун бардык эсептериндеги жалпы балансты алуу."
 )
-async def get_balance_tool(user_id: int):
+async def get_balance_tool(user_id: int, language: str = "ky"):
     """Get user's total balance across all accounts"""
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        _, result = get_balance(user)
+            return render("user_not_found", language)
+        _, result = get_balance(user, language=language)
         return result
 
 # Tool: Get transactions (limit as function argument)
@@ -50,18 +52,18 @@ async def get_balance_tool(user_id: int):
     name="get_transactions",
     description="Колдонуучунун акыркы транзакцияларынын тизмесин алуу (5ке чейин)."
 )
-async def get_transactions_tool(user_id: int, limit: int = 5):
+async def get_transactions_tool(user_id: int, limit: int = 5, language: str = "ky"):
     """Get user's recent transactions"""
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        txs, err = get_transactions(user, limit=limit)
+            return render("user_not_found", language)
+        txs, err = get_transactions(user, limit=limit, language=language)
         if err:
             return err
-        resp = "Акыркы транзакциялар:\n"
+        resp = render("recent_transactions", language) + "\n"
         for t in txs:
-            resp += f"- {t['type']}: {t['amount']:.2f} сом {t['direction']}, {t['timestamp']}\n"
+            resp += render("transaction_line", language, **t) + "\n"
         return resp
 
 # Tool: Transfer money (params from function signature)
@@ -69,13 +71,14 @@ async def get_transactions_tool(user_id: int, limit: int = 5):
     name="transfer_money",
     description="Башка колдонуучуга аты боюнча акча которуу."
 )
-async def transfer_money_tool(user_id: int, to_name: str, amount: float = 0):
-    """Transfer money to another user by name"""
+async def transfer_money_tool(user_id: int, to_name: str, amount: float = 0, idempotency_key: str = None,
+                              language: str = "ky"):
+    """Transfer money to another user by name; a repeated idempotency_key returns the first result"""
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        ok, result = transfer_money(user, to_name, amount)
+            return render("user_not_found", language)
+        ok, result = transfer_money(user, to_name, amount, idempotency_key=idempotency_key, language=language)
         return result
 
 # Tool: Get last incoming transaction
@@ -83,13 +86,13 @@ async def transfer_money_tool(user_id: int, to_name: str, amount: float = 0):
     name="get_last_incoming_transaction",
     description="Акыркы кирген транзакция тууралуу маалымат алуу (ким акча которду жана канча)."
 )
-async def get_last_incoming_transaction_tool(user_id: int):
+async def get_last_incoming_transaction_tool(user_id: int, language: str = "ky"):
     """Get information about the last incoming transaction"""
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        _, result = get_last_incoming_transaction(user)
+            return render("user_not_found", language)
+        _, result = get_last_incoming_transaction(user, language=language)
         return result
 
 # Tool: Get accounts info
@@ -97,17 +100,18 @@ async def get_last_incoming_transaction_tool(user_id: int):
     name="get_accounts_info",
     description="Колдонуучунун бардык эсептеринин тизмеси жана балансы."
 )
-async def get_accounts_info_tool(user_id: int):
+async def get_accounts_info_tool(user_id: int, language: str = "ky"):
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        accounts, err = get_accounts_info(user)
+            return render("user_not_found", language)
+        accounts, err = get_accounts_info(user, language=language)
         if err:
             return err
-        resp = "Сиздин эсептериңиз:\n"
+        resp = render("your_accounts", language) + "\n"
         for acc in accounts:
-            resp += f"- {acc['account_type']}: {acc['balance']:.2f} сом\n"
+            resp += render("account_line", language, account_type=account_type(acc['account_type'], language),
+                           balance=acc['balance']) + "\n"
         return resp
 
 # Tool: Get incoming sum for period
@@ -115,12 +119,12 @@ async def get_accounts_info_tool(user_id: int):
     name="get_incoming_sum_for_period",
     description="Көрсөтүлгөн аралыкта кирген которуулар (входящие) жалпы суммасы."
 )
-async def get_incoming_sum_for_period_tool(user_id: int, start_date: str, end_date: str):
+async def get_incoming_sum_for_period_tool(user_id: int, start_date: str, end_date: str, language: str = "ky"):
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        total, msg = get_incoming_sum_for_period(user, start_date, end_date)
+            return render("user_not_found", language)
+        total, msg = get_incoming_sum_for_period(user, start_date, end_date, language=language)
         return msg
 
 # Tool: Get outgoing sum for period
@@ -128,12 +132,12 @@ async def get_incoming_sum_for_period_tool(user_id: int, start_date: str, end_da
     name="get_outgoing_sum_for_period",
     description="Көрсөтүлгөн аралыкта чыккан которуулар (исходящие) жалпы суммасы."
 )
-async def get_outgoing_sum_for_period_tool(user_id: int, start_date: str, end_date: str):
+async def get_outgoing_sum_for_period_tool(user_id: int, start_date: str, end_date: str, language: str = "ky"):
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        total, msg = get_outgoing_sum_for_period(user, start_date, end_date)
+            return render("user_not_found", language)
+        total, msg = get_outgoing_sum_for_period(user, start_date, end_date, language=language)
         return msg
 
 # Tool: Get last 3 transfer recipients
@@ -141,17 +145,17 @@ async def get_outgoing_sum_for_period_tool(user_id: int, start_date: str, end_da
     name="get_last_3_transfer_recipients",
     description="Акыркы 3 которуунун алуучуларынын тизмеси."
 )
-async def get_last_3_transfer_recipients_tool(user_id: int):
+async def get_last_3_transfer_recipients_tool(user_id: int, language: str = "ky"):
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        recipients, err = get_last_3_transfer_recipients(user)
+            return render("user_not_found", language)
+        recipients, err = get_last_3_transfer_recipients(user, language=language)
         if err:
             return err
         if not recipients:
-            return "Акыркы алуучулар табылган жок."
-        resp = "Акыркы 3 алуучу:\n"
+            return render("no_recent_recipients", language)
+        resp = render("last_3_recipients", language) + "\n"
         for name in recipients:
             resp += f"- {name}\n"
         return resp
@@ -161,49 +165,49 @@ async def get_last_3_transfer_recipients_tool(user_id: int):
     name="get_largest_transaction",
     description="Эң чоң транзакция (суммасы боюнча) жана анын багыты."
 )
-async def get_largest_transaction_tool(user_id: int):
+async def get_largest_transaction_tool(user_id: int, language: str = "ky"):
     with app.app_context():
         user = User.query.get(user_id)
         if not user:
-            return "Колдонуучу табылган жок."
-        tx, err = get_largest_transaction(user)
+            return render("user_not_found", language)
+        tx, err = get_largest_transaction(user, language=language)
         if err:
             return err
-        return f"Эң чоң транзакция: {tx['amount']:.2f} сом {tx['direction']}, {tx['timestamp']}"
+        return render("largest_transaction", language, **tx)
 
 @server.tool(
     name="list_all_card_names",
     description="DemirBank'тагы бардык карталардын тизмесин кайтарат"
 )
-async def list_all_card_names_tool():
+async def list_all_card_names_tool(language: str = "ky"):
     result = list_all_card_names()
     result_text = ""
     for card in result:
-        result_text += f"Карта аты: {card['name']}\n"
+        result_text += render("card_name_line", language, name=card['name']) + "\n"
     return result_text
 
 @server.tool(
     name="get_card_details",
     description="Карта аталышы боюнча бардык негизги маалыматты кайтарат (валюта, мөөнөтү, чыгымдар, лимиттер, сүрөттөмө)."
 )
-async def get_card_details_tool(card_name: str):
+async def get_card_details_tool(card_name: str, language: str = "ky"):
     result = get_card_details(card_name)
     result_text = ""
     for key, value in result.items():
         if key == "error":
-            return result["error"]
-        result_text += f"{key}: {value}\n"
+            return free_text(result["error"], language)
+        result_text += f"{key}: {free_text(value, language)}\n"
     return result_text
 
 @server.tool(
     name="compare_cards",
     description="Карталарды негизги параметрлер боюнча салыштырат. Аргумент катары карталардын аттарынын тизмеси берилет (2-4 карта)."
 )
-async def compare_cards_tool(card_names: list):
+async def compare_cards_tool(card_names: list, language: str = "ky"):
     cards = compare_cards(card_names)
     
     if len(cards) < 2:
-        return "Карта салыштыруу үчүн эң азы 2 карта керек."
+        return render("compare_cards_need_two", language)
     
     # Бардык карталардан бардык уникалдуу ачкычтарды алуу
     all_keys = set()
@@ -212,7 +216,7 @@ async def compare_cards_tool(card_names: list):
     all_keys = list(all_keys)
     
     # Карталардын тизмеси
-    result_text = "📋 Салыштырылган карталар:\n"
+    result_text = render("compared_cards", language) + "\n"
     for i, card in enumerate(cards, 1):
         result_text += f"{i}. {card['name']}\n"
     result_text += "\n"
@@ -227,7 +231,7 @@ async def compare_cards_tool(card_names: list):
             
         values = []
         for card in cards:
-            value = card.get(key, "белгисиз")
+            value = card.get(key, render("unknown", language))
             if isinstance(value, list):
                 value = ", ".join(value)
             elif isinstance(value, dict):
@@ -247,20 +251,20 @@ async def compare_cards_tool(card_names: list):
         else:
             diff_info = []
             for i, (card, value) in enumerate(zip(cards, values), 1):
-                diff_info.append(f"{card['name']}: {value}")
+                diff_info.append(f"{card['name']}: {free_text(value, language)}")
             differences.append((key, diff_info))
     
     # Окшоштуктар бөлүмү
-    result_text += "✅ Окшоштуктары:\n"
+    result_text += render("similarities", language) + "\n"
     if similarities:
         for key, value in similarities:
             key_name = key.replace('_', ' ').title()
-            result_text += f"• {key_name}: {value}\n"
+            result_text += f"• {key_name}: {free_text(value, language)}\n"
     else:
-        result_text += "• Жок\n"
+        result_text += f"• {render('none', language)}\n"
         
     # Айырмачылыктар бөлүмү
-    result_text += "⚖️ Айырмачылыктары:\n"
+    result_text += render("differences", language) + "\n"
     if differences:
         for key, diff_info in differences:
             key_name = key.replace('_', ' ').title()
@@ -268,7 +272,7 @@ async def compare_cards_tool(card_names: list):
             for info in diff_info:
                 result_text += f"  - {info}\n"
     else:
-        result_text += "• Жок\n"
+        result_text += f"• {render('none', language)}\n"
     
     return result_text
 
@@ -276,28 +280,28 @@ async def compare_cards_tool(card_names: list):
     name="get_card_limits",
     description="Карта аталышы боюнча лимиттерди кайтарат (ATM, POS, контактсыз ж.б.)."
 )
-async def get_card_limits_tool(card_name: str):
+async def get_card_limits_tool(card_name: str, language: str = "ky"):
     result = get_card_limits(card_name)
     if "error" in result:
-        return result["error"]
+        return free_text(result["error"], language)
     
-    return json.dumps(result, ensure_ascii=False, indent=2)
+    return free_text(json.dumps(result, ensure_ascii=False, indent=2), language)
 
 @server.tool(
     name="get_card_benefits",
     description="Карта аталышы боюнча артыкчылыктарды жана өзгөчөлүктөрдү кайтарат."
 )
-async def get_card_benefits_tool(card_name: str):
+async def get_card_benefits_tool(card_name: str, language: str = "ky"):
     result = get_card_benefits(card_name)
-    return json.dumps(result, ensure_ascii=False, indent=2)
+    return free_text(json.dumps(result, ensure_ascii=False, indent=2), language)
 
 @server.tool(
     name="get_cards_by_type",
     description="Карталарды түрү боюнча фильтрлейт (дебеттик/кредиттик)."
 )
-async def get_cards_by_type_tool(card_type: str):
+async def get_cards_by_type_tool(card_type: str, language: str = "ky"):
     result = get_cards_by_type(card_type)
-    result_text = f"📋 {card_type.title()} карталары:\n\n"
+    result_text = render("cards_of_kind", language, kind=card_type.title()) + "\n\n"
     for card in result:
         result_text += f"• {card['name']}\n"
     return result_text
@@ -306,9 +310,9 @@ async def get_cards_by_type_tool(card_type: str):
     name="get_cards_by_payment_system",
     description="Карталарды төлөм системасы боюнча фильтрлейт (Visa/Mastercard)."
 )
-async def get_cards_by_payment_system_tool(system: str):
+async def get_cards_by_payment_system_tool(system: str, language: str = "ky"):
     result = get_cards_by_payment_system(system)
-    result_text = f"📋 {system.title()} карталары:\n\n"
+    result_text = render("cards_of_kind", language, kind=system.title()) + "\n\n"
     for card in result:
         result_text += f"• {card['name']}\n"
     return result_text
@@ -317,11 +321,12 @@ async def get_cards_by_payment_system_tool(system: str):
     name="get_cards_by_fee_range",
     description="Карталарды жылдык акы диапазону боюнча фильтрлейт."
 )
-async def get_cards_by_fee_range_tool(min_fee: str = None, max_fee: str = None):
+async def get_cards_by_fee_range_tool(min_fee: str = None, max_fee: str = None, language: str = "ky"):
     result = get_cards_by_fee_range(min_fee, max_fee)
-    result_text = "📋 Карталар:\n\n"
+    result_text = render("cards", language) + "\n\n"
     for card in result:
-        fee = card.get("annual_fee", "белгисиз")
+        fee = card.get("annual_fee")
+        fee = free_text(fee, language) if fee is not None else render("unknown", language)
         result_text += f"• {card['name']}: {fee}\n"
     return result_text
 
@@ -329,9 +334,9 @@ async def get_cards_by_fee_range_tool(min_fee: str = None, max_fee: str = None):
     name="get_cards_by_currency",
     description="Карталарды валюта боюнча фильтрлейт (KGS, USD, EUR)."
 )
-async def get_cards_by_currency_tool(currency: str):
+async def get_cards_by_currency_tool(currency: str, language: str = "ky"):
     result = get_cards_by_currency(currency)
-    result_text = f"📋 {currency.upper()} валютасын колдогон карталар:\n\n"
+    result_text = render("cards_in_currency", language, currency=currency.upper()) + "\n\n"
     for card in result:
         result_text += f"• {card['name']}\n"
     return result_text
@@ -340,51 +345,51 @@ async def get_cards_by_currency_tool(currency: str):
     name="get_card_instructions",
     description="Картанын колдонуу көрсөтмөлөрүн кайтарат (Card Plus, Virtual Card үчүн)."
 )
-async def get_card_instructions_tool(card_name: str):
+async def get_card_instructions_tool(card_name: str, language: str = "ky"):
     result = get_card_instructions(card_name)
     if "error" in result:
-        return result["error"]
+        return free_text(result["error"], language)
     
-    result_text = f"📖 {card_name} картасынын көрсөтмөлөрү:\n\n"
+    result_text = render("card_instructions", language, card=card_name) + "\n\n"
     for key, value in result.items():
         if isinstance(value, dict):
             result_text += f"🔹 {key.title()}:\n"
             for sub_key, sub_value in value.items():
-                result_text += f"  • {sub_key}: {sub_value}\n"
+                result_text += f"  • {free_text(sub_key, language)}: {free_text(sub_value, language)}\n"
         elif isinstance(value, list):
             result_text += f"🔹 {key.title()}:\n"
             for item in value:
-                result_text += f"  • {item}\n"
+                result_text += f"  • {free_text(item, language)}\n"
         else:
-            result_text += f"🔹 {key.title()}: {value}\n"
+            result_text += f"🔹 {key.title()}: {free_text(value, language)}\n"
     return result_text
 
 @server.tool(
     name="get_card_conditions",
     description="Картанын шарттарын жана талаптарын кайтарат (Elkart үчүн)."
 )
-async def get_card_conditions_tool(card_name: str):
+async def get_card_conditions_tool(card_name: str, language: str = "ky"):
     result = get_card_conditions(card_name)
     if "error" in result:
-        return result["error"]
+        return free_text(result["error"], language)
     
-    result_text = f"📋 {card_name} картасынын шарттары:\n\n"
+    result_text = render("card_conditions", language, card=card_name) + "\n\n"
     for key, value in result.items():
         if isinstance(value, dict):
-            result_text += f"🔹 {key.title()}:\n"
+            result_text += f"🔹 {free_text(key.title(), language)}:\n"
             for sub_key, sub_value in value.items():
-                result_text += f"  • {sub_key}: {sub_value}\n"
+                result_text += f"  • {free_text(sub_key, language)}: {free_text(sub_value, language)}\n"
         else:
-            result_text += f"🔹 {key.title()}: {value}\n"
+            result_text += f"🔹 {free_text(key.title(), language)}: {free_text(value, language)}\n"
     return result_text
 
 @server.tool(
     name="get_cards_with_features",
     description="Белгилүү өзгөчөлүктөргө ээ карталарды табат."
 )
-async def get_cards_with_features_tool(features: list):
+async def get_cards_with_features_tool(features: list, language: str = "ky"):
     result = get_cards_with_features(features)
-    result_text = f"📋 '{', '.join(features)}' өзгөчөлүктөрү бар карталар:\n\n"
+    result_text = render("cards_with_features", language, features=', '.join(features)) + "\n\n"
     for card in result:
         result_text += f"• {card['name']}\n"
     return result_text
@@ -393,17 +398,18 @@ async def get_cards_with_features_tool(features: list):
     name="get_card_recommendations",
     description="Критерийлерге ылайык карта сунуштарын кайтарат."
 )
-async def get_card_recommendations_tool(criteria: dict):
+async def get_card_recommendations_tool(criteria: dict, language: str = "ky"):
     result = get_card_recommendations(criteria)
-    result_text = "🎯 Карта сунуштары:\n\n"
-    for i, card in enumerate(result, 1):
-        score = card.get("recommendation_score", 0)
-        fee = card.get("annual_fee", "белгисиз")
-        result_text += f"{i}. {card['name']} (упай: {score})\n"
-        result_text += f"   Жылдык акы: {fee}\n"
+    result_text = render("card_recommendations", language) + "\n\n"
+    for i, view in enumerate(result, 1):
+        card, score = view.product, view.score
+        fee = card.get("annual_fee")
+        fee = free_text(fee, language) if fee is not None else render("unknown", language)
+        result_text += f"{i}. {card['name']} ({label('score', language)}: {score})\n"
+        result_text += f"   {label('annual_fee', language)}: {fee}\n"
         if "descr" in card:
             descr = card["descr"][:100] + "..." if len(card["descr"]) > 100 else card["descr"]
-            result_text += f"   Сүрөттөмө: {descr}\n"
+            result_text += f"   {label('description', language)}: {free_text(descr, language)}\n"
         result_text += "\n"
     return result_text
 
@@ -411,61 +417,67 @@ async def get_card_recommendations_tool(criteria: dict):
     name="get_bank_info",
     description="Банк тууралуу негизги маалыматты кайтарат (аты, негизделген жылы, лицензия)."
 )
-async def get_bank_info_tool():
+async def get_bank_info_tool(language: str = "ky"):
     result = get_bank_info()
     result_text = f"🏦 {result['bank_name']}\n\n"
-    result_text += f"📅 Негизделген: {result['founded']}\n"
-    result_text += f"📜 Лицензия: {result['license']}\n"
-    result_text += f"📝 Сүрөттөмө: {result['descr']}\n"
+    result_text += f"📅 {label('founded', language)}: {result['founded']}\n"
+    result_text += f"📜 {label('license', language)}: {free_text(result['license'], language)}\n"
+    result_text += f"📝 {label('description', language)}: {free_text(result['descr'], language)}\n"
     return result_text
 
 @server.tool(
     name="get_bank_mission",
     description="Банктын миссиясын жана тарыхын кайтарат."
 )
-async def get_bank_mission_tool():
+async def get_bank_mission_tool(language: str = "ky"):
     mission = get_bank_mission()
-    result_text = "🎯 Банктын миссиясы:\n\n"
-    result_text += mission
+    result_text = render("bank_mission", language) + "\n\n"
+    result_text += free_text(mission, language)
     return result_text
 
 @server.tool(
     name="get_bank_values",
     description="Банктын баалуулуктарын жана принциптерин кайтарат."
 )
-async def get_bank_values_tool():
+async def get_bank_values_tool(language: str = "ky"):
     values = get_bank_values()
-    result_text = "💎 Банктын баалуулуктары:\n\n"
+    result_text = render("bank_values", language) + "\n\n"
     for i, value in enumerate(values, 1):
-        result_text += f"{i}. {value}\n"
+        result_text += f"{i}. {free_text(value, language)}\n"
     return result_text
 
+def _about_value(data, key, language, default=None):
+    value = data.get(key)
+    if value is None:
+        return render("unknown", language) if default is None else default
+    return free_text(value, language)
+
 @server.tool(
     name="get_ownership_info",
     description="Банктын ээлик маалыматтарын кайтарат."
 )
-async def get_ownership_info_tool():
+async def get_ownership_info_tool(language: str = "ky"):
     ownership = get_ownership_info()
-    result_text = "👥 Ээлик маалыматтары:\n\n"
-    result_text += f"🔹 Негизги акционер: {ownership.get('main_shareholder', 'белгисиз')}\n"
-    result_text += f"🔹 Өлкө: {ownership.get('country', 'белгисиз')}\n"
-    result_text += f"🔹 Ээлик пайы: {ownership.get('ownership_percentage', 'белгисиз')}\n"
+    result_text = render("ownership_info", language) + "\n\n"
+    result_text += f"🔹 {label('main_shareholder', language)}: {_about_value(ownership, 'main_shareholder', language)}\n"
+    result_text += f"🔹 {label('country', language)}: {_about_value(ownership, 'country', language)}\n"
+    result_text += f"🔹 {label('ownership_share', language)}: {_about_value(ownership, 'ownership_percentage', language)}\n"
     return result_text
 
 @server.tool(
     name="get_branch_network",
     description="Банктын филиалдар тармагын кайтарат."
 )
-async def get_branch_network_tool():
+async def get_branch_network_tool(language: str = "ky"):
     branches = get_branch_network()
-    result_text = "🏢 Филиалдар тармагы:\n\n"
-    result_text += f"🏛️ Башкы кеңсе: {branches.get('head_office', 'белгисиз')}\n\n"
+    result_text = render("branch_network", language) + "\n\n"
+    result_text += f"🏛️ {label('head_office', language)}: {_about_value(branches, 'head_office', language)}\n\n"
     
     regions = branches.get('regions', [])
     if regions:
-        result_text += "📍 Аймактык филиалдар:\n"
+        result_text += f"📍 {label('regional_branches', language)}:\n"
         for i, region in enumerate(regions, 1):
-            result_text += f"{i}. {region}\n"
+            result_text += f"{i}. {free_text(region, language)}\n"
     
     return result_text
 
@@ -473,61 +485,62 @@ async def get_branch_network_tool():
     name="get_contact_info",
     description="Банктын байланыш маалыматтарын кайтарат."
 )
-async def get_contact_info_tool():
+async def get_contact_info_tool(language: str = "ky"):
     contact = get_contact_info()
-    result_text = "📞 Байланыш маалыматтары:\n\n"
-    result_text += f"📱 Телефон: {contact.get('phone', 'белгисиз')}\n"
-    result_text += f"📧 Электрондук почта: {contact.get('email', 'белгисиз')}\n"
-    result_text += f"📍 Дарек: {contact.get('address', 'белгисиз')}\n"
+    unknown = render("unknown", language)
+    result_text = render("contact_info", language) + "\n\n"
+    result_text += f"📱 {label('phone', language)}: {contact.get('phone', unknown)}\n"
+    result_text += f"📧 {label('email', language)}: {contact.get('email', unknown)}\n"
+    result_text += f"📍 {label('address', language)}: {_about_value(contact, 'address', language)}\n"
     return result_text
 
 @server.tool(
     name="get_complete_about_us",
     description="Банк тууралуу толук маалыматты кайтарат."
 )
-async def get_complete_about_us_tool():
+async def get_complete_about_us_tool(language: str = "ky"):
     data = get_complete_about_us()
     result_text = f"🏦 {data.get('bank_name', 'DemirBank')}\n\n"
     
     # Mission
-    result_text += "🎯 Миссия:\n"
-    result_text += f"{data.get('mission', '')}\n\n"
+    result_text += render("section_mission", language) + "\n"
+    result_text += f"{_about_value(data, 'mission', language, '')}\n\n"
     
     # Values
     values = data.get('values', [])
     if values:
-        result_text += "💎 Баалуулуктар:\n"
+        result_text += render("section_values", language) + "\n"
         for i, value in enumerate(values, 1):
-            result_text += f"{i}. {value}\n"
+            result_text += f"{i}. {free_text(value, language)}\n"
         result_text += "\n"
     
     # Ownership
     ownership = data.get('ownership', {})
     if ownership:
-        result_text += "👥 Ээлик:\n"
-        result_text += f"• Негизги акционер: {ownership.get('main_shareholder', '')}\n"
-        result_text += f"• Өлкө: {ownership.get('country', '')}\n"
-        result_text += f"• Ээлик пайы: {ownership.get('ownership_percentage', '')}\n\n"
+        result_text += render("section_ownership", language) + "\n"
+        result_text += f"• {label('main_shareholder', language)}: {_about_value(ownership, 'main_shareholder', language, '')}\n"
+        result_text += f"• {label('country', language)}: {_about_value(ownership, 'country', language, '')}\n"
+        result_text += f"• {label('ownership_share', language)}: {_about_value(ownership, 'ownership_percentage', language, '')}\n\n"
     
     # Branches
     branches = data.get('branches', {})
     if branches:
-        result_text += "🏢 Филиалдар:\n"
-        result_text += f"• Башкы кеңсе: {branches.get('head_office', '')}\n"
+        result_text += render("section_branches", language) + "\n"
+        result_text += f"• {label('head_office', language)}: {_about_value(branches, 'head_office', language, '')}\n"
         regions = branches.get('regions', [])
         if regions:
-            result_text += "• Аймактык филиалдар:\n"
+            result_text += f"• {label('regional_branches', language)}:\n"
             for region in regions:
-                result_text += f"  - {region}\n"
+                result_text += f"  - {free_text(region, language)}\n"
         result_text += "\n"
     
     # Contact
     contact = data.get('contact', {})
     if contact:
-        result_text += "📞 Байланыш:\n"
-        result_text += f"• Телефон: {contact.get('phone', '')}\n"
-        result_text += f"• Электрондук почта: {contact.get('email', '')}\n"
-        result_text += f"• Дарек: {contact.get('address', '')}\n"
+        result_text += render("section_contact", language) + "\n"
+        result_text += f"• {label('phone', language)}: {contact.get('phone', '')}\n"
+        result_text += f"• {label('email', language)}: {contact.get('email', '')}\n"
+        result_text += f"• {label('address', language)}: {_about_value(contact, 'address', language, '')}\n"
     
     return result_text
 
@@ -535,7 +548,7 @@ async def get_complete_about_us_tool():
     name="get_about_us_section",
     description="Банк тууралуу маалыматтын белгилүү бөлүмүн кайтарат."
 )
-async def get_about_us_section_tool(section: str):
+async def get_about_us_section_tool(section: str, language: str = "ky"):
     data = get_about_us_section(section)
     if isinstance(data, str) and "not found" in data:
         return data
@@ -547,27 +560,34 @@ async def get_about_us_section_tool(section: str):
             if isinstance(value, list):
                 result_text += f"🔹 {key.replace('_', ' ').title()}:\n"
                 for item in value:
-                    result_text += f"  • {item}\n"
+                    result_text += f"  • {free_text(item, language)}\n"
             else:
-                result_text += f"🔹 {key.replace('_', ' ').title()}: {value}\n"
+                result_text += f"🔹 {key.replace('_', ' ').title()}: {free_text(value, language)}\n"
     elif isinstance(data, list):
         for i, item in enumerate(data, 1):
-            result_text += f"{i}. {item}\n"
+            result_text += f"{i}. {free_text(item, language)}\n"
     else:
-        result_text += str(data)
+        result_text += free_text(data, language)
     
     return result_text
 
 
 # Deposit tools
 
+def _deposit_field(deposit, key, language):
+    value = deposit.get(key)
+    return free_text(value, language) if value is not None else render("unknown", language)
+
+def _deposit_lines(deposit, fields, language):
+    return "".join(f"   {label(field, language)}: {_deposit_field(deposit, field, language)}\n" for field in fields)
+
 @server.tool(
     name="list_all_deposit_names",
     description="DemirBank'тагы бардык депозиттердин тизмесин кайтарат"
 )
-async def list_all_deposit_names_tool():
+async def list_all_deposit_names_tool(language: str = "ky"):
     deposits = list_all_deposit_names()
-    result_text = "💰 Бардык депозиттер:\n\n"
+    result_text = render("all_deposits", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
     return result_text
@@ -576,20 +596,20 @@ async def list_all_deposit_names_tool():
     name="get_deposit_details",
     description="Депозит аталышы боюнча бардык негизги маалыматты кайтарат (валюта, мөөнөт, пайыздык ставка, минималдык сумма, сүрөттөмө)."
 )
-async def get_deposit_details_tool(deposit_name: str):
+async def get_deposit_details_tool(deposit_name: str, language: str = "ky"):
     deposit = get_deposit_details(deposit_name)
     if "error" in deposit:
-        return deposit["error"]
+        return free_text(deposit["error"], language)
     
     result_text = f"💰 {deposit['name']}\n\n"
-    result_text += f"💱 Валюта: {', '.join(deposit.get('currency', []))}\n"
-    result_text += f"💵 Минималдык сумма: {deposit.get('min_amount', 'белгисиз')}\n"
-    result_text += f"⏰ Мөөнөт: {deposit.get('term', 'белгисиз')}\n"
-    result_text += f"📈 Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-    result_text += f"💸 Чыгаруу: {deposit.get('withdrawal', 'белгисиз')}\n"
-    result_text += f"➕ Толуктоо: {deposit.get('replenishment', 'белгисиз')}\n"
-    result_text += f"📊 Капитализация: {deposit.get('capitalization', 'белгисиз')}\n"
-    result_text += f"📝 Сүрөттөмө: {deposit.get('descr', 'белгисиз')}\n"
+    result_text += f"💱 {label('currency', language)}: {', '.join(deposit.get('currency', []))}\n"
+    result_text += f"💵 {label('min_amount', language)}: {_deposit_field(deposit, 'min_amount', language)}\n"
+    result_text += f"⏰ {label('term', language)}: {_deposit_field(deposit, 'term', language)}\n"
+    result_text += f"📈 {label('rate', language)}: {_deposit_field(deposit, 'rate', language)}\n"
+    result_text += f"💸 {label('withdrawal', language)}: {_deposit_field(deposit, 'withdrawal', language)}\n"
+    result_text += f"➕ {label('replenishment', language)}: {_deposit_field(deposit, 'replenishment', language)}\n"
+    result_text += f"📊 {label('capitalization', language)}: {_deposit_field(deposit, 'capitalization', language)}\n"
+    result_text += f"📝 {label('description', language)}: {_deposit_field(deposit, 'descr', language)}\n"
     
     return result_text
 
@@ -597,17 +617,17 @@ async def get_deposit_details_tool(deposit_name: str):
     name="compare_deposits",
     description="Депозиттерди негизги параметрлер боюнча салыштырат. Аргумент катары депозиттердин аттарынын тизмеси берилет (2-4 депозит)."
 )
-async def compare_deposits_tool(deposit_names: list):
+async def compare_deposits_tool(deposit_names: list, language: str = "ky"):
     deposits = compare_deposits(deposit_names)
     if len(deposits) < 2:
-        return "Депозит салыштыруу үчүн эң азы 2 депозит керек."
+        return render("compare_deposits_need_two", language)
     
     all_keys = set()
     for deposit in deposits:
         all_keys.update(deposit.keys())
     all_keys = list(all_keys)
     
-    result_text = "📋 Салыштырылган депозиттер:\n"
+    result_text = render("compared_deposits", language) + "\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
     result_text += "\n"
@@ -617,7 +637,7 @@ async def compare_deposits_tool(deposit_names: list):
         if key == "name": continue
         values = []
         for deposit in deposits:
-            value = deposit.get(key, "белгисиз")
+            value = deposit.get(key, render("unknown", language))
             if isinstance(value, list): value = ", ".join(value)
             elif isinstance(value, dict): value = str(value)
             values.append(value)
@@ -628,10 +648,10 @@ async def compare_deposits_tool(deposit_names: list):
             else: unique_values.add(val)
         
         if len(unique_values) == 1:
-            result_text += f"✅ Бардыгы бирдей: {values[0]}\n"
+            result_text += render("all_same", language, value=free_text(values[0], language)) + "\n"
         else:
             for i, (deposit, value) in enumerate(zip(deposits, values), 1):
-                result_text += f"  {i}. {deposit['name']}: {value}\n"
+                result_text += f"  {i}. {deposit['name']}: {free_text(value, language)}\n"
         result_text += "\n"
     
     return result_text
@@ -640,108 +660,98 @@ async def compare_deposits_tool(deposit_names: list):
     name="get_deposits_by_currency",
     description="Депозиттерди валюта боюнча фильтрлейт (KGS, USD, EUR, RUB)."
 )
-async def get_deposits_by_currency_tool(currency: str):
+async def get_deposits_by_currency_tool(currency: str, language: str = "ky"):
     deposits = get_deposits_by_currency(currency)
-    result_text = f"💰 {currency.upper()} валютасындагы депозиттер:\n\n"
+    result_text = render("deposits_in_currency", language, currency=currency.upper()) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Минималдык сумма: {deposit.get('min_amount', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("rate", "min_amount", "term"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposits_by_term_range",
     description="Депозиттерди мөөнөт диапазону боюнча фильтрлейт."
 )
-async def get_deposits_by_term_range_tool(min_term: str = None, max_term: str = None):
+async def get_deposits_by_term_range_tool(min_term: str = None, max_term: str = None, language: str = "ky"):
     deposits = get_deposits_by_term_range(min_term, max_term)
-    result_text = "⏰ Мөөнөт боюнча депозиттер:\n\n"
+    result_text = render("deposits_by_term", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("term", "rate"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposits_by_min_amount",
     description="Депозиттерди минималдык сумма боюнча фильтрлейт."
 )
-async def get_deposits_by_min_amount_tool(max_amount: str):
+async def get_deposits_by_min_amount_tool(max_amount: str, language: str = "ky"):
     deposits = get_deposits_by_min_amount(max_amount)
-    result_text = f"💵 {max_amount} чейинки минималдык суммадагы депозиттер:\n\n"
+    result_text = render("deposits_by_min_amount", language, amount=max_amount) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Минималдык сумма: {deposit.get('min_amount', 'белгисиз')}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("min_amount", "rate"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposits_by_rate_range",
     description="Депозиттерди пайыздык ставка диапазону боюнча фильтрлейт."
 )
-async def get_deposits_by_rate_range_tool(min_rate: str = None, max_rate: str = None):
+async def get_deposits_by_rate_range_tool(min_rate: str = None, max_rate: str = None, language: str = "ky"):
     deposits = get_deposits_by_rate_range(min_rate, max_rate)
-    result_text = "📈 Пайыздык ставка боюнча депозиттер:\n\n"
+    result_text = render("deposits_by_rate", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("rate", "term"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposits_with_replenishment",
     description="Толуктоого мүмкүндүк берген депозиттерди кайтарат."
 )
-async def get_deposits_with_replenishment_tool():
+async def get_deposits_with_replenishment_tool(language: str = "ky"):
     deposits = get_deposits_with_replenishment()
-    result_text = "➕ Толуктоого мүмкүндүк берген депозиттер:\n\n"
+    result_text = render("deposits_with_replenishment", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("rate", "term"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposits_with_capitalization",
     description="Капитализация мүмкүндүгүн берген депозиттерди кайтарат."
 )
-async def get_deposits_with_capitalization_tool():
+async def get_deposits_with_capitalization_tool(language: str = "ky"):
     deposits = get_deposits_with_capitalization()
-    result_text = "📊 Капитализация мүмкүндүгүн берген депозиттер:\n\n"
+    result_text = render("deposits_with_capitalization", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("rate", "term"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposits_by_withdrawal_type",
     description="Депозиттерди чыгаруу түрү боюнча фильтрлейт."
 )
-async def get_deposits_by_withdrawal_type_tool(withdrawal_type: str):
+async def get_deposits_by_withdrawal_type_tool(withdrawal_type: str, language: str = "ky"):
     deposits = get_deposits_by_withdrawal_type(withdrawal_type)
-    result_text = f"💸 {withdrawal_type} чыгаруу түрүндөгү депозиттер:\n\n"
+    result_text = render("deposits_by_withdrawal", language, kind=withdrawal_type) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Чыгаруу: {deposit.get('withdrawal', 'белгисиз')}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("withdrawal", "rate"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_deposit_recommendations",
     description="Критерийлерге ылайык депозит сунуштарын кайтарат."
 )
-async def get_deposit_recommendations_tool(criteria: dict):
+async def get_deposit_recommendations_tool(criteria: dict, language: str = "ky"):
     deposits = get_deposit_recommendations(criteria)
-    result_text = "🎯 Депозит сунуштары:\n\n"
-    for i, deposit in enumerate(deposits, 1):
+    result_text = render("deposit_recommendations", language) + "\n\n"
+    for i, view in enumerate(deposits, 1):
+        deposit = view.product
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n"
-        result_text += f"   Минималдык сумма: {deposit.get('min_amount', 'белгисиз')}\n"
-        if 'recommendation_score' in deposit:
-            result_text += f"   Сунуштук балл: {deposit['recommendation_score']}\n"
+        result_text += _deposit_lines(deposit, ("rate", "term", "min_amount"), language)
+        result_text += f"   {label('recommendation_score', language)}: {view.score}\n"
         result_text += "\n"
     return result_text
 
@@ -749,43 +759,50 @@ async def get_deposit_recommendations_tool(criteria: dict):
     name="get_government_securities",
     description="Мамлекеттик баалуу кагаздарды кайтарат (Treasury Bills, NBKR Notes)."
 )
-async def get_government_securities_tool():
+async def get_government_securities_tool(language: str = "ky"):
     securities = get_government_securities()
-    result_text = "🏛️ Мамлекеттик баалуу кагаздар:\n\n"
+    result_text = render("government_securities", language) + "\n\n"
     for i, security in enumerate(securities, 1):
         result_text += f"{i}. {security['name']}\n"
-        result_text += f"   Мөөнөт: {security.get('term', 'белгисиз')}\n"
-        result_text += f"   Номиналдык сумма: {security.get('nominal_amount', 'белгисиз')}\n"
-        result_text += f"   Түрү: {security.get('type', 'белгисиз')}\n"
-        result_text += f"   Чыгаруучу: {security.get('issuer', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(security, ("term", "nominal_amount", "type", "issuer"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_child_deposits",
     description="Балдар үчүн атайын депозиттерди кайтарат."
 )
-async def get_child_deposits_tool():
+async def get_child_deposits_tool(language: str = "ky"):
     deposits = get_child_deposits()
-    result_text = "👶 Балдар үчүн депозиттер:\n\n"
+    result_text = render("child_deposits", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n"
-        result_text += f"   Минималдык сумма: {deposit.get('min_amount', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("rate", "term", "min_amount"), language) + "\n"
     return result_text
 
 @server.tool(
     name="get_online_deposits",
     description="Онлайн ачылуучу депозиттерди кайтарат."
 )
-async def get_online_deposits_tool():
+async def get_online_deposits_tool(language: str = "ky"):
     deposits = get_online_deposits()
-    result_text = "🌐 Онлайн депозиттер:\n\n"
+    result_text = render("online_deposits", language) + "\n\n"
     for i, deposit in enumerate(deposits, 1):
         result_text += f"{i}. {deposit['name']}\n"
-        result_text += f"   Пайыздык ставка: {deposit.get('rate', 'белгисиз')}\n"
-        result_text += f"   Мөөнөт: {deposit.get('term', 'белгисиз')}\n"
-        result_text += f"   Минималдык сумма: {deposit.get('min_amount', 'белгисиз')}\n\n"
+        result_text += _deposit_lines(deposit, ("rate", "term", "min_amount"), language) + "\n"
+    return result_text
+
+@server.tool(
+    name="search_faq",
+    description="Банктын көп берилүүчү суроолорунан (карталар, насыялар, интернет-банкинг, депозиттер, салыктар) суроого жакын жоопторду издейт."
+)
+async def search_faq_tool(query: str, language: str = "ky"):
+    hits = search_faq(query)
+    if not hits:
+        return render("faq_not_found", language)
+    result_text = render("faq_header", language) + "\n\n"
+    for i, hit in enumerate(hits, 1):
+        result_text += f"{i}. {free_text(hit.entry.question, language)}\n"
+        result_text += f"   {free_text(hit.entry.answer, language)}\n\n"
     return result_text
 
 
@@ -0,0 +1,162 @@
+import heapq
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from typing import Any, Dict, List, Optional
+
+from product_facts import product_facts
+from text_index import TextIndex
+
+INF = float("inf")
+
+# Recommendation result: catalog key, score, the criteria that matched, and a
+# reference to the (read-only, shared) product itself.
+RankedProduct = namedtuple("RankedProduct", ["product_id", "score", "matched", "product"])
+
+
+def top_k(ranked, k):
+    """Highest-scoring k views; ties keep catalog order, as a stable sort would"""
+    return heapq.nlargest(k, ranked, key=lambda r: r.score)
+
+
+# Cyrillic letters that look like Latin ones; Gemini and users mix both
+# alphabets in product names ("Visа Gold" with a Cyrillic "а").
+CYRILLIC_TO_LATIN = str.maketrans({
+    'а': 'a', 'в': 'b', 'е': 'e', 'к': 'k', 'м': 'm', 'н': 'h', 'о': 'o',
+    'р': 'p', 'с': 'c', 'т': 't', 'у': 'y', 'х': 'x', 'і': 'i', 'ј': 'j',
+    'ѕ': 's',
+})
+
+
+def normalize_name(name: str) -> str:
+    """Case-folded, whitespace-collapsed, Cyrillic/Latin look-alike normalized name"""
+    name = unicodedata.normalize("NFKC", name or "").casefold()
+    return " ".join(name.split()).translate(CYRILLIC_TO_LATIN)
+
+
+class ProductIndex:
+    """
+    Lookup structures over one catalog section (cards, deposits), built once
+    per catalog load. Every filter returns products in catalog order, the same
+    order the linear scans produced.
+    """
+
+    def __init__(self, products: Dict[str, Any]):
+        self.keys = list(products.keys())
+        self.products = list(products.values())
+        self._position = {id(p): i for i, p in enumerate(self.products)}
+        self.by_lower_name = {}
+        self.by_normalized_name = {}
+        by_currency = defaultdict(list)
+
+        for product in self.products:
+            name = product.get("name", "")
+            self.by_lower_name.setdefault(name.lower(), product)
+            self.by_normalized_name.setdefault(normalize_name(name), product)
+            currencies = product.get("currency", [])
+            if isinstance(currencies, list):
+                for currency in dict.fromkeys(currencies):
+                    by_currency[currency].append(product)
+        self.by_currency = {k: tuple(v) for k, v in by_currency.items()}
+
+        # Typed fee/rate/term/amount fields and the sorted arrays the range
+        # filters bisect over: (key, position) pairs split into two lists.
+        self.facts = [product_facts(p) for p in self.products]
+        self._fee = self._sorted_column(
+            (INF if f.fee is None else f.fee, pos) for pos, f in enumerate(self.facts))
+        self._term = self._sorted_column(
+            (f.term_min, pos) for pos, f in enumerate(self.facts) if f.term_max is not None)
+        self._rate = self._sorted_column(
+            (f.rate_min, pos) for pos, f in enumerate(self.facts) if f.rate_min is not None)
+        min_amounts = defaultdict(list)
+        for pos, f in enumerate(self.facts):
+            for currency, amount in f.min_amount.items():
+                min_amounts[currency].append((amount, pos))
+        self._min_amount = {c: self._sorted_column(v) for c, v in min_amounts.items()}
+
+        self.text = TextIndex(self.products)
+
+        # Name-substring filters (type, payment system, "online", "child", ...)
+        # are precomputed for every word that occurs in a product name.
+        lower_names = [p.get("name", "").lower() for p in self.products]
+        vocabulary = {word for name in lower_names for word in name.split()}
+        self.by_name_term = {
+            term: tuple(p for p, name in zip(self.products, lower_names) if term in name)
+            for term in vocabulary
+        }
+
+    @staticmethod
+    def _sorted_column(pairs):
+        pairs = sorted(pairs)
+        return [key for key, _ in pairs], [pos for _, pos in pairs]
+
+    def _in_catalog_order(self, positions):
+        return [self.products[pos] for pos in sorted(positions)]
+
+    def position(self, product) -> int:
+        return self._position[id(product)]
+
+    def ranked(self, position, score, matched) -> RankedProduct:
+        return RankedProduct(self.keys[position], score, tuple(matched), self.products[position])
+
+    def facts_for(self, product):
+        return self.facts[self._position[id(product)]]
+
+    def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        product = self.by_lower_name.get((name or "").lower())
+        if product is None:
+            product = self.by_normalized_name.get(normalize_name(name))
+        return product
+
+    def find_many_by_name(self, names: List[str], find=None) -> List[Dict[str, Any]]:
+        find = find or self.find_by_name
+        found = {}
+        for name in names:
+            product = find(name)
+            if product is not None:
+                found[self._position[id(product)]] = product
+        return [found[pos] for pos in sorted(found)]
+
+    def filter_by_currency(self, currency: str) -> List[Dict[str, Any]]:
+        return list(self.by_currency.get(currency.upper(), ()))
+
+    def filter_by_name_term(self, term: str) -> List[Dict[str, Any]]:
+        term = term.lower()
+        products = self.by_name_term.get(term)
+        if products is not None:
+            return list(products)
+        # Not a whole word of any name: fall back to the substring scan
+        return [p for p in self.products if term in p.get("name", "").lower()]
+
+    def filter_by_text(self, phrases: List[str]) -> List[Dict[str, Any]]:
+        """Products whose text contains every phrase (all tokens of each)"""
+        return self._in_catalog_order(self.text.match_all(phrases))
+
+    def filter_by_fee(self, min_fee=None, max_fee=None) -> List[Dict[str, Any]]:
+        """Products with min_fee <= annual fee <= max_fee; unknown fees sort as infinite"""
+        keys, positions = self._fee
+        lo = bisect_left(keys, 0 if min_fee is None else min_fee)
+        hi = bisect_right(keys, INF if max_fee is None else max_fee)
+        return self._in_catalog_order(positions[lo:hi])
+
+    def filter_by_term(self, min_term=None, max_term=None) -> List[Dict[str, Any]]:
+        """Products whose [term_min, term_max] (months) overlaps [min_term, max_term]"""
+        keys, positions = self._term
+        hi = bisect_right(keys, INF if max_term is None else max_term)
+        min_term = 0 if min_term is None else min_term
+        return self._in_catalog_order(
+            pos for pos in positions[:hi] if self.facts[pos].term_max >= min_term)
+
+    def filter_by_rate(self, min_rate=None, max_rate=None) -> List[Dict[str, Any]]:
+        """Products whose [rate_min, rate_max] (% per year) overlaps [min_rate, max_rate]"""
+        keys, positions = self._rate
+        hi = bisect_right(keys, INF if max_rate is None else max_rate)
+        min_rate = 0 if min_rate is None else min_rate
+        return self._in_catalog_order(
+            pos for pos in positions[:hi]
+            if (INF if self.facts[pos].rate_max is None else self.facts[pos].rate_max) >= min_rate)
+
+    def filter_by_min_amount(self, amount, currency="KGS") -> List[Dict[str, Any]]:
+        """Products that can be opened with `amount` in `currency`"""
+        keys, positions = self._min_amount.get(currency, ([], []))
+        return self._in_catalog_order(positions[:bisect_right(keys, amount)])
@@ -0,0 +1,142 @@
+"""
+Background categorization of chat messages.
+
+The category of a chat message is only used for analytics. The keyword
+categorizer is instant and runs inline (see routes.save_chat_message); with
+the slower embedding backend, /api/chat saves the message without a category
+and hands (message id, text) to this queue. A consumer
+task on the worker loop collects up to CATEGORIZATION_BATCH_SIZE messages (or
+whatever arrived within CATEGORIZATION_FLUSH_SECONDS) and back-fills
+ChatMessage.category_id with one UPDATE per category, in the loop's thread pool.
+
+Messages still queued when a worker dies stay uncategorized;
+supporting/recategorize_messages.py --uncategorized-only picks them up.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+from collections import defaultdict
+
+from sqlalchemy import update
+
+from database import db
+from models import ChatMessage
+from supporting.categorization_service import question_categorizer
+import worker_loop
+
+CATEGORIZATION_BATCH_SIZE = int(os.environ.get("CATEGORIZATION_BATCH_SIZE", "200"))
+CATEGORIZATION_FLUSH_SECONDS = float(os.environ.get("CATEGORIZATION_FLUSH_SECONDS", "1.0"))
+
+
+def categorize_messages(messages, categorizer):
+    """{category id or None: [message id, ...]} for (message id, text) pairs"""
+    messages = list(messages)
+    groups = defaultdict(list)
+    matches = categorizer.categorize_questions(text for _, text in messages)
+    for (message_id, _), match in zip(messages, matches):
+        groups[match.id if match else None].append(message_id)
+    return groups
+
+
+def apply_categories(groups):
+    """Set category_id of the grouped messages, one UPDATE per category; the caller commits"""
+    for category_id, message_ids in groups.items():
+        db.session.execute(
+            update(ChatMessage).where(ChatMessage.id.in_(message_ids)).values(category_id=category_id)
+        )
+
+
+class CategorizationQueue:
+    """Batches categorizations on the worker loop; `submit` is safe to call from any thread"""
+
+    def __init__(self, categorizer, batch_size=CATEGORIZATION_BATCH_SIZE,
+                 flush_seconds=CATEGORIZATION_FLUSH_SECONDS):
+        self.categorizer = categorizer
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._app = None
+        self._queue = None
+        self._loop = None
+        self._consumer = None
+
+    def submit(self, app, message_id, text):
+        """Categorize the saved message `message_id` in the background"""
+        self._app = app
+        worker_loop.get_loop().call_soon_threadsafe(self._put, (message_id, text))
+
+    def _put(self, item):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use in this process (worker loops are per pid)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._consumer = loop.create_task(self._consume())
+        self._queue.put_nowait(item)
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _consume(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await worker_loop.in_app_context(self._app, self._store, batch)
+            except Exception as e:
+                logging.exception(f"Categorizing {len(batch)} chat messages failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _store(self, batch):
+        groups = categorize_messages(batch, self.categorizer)
+        groups.pop(None, None)  # new messages are saved uncategorized already
+        apply_categories(groups)
+        db.session.commit()
+        logging.debug(f"Categorized {len(batch)} chat messages")
+
+    async def join(self):
+        """Wait until every submitted message is categorized"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    def flush(self, timeout=None):
+        """join() for synchronous callers (tests, shutdown)"""
+        if self._app is not None:
+            # Scheduled after every submitted _put, so join() sees them all
+            worker_loop.run(self.join(), timeout=timeout)
+
+    async def _stop(self):
+        await self.join()
+        if self._consumer is not None and self._loop is asyncio.get_running_loop():
+            self._consumer.cancel()
+
+    def close(self, timeout=None):
+        """Categorize what is queued, then stop the consumer"""
+        if self._app is not None:
+            worker_loop.run(self._stop(), timeout=timeout)
+
+
+categorization_queue = CategorizationQueue(question_categorizer)
+
+
+@atexit.register
+def _close_on_exit():
+    try:
+        categorization_queue.close(timeout=5)
+    except Exception as e:
+        logging.warning(f"Chat messages left uncategorized at shutdown: {e}")
@@ -0,0 +1,171 @@
+"""
+Gemini context cache for the static prefix of every chat request.
+
+The system instruction and the ~70 function declarations are identical in
+every generate_content call, so they are uploaded once as cached content and
+requests only reference the handle (config.cached_content). The handle's TTL
+is extended shortly before it runs out. If caching is unavailable (prefix below
+the model's minimum, API error, GEMINI_CONTEXT_CACHE=0) `cached_content_name()`
+returns None and callers send the prefix inline, as before; creation is
+retried after GEMINI_CONTEXT_CACHE_RETRY seconds.
+
+The cache is shared by the whole deployment: its display name is a digest of
+the prefix, and a process that needs a handle first adopts a live cached
+content with that name (created by another worker or instance) before
+creating one itself.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from google.genai import types
+
+CONTEXT_CACHE_ENABLED = os.environ.get("GEMINI_CONTEXT_CACHE", "1") != "0"
+# Lifetime of the cached content and how long before its expiry the TTL is extended
+CONTEXT_CACHE_TTL = int(os.environ.get("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+CONTEXT_CACHE_REFRESH = int(os.environ.get("GEMINI_CONTEXT_CACHE_REFRESH", "300"))
+# After a failed create or refresh, requests go uncached for this many seconds
+CONTEXT_CACHE_RETRY = int(os.environ.get("GEMINI_CONTEXT_CACHE_RETRY", "600"))
+
+
+def prefix_digest(model, system_instruction, tools):
+    """Changes whenever the prompt or a schema changes, so a deploy never reuses a stale cache"""
+    raw = json.dumps([model, system_instruction, tools], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ContextCache:
+    """
+    Cached-content handle for (model, system instruction, tools), shared with
+    every process serving the same prefix. Used from the worker loop; `clock`
+    is injectable for tests.
+    """
+
+    def __init__(self, client, model, system_instruction, tools, enabled=CONTEXT_CACHE_ENABLED,
+                 ttl=CONTEXT_CACHE_TTL, refresh=CONTEXT_CACHE_REFRESH, retry=CONTEXT_CACHE_RETRY,
+                 clock=time.monotonic):
+        self.client = client
+        self.model = model
+        self.system_instruction = system_instruction
+        self.tools = tools
+        self.enabled = enabled
+        self.ttl = ttl
+        self.refresh = refresh
+        self.retry = retry
+        self.clock = clock
+        self.display_name = f"banking-chat-{prefix_digest(model, system_instruction, tools)}"
+        self.name = None
+        self.expires_at = 0
+        self.retry_at = 0
+        self.cached_tokens = 0
+        self.stats = {"requests": 0, "cached_requests": 0, "tokens_saved": 0}
+        self._lock = None
+
+    def request_config(self, cached_content_name, **generation_params):
+        """GenerateContentConfig referencing the cache, or carrying the prefix inline"""
+        if cached_content_name:
+            return types.GenerateContentConfig(cached_content=cached_content_name, **generation_params)
+        return types.GenerateContentConfig(
+            system_instruction=self.system_instruction, tools=self.tools, **generation_params
+        )
+
+    async def cached_content_name(self):
+        """Name of a live cached content, creating or extending it as needed; None to send the prefix inline"""
+        if not self.enabled:
+            return None
+        now = self.clock()
+        if self.name and now < self.expires_at - self.refresh:
+            return self.name
+        if now < self.retry_at:
+            return None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = self.clock()
+            if self.name and now < self.expires_at - self.refresh:
+                return self.name
+            if now < self.retry_at:
+                return None
+            try:
+                if self.name and now < self.expires_at:
+                    await self._extend()
+                elif not await self._adopt():
+                    await self._create()
+            except Exception as e:
+                logging.warning(f"Gemini context cache unavailable, sending the prompt inline: {e}")
+                self.name = None
+                self.retry_at = self.clock() + self.retry
+        return self.name
+
+    async def _adopt(self):
+        """Take over a live cached content of this prefix; False if there is none"""
+        now = datetime.now(timezone.utc)
+        async for cached in await self.client.aio.caches.list():
+            if cached.display_name != self.display_name or (cached.model or "").rsplit("/", 1)[-1] != self.model:
+                continue
+            remaining = (cached.expire_time - now).total_seconds() if cached.expire_time else 0
+            if remaining <= self.refresh:
+                continue
+            self.name = cached.name
+            self.expires_at = self.clock() + remaining
+            usage = getattr(cached, "usage_metadata", None)
+            self.cached_tokens = (getattr(usage, "total_token_count", None) or 0) if usage else 0
+            logging.info(f"Gemini context cache {self.name} reused ({remaining:.0f} s left)")
+            return True
+        return False
+
+    async def _create(self):
+        started = self.clock()
+        cached = await self.client.aio.caches.create(
+            model=self.model,
+            config=types.CreateCachedContentConfig(
+                display_name=self.display_name,
+                system_instruction=self.system_instruction,
+                tools=self.tools,
+                ttl=f"{self.ttl}s",
+            ),
+        )
+        self.name = cached.name
+        self.expires_at = started + self.ttl
+        usage = getattr(cached, "usage_metadata", None)
+        self.cached_tokens = (getattr(usage, "total_token_count", None) or 0) if usage else 0
+        logging.info(f"Gemini context cache {self.name} created ({self.cached_tokens} tokens, ttl {self.ttl} s)")
+
+    async def _extend(self):
+        started = self.clock()
+        try:
+            await self.client.aio.caches.update(
+                name=self.name, config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s")
+            )
+        except Exception as e:
+            # Deleted or expired on the server side: start over
+            logging.info(f"Gemini context cache {self.name} could not be extended ({e}), recreating")
+            self.name = None
+            await self._create()
+            return
+        self.expires_at = started + self.ttl
+        logging.info(f"Gemini context cache {self.name} extended by {self.ttl} s")
+
+    def invalidate(self, name):
+        """The server rejected `name`; requests go uncached until the retry interval has passed"""
+        if name and self.name == name:
+            self.name = None
+            self.expires_at = 0
+            self.retry_at = self.clock() + self.retry
+
+    def record_usage(self, response, cached_content_name=None):
+        """Log the input tokens served from the cache for one generate_content response"""
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = (getattr(usage, "prompt_token_count", None) or 0) if usage else 0
+        saved = (getattr(usage, "cached_content_token_count", None) or 0) if usage else 0
+        self.stats["requests"] += 1
+        if cached_content_name:
+            self.stats["cached_requests"] += 1
+        self.stats["tokens_saved"] += saved
+        logging.info(f"Gemini input tokens: {prompt_tokens}, from context cache: {saved}")
+        return saved
@@ -3,20 +3,43 @@ import os
 from typing import List, Dict, Any
 from pathlib import Path
 import logging
+from product_catalog import cards_catalog, deposits_catalog, about_us_catalog
+from name_resolver import product_name_resolver, MIN_CONFIDENCE
+from product_facts import parse_number, parse_currency, parse_rate_range, parse_term_range, parse_amount_query
+from catalog_index import RankedProduct, top_k
+from faq_index import FAQ_TOP_K, FaqHit, faq_catalog
 
 logging.basicConfig(level=logging.DEBUG)
 
-CARDS_PATH = Path("generalInfo/retail/cards.json")
+CARDS_PATH = cards_catalog.path
 
 
 def load_cards_data() -> Dict[str, Any]:
-    try:
-        with open(CARDS_PATH, encoding='utf-8') as f:
-            cards_json = json.load(f)
-            return cards_json.get('cards', {})
-    except Exception as e:
-        logging.exception(f"Error loading cards data: {e}")
-        return {}
+    """Cards from the in-memory catalog (reloaded only when cards.json changes)"""
+    return cards_catalog.data()
+
+
+def resolve_product(index, name: str, source: str):
+    """Exact/normalized name lookup, then the fuzzy trigram resolver"""
+    product = index.find_by_name(name)
+    if product is not None:
+        return product
+    for match in product_name_resolver.candidates(name, source=source):
+        if match.confidence < MIN_CONFIDENCE:
+            break
+        product = index.find_by_name(match.name)
+        if product is not None:
+            logging.info(f"Fuzzy match '{name}' -> '{match.name}' ({match.confidence:.2f})")
+            return product
+    return None
+
+
+def find_card(card_name: str):
+    return resolve_product(cards_catalog.index(), card_name, "retail/cards.json")
+
+
+def find_deposit(deposit_name: str):
+    return resolve_product(deposits_catalog.index(), deposit_name, "retail/deposits.json")
 
 # 1. List all card types
 
@@ -33,21 +56,14 @@ def list_all_card_names() -> List[Dict[str, str]]:
 # 2. Get card details by name
 
 def get_card_details(card_name: str) -> Dict[str, Any]:
-    cards = load_cards_data()
-    for card in cards.values():
-        if card.get("name", "").lower() == card_name.lower():
-            return card
+    card = find_card(card_name)
+    if card is not None:
+        return card
     return {"error": "Карта табылган жок."}
 
 # 3. Compare cards by names
 def compare_cards(card_names: List[str]) -> List[Dict[str, Any]]:
-    cards = load_cards_data()
-    found = []
-    names_lower = [n.lower() for n in card_names]
-    for card in cards.values():
-        if card.get("name", "").lower() in names_lower:
-            found.append(card)
-    return found
+    return cards_catalog.index().find_many_by_name(card_names, find=find_card)
 
 # 4. Get card limits
 
@@ -80,77 +96,27 @@ def get_card_benefits(card_name: str) -> List[str]:
 # 6. Get cards by type (debit/credit)
 def get_cards_by_type(card_type: str) -> List[Dict[str, Any]]:
     """Get cards filtered by type (debit/credit)"""
-    cards = load_cards_data()
-    result = []
-    card_type_lower = card_type.lower()
-    
-    for card in cards.values():
-        name = card.get("name", "").lower()
-        if card_type_lower in name:
-            result.append(card)
-    
-    return result
+    return cards_catalog.index().filter_by_name_term(card_type)
 
 # 7. Get cards by payment system (Visa/Mastercard)
 def get_cards_by_payment_system(system: str) -> List[Dict[str, Any]]:
     """Get cards filtered by payment system (Visa/Mastercard)"""
-    cards = load_cards_data()
-    result = []
-    system_lower = system.lower()
-    
-    for card in cards.values():
-        name = card.get("name", "").lower()
-        if system_lower in name:
-            result.append(card)
-    
-    return result
+    return cards_catalog.index().filter_by_name_term(system)
 
 # 8. Get cards by annual fee range
 def get_cards_by_fee_range(min_fee: str = None, max_fee: str = None) -> List[Dict[str, Any]]:
     """Get cards filtered by annual fee range"""
-    cards = load_cards_data()
-    result = []
-    
-    for card in cards.values():
-        fee = card.get("annual_fee", "")
-        if fee == "акысыз":
-            fee_value = 0
-        elif "сом" in fee:
-            try:
-                fee_value = int(fee.replace(" сом", "").replace(" ", ""))
-            except:
-                fee_value = float('inf')
-        else:
-            fee_value = float('inf')
-        
-        # Apply filters
-        if min_fee is not None:
-            min_fee_value = int(min_fee) if min_fee.isdigit() else 0
-            if fee_value < min_fee_value:
-                continue
-                
-        if max_fee is not None:
-            max_fee_value = int(max_fee) if max_fee.isdigit() else float('inf')
-            if fee_value > max_fee_value:
-                continue
-        
-        result.append(card)
-    
-    return result
+    min_fee_value = parse_number(min_fee) if min_fee is not None else None
+    max_fee_value = parse_number(max_fee) if max_fee is not None else None
+    return cards_catalog.index().filter_by_fee(
+        min_fee_value or 0,
+        float('inf') if max_fee_value is None else max_fee_value,
+    )
 
 # 9. Get cards by currency
 def get_cards_by_currency(currency: str) -> List[Dict[str, Any]]:
     """Get cards that support specific currency"""
-    cards = load_cards_data()
-    result = []
-    currency_upper = currency.upper()
-    
-    for card in cards.values():
-        card_currencies = card.get("currency", [])
-        if isinstance(card_currencies, list) and currency_upper in card_currencies:
-            result.append(card)
-    
-    return result
+    return cards_catalog.index().filter_by_currency(currency)
 
 # 10. Get card instructions (for Card Plus and Virtual cards)
 def get_card_instructions(card_name: str) -> Dict[str, Any]:
@@ -186,83 +152,63 @@ def get_card_conditions(card_name: str) -> Dict[str, Any]:
 # 12. Get cards with specific features
 def get_cards_with_features(features: List[str]) -> List[Dict[str, Any]]:
     """Get cards that have specific features"""
-    cards = load_cards_data()
-    result = []
-    features_lower = [f.lower() for f in features]
-    
-    for card in cards.values():
-        card_text = str(card).lower()
-        if all(feature in card_text for feature in features_lower):
-            result.append(card)
-    
-    return result
+    return cards_catalog.index().filter_by_text(features)
 
 # 13. Get best card recommendations
-def get_card_recommendations(criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Get card recommendations based on criteria"""
-    cards = load_cards_data()
-    result = []
-    
+def get_card_recommendations(criteria: Dict[str, Any]) -> List[RankedProduct]:
+    """
+    Get card recommendations based on criteria.
+    Returns up to 5 ranked views over the shared catalog; cards are not copied or modified.
+    """
+    index = cards_catalog.index()
+
     # Extract criteria
-    card_type = criteria.get("type", "").lower()  # debit/credit
+    card_type = criteria.get("type", "")  # debit/credit
     max_fee = criteria.get("max_fee", None)
-    currency = criteria.get("currency", "").upper()
+    max_fee_value = parse_number(max_fee) if max_fee is not None else None
+    currency = criteria.get("currency", "")
     features = criteria.get("features", [])
-    
-    for card in cards.values():
-        score = 0
-        name = card.get("name", "").lower()
-        
-        # Type matching
-        if card_type and card_type in name:
-            score += 10
-        
-        # Fee matching
-        if max_fee is not None:
-            fee = card.get("annual_fee", "")
-            if fee == "акысыз":
-                score += 5
-            elif "сом" in fee:
-                try:
-                    fee_value = int(fee.replace(" сом", "").replace(" ", ""))
-                    if fee_value <= max_fee:
-                        score += 3
-                except:
-                    pass
-        
-        # Currency matching
-        if currency:
-            card_currencies = card.get("currency", [])
-            if isinstance(card_currencies, list) and currency in card_currencies:
+
+    type_matches = {index.position(c) for c in index.filter_by_name_term(card_type)} if card_type else set()
+    currency_matches = {index.position(c) for c in index.filter_by_currency(currency)} if currency else set()
+    feature_matches = [(feature, index.text.match(feature)) for feature in features]
+
+    def scored():
+        for position, facts in enumerate(index.facts):
+            score = 0
+            matched = []
+            # Type matching
+            if position in type_matches:
+                score += 10
+                matched.append("type")
+            # Fee matching
+            if max_fee is not None:
+                if facts.fee == 0:
+                    score += 5
+                    matched.append("fee")
+                elif facts.fee is not None and max_fee_value is not None and facts.fee <= max_fee_value:
+                    score += 3
+                    matched.append("fee")
+            # Currency matching
+            if position in currency_matches:
                 score += 5
-        
-        # Features matching
-        if features:
-            card_text = str(card).lower()
-            for feature in features:
-                if feature.lower() in card_text:
+                matched.append("currency")
+            # Features matching
+            for feature, positions in feature_matches:
+                if position in positions:
                     score += 2
-        
-        if score > 0:
-            card["recommendation_score"] = score
-            result.append(card)
-    
-    # Sort by score
-    result.sort(key=lambda x: x.get("recommendation_score", 0), reverse=True)
-    return result[:5]  # Return top 5 recommendations
+                    matched.append(f"feature:{feature}")
+            if score > 0:
+                yield index.ranked(position, score, matched)
+
+    return top_k(scored(), 5)
 
 # About Us functions
-ABOUT_US_PATH = Path("generalInfo/retail/about-us.json")
+ABOUT_US_PATH = about_us_catalog.path
 
 def load_about_us_data() -> Dict[str, Any]:
-    """Load about us data from JSON file"""
-    try:
-        with open(ABOUT_US_PATH, encoding='utf-8') as f:
-            about_us_json = json.load(f)
-            return about_us_json.get('about-us', {})
-    except Exception as e:
-        logging.exception(f"Error loading about us data: {e}")
-        return {}
+    """Load about us data from the in-memory catalog"""
+    return about_us_catalog.data()
 
 # 14. Get general bank information
 def get_bank_info() -> Dict[str, Any]:
@@ -317,17 +263,11 @@ def get_about_us_section(section: str) -> Any:
     return data.get(section, f"Section '{section}' not found")
 
 # Deposit functions
-DEPOSITS_PATH = Path("generalInfo/retail/deposits.json")
+DEPOSITS_PATH = deposits_catalog.path
 
 def load_deposits_data() -> Dict[str, Any]:
-    """Load deposits data from JSON file"""
-    try:
-        with open(DEPOSITS_PATH, encoding='utf-8') as f:
-            deposits_json = json.load(f)
-            return deposits_json.get('deposits', {})
-    except Exception as e:
-        logging.exception(f"Error loading deposits data: {e}")
-        return {}
+    """Load deposits data from the in-memory catalog"""
+    return deposits_catalog.data()
 
 # 22. List all deposit names
 def list_all_deposit_names() -> List[Dict[str, str]]:
@@ -343,95 +283,49 @@ def list_all_deposit_names() -> List[Dict[str, str]]:
 # 23. Get deposit details by name
 def get_deposit_details(deposit_name: str) -> Dict[str, Any]:
     """Get detailed information about a specific deposit"""
-    deposits = load_deposits_data()
-    for deposit in deposits.values():
-        if deposit.get("name", "").lower() == deposit_name.lower():
-            return deposit
+    deposit = find_deposit(deposit_name)
+    if deposit is not None:
+        return deposit
     return {"error": "Депозит табылган жок."}
 
 # 24. Compare deposits by names
 def compare_deposits(deposit_names: List[str]) -> List[Dict[str, Any]]:
     """Compare multiple deposits by their names"""
-    deposits = load_deposits_data()
-    found = []
-    names_lower = [n.lower() for n in deposit_names]
-    for deposit in deposits.values():
-        if deposit.get("name", "").lower() in names_lower:
-            found.append(deposit)
-    return found
+    return deposits_catalog.index().find_many_by_name(deposit_names, find=find_deposit)
 
 # 25. Get deposits by currency
 def get_deposits_by_currency(currency: str) -> List[Dict[str, Any]]:
     """Get deposits filtered by currency"""
-    deposits = load_deposits_data()
-    result = []
-    currency_upper = currency.upper()
-    
-    for deposit in deposits.values():
-        currencies = deposit.get("currency", [])
-        if isinstance(currencies, list) and currency_upper in currencies:
-            result.append(deposit)
-    
-    return result
+    return deposits_catalog.index().filter_by_currency(currency)
 
 # 26. Get deposits by term range
 def get_deposits_by_term_range(min_term: str = None, max_term: str = None) -> List[Dict[str, Any]]:
-    """Get deposits filtered by term range"""
-    deposits = load_deposits_data()
-    result = []
-    
-    for deposit in deposits.values():
-        term = deposit.get("term", "")
-        if not term:
-            continue
-            
-        # Simple term matching (can be improved with more sophisticated parsing)
-        if min_term and min_term.lower() in term.lower():
-            result.append(deposit)
-        elif max_term and max_term.lower() in term.lower():
-            result.append(deposit)
-        elif not min_term and not max_term:
-            result.append(deposit)
-    
-    return result
+    """Get deposits whose term (in months) overlaps the requested range"""
+    index = deposits_catalog.index()
+    min_months = parse_term_range(min_term)[0] if min_term else None
+    max_months = parse_term_range(max_term)[1] if max_term else None
+    if min_months is None and max_months is None:
+        return [d for d in index.products if d.get("term")]
+    return index.filter_by_term(min_months, max_months)
 
 # 27. Get deposits by minimum amount
 def get_deposits_by_min_amount(max_amount: str) -> List[Dict[str, Any]]:
     """Get deposits with minimum amount less than or equal to specified amount"""
-    deposits = load_deposits_data()
-    result = []
-    
-    for deposit in deposits.values():
-        min_amount = deposit.get("min_amount", "")
-        if not min_amount:
-            continue
-            
-        # Simple amount comparison (can be improved with currency conversion)
-        if max_amount.lower() in min_amount.lower():
-            result.append(deposit)
-    
-    return result
+    index = deposits_catalog.index()
+    amount, currency = parse_amount_query(max_amount)
+    if amount is None:
+        return []
+    return index.filter_by_min_amount(amount, currency)
 
 # 28. Get deposits by rate range
 def get_deposits_by_rate_range(min_rate: str = None, max_rate: str = None) -> List[Dict[str, Any]]:
-    """Get deposits filtered by interest rate range"""
-    deposits = load_deposits_data()
-    result = []
-    
-    for deposit in deposits.values():
-        rate = deposit.get("rate", "")
-        if not rate:
-            continue
-            
-        # Simple rate matching
-        if min_rate and min_rate.lower() in rate.lower():
-            result.append(deposit)
-        elif max_rate and max_rate.lower() in rate.lower():
-            result.append(deposit)
-        elif not min_rate and not max_rate:
-            result.append(deposit)
-    
-    return result
+    """Get deposits filtered by interest rate range (% per year)"""
+    index = deposits_catalog.index()
+    min_value = parse_number(min_rate) if min_rate else None
+    max_value = parse_number(max_rate) if max_rate else None
+    if min_value is None and max_value is None:
+        return [d for d in index.products if d.get("rate")]
+    return index.filter_by_rate(min_value, max_value)
 
 # 29. Get deposits with replenishment option
 def get_deposits_with_replenishment() -> List[Dict[str, Any]]:
@@ -474,64 +368,81 @@ def get_deposits_by_withdrawal_type(withdrawal_type: str) -> List[Dict[str, Any]
     return result
 
 # 32. Get deposit recommendations
-def get_deposit_recommendations(criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Get deposit recommendations based on criteria"""
-    deposits = load_deposits_data()
-    result = []
-    
+def get_deposit_recommendations(criteria: Dict[str, Any]) -> List[RankedProduct]:
+    """
+    Get deposit recommendations based on criteria.
+    Amount, term and rate criteria are parsed and compared with the typed
+    deposit facts, e.g. "100 USD" matches deposits that can be opened with 100 USD.
+    Returns up to 5 ranked views over the shared catalog; deposits are not copied or modified.
+    """
+    index = deposits_catalog.index()
+
     currency = criteria.get("currency")
     min_amount = criteria.get("min_amount")
     term = criteria.get("term")
     rate_preference = criteria.get("rate_preference")
     replenishment_needed = criteria.get("replenishment_needed")
     capitalization_needed = criteria.get("capitalization_needed")
-    
-    for deposit in deposits.values():
-        score = 0
-        
-        # Currency matching
-        if currency:
-            currencies = deposit.get("currency", [])
-            if isinstance(currencies, list) and currency.upper() in currencies:
+
+    def positions(products):
+        return {index.position(d) for d in products}
+
+    currency_matches = positions(index.filter_by_currency(currency)) if currency else set()
+
+    amount_matches = set()
+    amount = parse_number(min_amount) if min_amount else None
+    if amount is not None:
+        # "5000" with a USD currency criterion means 5000 USD
+        amount_currency = parse_currency(str(min_amount), default=(currency or "KGS").upper())
+        amount_matches = positions(index.filter_by_min_amount(amount, amount_currency))
+
+    term_matches = set()
+    term_min, term_max = parse_term_range(term) if term else (None, None)
+    if term_min is not None:
+        term_matches = positions(index.filter_by_term(term_min, term_max))
+
+    rate_matches = set()
+    if rate_preference:
+        rate_min, rate_max = parse_rate_range(str(rate_preference))
+        if rate_min is None:
+            rate_min = parse_number(rate_preference)
+        elif rate_min == rate_max:
+            rate_max = None  # "12%": at least 12%
+        if rate_min is not None:
+            rate_matches = positions(index.filter_by_rate(rate_min, rate_max))
+
+    def scored():
+        for position, facts in enumerate(index.facts):
+            score = 0
+            matched = []
+            # Currency matching
+            if position in currency_matches:
                 score += 5
-        
-        # Amount matching
-        if min_amount:
-            deposit_min = deposit.get("min_amount", "")
-            if min_amount.lower() in deposit_min.lower():
+                matched.append("currency")
+            # Amount matching: can be opened with the amount
+            if position in amount_matches:
                 score += 3
-        
-        # Term matching
-        if term:
-            deposit_term = deposit.get("term", "")
-            if term.lower() in deposit_term.lower():
+                matched.append("min_amount")
+            # Term matching: the term range covers the requested term
+            if position in term_matches:
                 score += 3
-        
-        # Rate preference
-        if rate_preference:
-            deposit_rate = deposit.get("rate", "")
-            if rate_preference.lower() in deposit_rate.lower():
+                matched.append("term")
+            # Rate preference
+            if position in rate_matches:
                 score += 2
-        
-        # Replenishment matching
-        if replenishment_needed:
-            replenishment = deposit.get("replenishment", "")
-            if replenishment_needed and "ооба" in replenishment.lower():
+                matched.append("rate")
+            # Replenishment matching
+            if replenishment_needed and facts.replenishment:
                 score += 2
-        
-        # Capitalization matching
-        if capitalization_needed:
-            capitalization = deposit.get("capitalization", "")
-            if capitalization_needed and "ооба" in capitalization.lower():
+                matched.append("replenishment")
+            # Capitalization matching
+            if capitalization_needed and facts.capitalization:
                 score += 2
-        
-        if score > 0:
-            deposit["recommendation_score"] = score
-            result.append(deposit)
-    
-    # Sort by score
-    result.sort(key=lambda x: x.get("recommendation_score", 0), reverse=True)
-    return result[:5]  # Return top 5 recommendations
+                matched.append("capitalization")
+            if score > 0:
+                yield index.ranked(position, score, matched)
+
+    return top_k(scored(), 5)
 
 # 33. Get government securities
 def get_government_securities() -> List[Dict[str, Any]]:
@@ -571,3 +482,8 @@ def get_online_deposits() -> List[Dict[str, Any]]:
             result.append(deposit)
     
     return result
+
+# 36. Search the FAQ
+def search_faq(query: str, k: int = FAQ_TOP_K) -> List[FaqHit]:
+    """FAQ entries (useful-info.json) closest in meaning to the question"""
+    return faq_catalog.index().search(query, k=k)
@@ -0,0 +1,162 @@
+"""
+Sentence embeddings for the FAQ index and the embedding question categorizer.
+
+Encoders turn a list of texts into an L2-normalized float32 matrix, one row
+per text, so cosine similarity is a plain dot product. SentenceEncoder wraps a
+multilingual sentence-transformers model (the optional "embeddings" extra in
+pyproject.toml); TrigramEncoder hashes character trigrams into a fixed number
+of buckets and needs nothing beyond NumPy. It only captures spelling overlap,
+not meaning, and is used when sentence-transformers is not installed. An
+encoder's `name` identifies its vector space: vectors made by different
+encoders must not be compared.
+
+Vectors of the texts in a generalInfo JSON file can be precomputed by
+supporting/build_embeddings.py into two sidecar files next to it:
+    <name>.embeddings.npy    float32 matrix, one row per distinct text
+    <name>.embeddings.json   {"encoder": ..., "hashes": [...]}, the
+                             content_hash of each row, in row order
+EmbeddingStore reads them (the matrix memory-mapped); encode_with_store
+encodes only the texts the store does not have.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+TRIGRAM_DIMENSIONS = 1024
+SIDECAR_SUFFIX = ".embeddings"
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def normalize(vectors):
+    """Rows scaled to unit length (zero rows stay zero), as contiguous float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return np.ascontiguousarray(vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12))
+
+
+class SentenceEncoder:
+    def __init__(self, model, name):
+        self.model = model
+        self.name = name
+
+    def __call__(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return normalize(self.model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True))
+
+
+class TrigramEncoder:
+    def __init__(self, dimensions=TRIGRAM_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"char-trigrams-{dimensions}"
+
+    def __call__(self, texts):
+        texts = list(texts)
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {str(text).lower()} "
+            for start in range(len(padded) - 2):
+                vectors[row, zlib.crc32(padded[start:start + 3].encode("utf-8")) % self.dimensions] += 1
+        return normalize(vectors)
+
+
+def sentence_transformers_installed() -> bool:
+    """Whether sentence-transformers can be imported, without importing it"""
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+def sentence_encoder(model_name=EMBEDDING_MODEL):
+    """SentenceEncoder for `model_name` (loaded once per process), or None without sentence-transformers"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    with _models_lock:
+        if model_name not in _models:
+            logging.info(f"Loading sentence embedding model {model_name}")
+            _models[model_name] = SentenceTransformer(model_name)
+    return SentenceEncoder(_models[model_name], model_name)
+
+
+def default_encoder():
+    """The sentence model when available, character trigrams otherwise"""
+    encoder = sentence_encoder()
+    if encoder is None:
+        logging.warning("sentence-transformers is not installed (pip install \".[embeddings]\"); "
+                        "embedding text with character trigrams")
+        encoder = TrigramEncoder()
+    return encoder
+
+
+def content_hash(encoder_name: str, text: str) -> str:
+    """Key of the vector of `text`: changes with the text and with the vector space"""
+    return hashlib.sha256(f"{encoder_name}\n{text}".encode("utf-8")).hexdigest()
+
+
+def is_sidecar(path) -> bool:
+    """True for the sidecar files, which sit among the generalInfo JSON documents"""
+    return Path(path).name.endswith((SIDECAR_SUFFIX + ".npy", SIDECAR_SUFFIX + ".json"))
+
+
+class EmbeddingStore:
+    """The sidecar vectors of one JSON file"""
+
+    def __init__(self, json_path):
+        json_path = Path(json_path)
+        self.vectors_path = json_path.with_name(json_path.stem + SIDECAR_SUFFIX + ".npy")
+        self.index_path = json_path.with_name(json_path.stem + SIDECAR_SUFFIX + ".json")
+
+    def load(self, encoder_name):
+        """({content hash: row}, memory-mapped matrix); empty for another encoder or missing/inconsistent files"""
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if index.get("encoder") != encoder_name:
+                return {}, None
+            matrix = np.load(self.vectors_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return {}, None
+        hashes = index.get("hashes", [])
+        if matrix.ndim != 2 or matrix.shape[0] != len(hashes):
+            logging.warning(f"Ignoring {self.vectors_path}: {matrix.shape[0]} rows for {len(hashes)} hashes")
+            return {}, None
+        return {key: row for row, key in enumerate(hashes)}, matrix
+
+    def save(self, encoder_name, hashes, matrix):
+        """Replace both files, each atomically"""
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        tmp_vectors = self.vectors_path.with_name(self.vectors_path.name + ".tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, matrix)
+        tmp_index = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp_index.write_text(json.dumps({"encoder": encoder_name, "hashes": list(hashes)}), encoding="utf-8")
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_index, self.index_path)
+
+
+def encode_with_store(encoder, texts, store=None):
+    """Vectors of `texts` like encoder(texts), taking the ones `store` already has"""
+    texts = list(texts)
+    rows, matrix = store.load(encoder.name) if store is not None else ({}, None)
+    keys = [content_hash(encoder.name, text) for text in texts]
+    missing = [i for i, key in enumerate(keys) if key not in rows]
+    if matrix is None or len(missing) == len(texts):
+        return encoder(texts)
+    vectors = np.empty((len(texts), matrix.shape[1]), dtype=np.float32)
+    stored = [i for i, key in enumerate(keys) if key in rows]
+    vectors[stored] = matrix[[rows[keys[i]] for i in stored]]
+    if missing:
+        logging.info(f"{len(missing)} of {len(texts)} texts are not in {store.vectors_path}; encoding them")
+        vectors[missing] = encoder([texts[i] for i in missing])
+    return vectors
@@ -0,0 +1,99 @@
+"""
+Semantic search over the Q&A pairs of generalInfo/retail/useful-info.json.
+
+Every FAQ question is embedded once per load of the file (see embeddings.py)
+into an L2-normalized float32 matrix; a query is one encode plus one
+matrix-vector product, and the top k rows are picked with argpartition.
+faq_catalog reloads the file, and so the matrix, when it changes on disk.
+Vectors precomputed by supporting/build_embeddings.py are taken from the
+sidecar files next to the JSON; only questions missing there are encoded.
+
+Hits at or above the encoder's direct-answer similarity are close enough to
+answer a Kyrgyz message with the stored answer without asking Gemini at all.
+The answers are Kyrgyz only, so other messages go through the search_faq
+tool, whose results are localized like the rest of the product text.
+"""
+
+import logging
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from embeddings import EmbeddingStore, TrigramEncoder, default_encoder, encode_with_store
+from product_catalog import CatalogFile, RETAIL_DIR
+
+FAQ_TOP_K = int(os.environ.get("FAQ_TOP_K", "3"))
+# Hits below this are not worth showing at all
+FAQ_MIN_SIMILARITY = float(os.environ.get("FAQ_MIN_SIMILARITY", "0.35"))
+# A direct answer skips Gemini, so it needs a score that rewordings of a
+# question reach and other questions do not. Character trigrams only see
+# spelling: distinct useful-info.json questions score up to 0.955 against each
+# other, so with trigrams only near-exact repeats are answered directly.
+DIRECT_ANSWER_SIMILARITY = {"sentence": 0.92, "trigrams": 0.97}
+# Overrides both when set
+FAQ_DIRECT_ANSWER_SIMILARITY = os.environ.get("FAQ_DIRECT_ANSWER_SIMILARITY")
+FAQ_PATH = RETAIL_DIR / "useful-info.json"
+
+FaqEntry = namedtuple("FaqEntry", ["section", "question", "answer"])
+FaqHit = namedtuple("FaqHit", ["score", "entry"])
+
+# Letters and frequent words that Russian does not have
+KYRGYZ_LETTERS = re.compile(r"[ңөүҢӨҮ]")
+KYRGYZ_WORDS = frozenset([
+    "кантип", "канча", "кайда", "качан", "эмне", "эмнеге", "кайсы", "кандай", "барбы", "болобу", "болот",
+    "керек", "кылса", "кылам", "менин", "мага", "жана", "жок", "бар", "алсам", "ачам", "салам",
+])
+
+
+def is_kyrgyz(text: str) -> bool:
+    if KYRGYZ_LETTERS.search(text):
+        return True
+    return any(word in KYRGYZ_WORDS for word in re.findall(r"\w+", text.lower()))
+
+
+def direct_answer_similarity(encoder) -> float:
+    if FAQ_DIRECT_ANSWER_SIMILARITY:
+        return float(FAQ_DIRECT_ANSWER_SIMILARITY)
+    return DIRECT_ANSWER_SIMILARITY["trigrams" if isinstance(encoder, TrigramEncoder) else "sentence"]
+
+
+class FaqIndex:
+    def __init__(self, sections, encoder, store=None):
+        self.encoder = encoder
+        self.direct_answer_similarity = direct_answer_similarity(encoder)
+        self.entries = [
+            FaqEntry(section, qa["question"], qa["answer"])
+            for section, pairs in sections.items()
+            for qa in pairs
+            if qa.get("question") and qa.get("answer")
+        ]
+        self.matrix = encode_with_store(encoder, [entry.question for entry in self.entries], store)
+
+    def search(self, query: str, k: int = FAQ_TOP_K, min_similarity: float = FAQ_MIN_SIMILARITY):
+        """Up to k FaqHit, most similar first"""
+        if not self.entries or not query.strip():
+            return []
+        scores = self.matrix @ self.encoder([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [FaqHit(float(scores[i]), self.entries[i]) for i in top if scores[i] >= min_similarity]
+
+    def direct_answer(self, query: str):
+        """The FaqHit that answers a Kyrgyz message as it is, or None"""
+        if not is_kyrgyz(query):
+            return None
+        hits = self.search(query, k=1, min_similarity=self.direct_answer_similarity)
+        return hits[0] if hits else None
+
+
+def build_faq_index(sections):
+    index = FaqIndex(sections, default_encoder(), EmbeddingStore(FAQ_PATH))
+    logging.info(f"FAQ index: {len(index.entries)} questions embedded with {index.encoder.name}, "
+                 f"direct answers at similarity >= {index.direct_answer_similarity}")
+    return index
+
+
+faq_catalog = CatalogFile(FAQ_PATH, "useful-info", build_index=build_faq_index)
@@ -654,9 +654,9 @@ gemini_function_schemas = {
                     "description": "Сунуштук критерийлери",
                     "properties": {
                         "currency": {"type": "string", "description": "Валюта"},
-                        "min_amount": {"type": "string", "description": "Минималдык сумма"},
-                        "term": {"type": "string", "description": "Мөөнөт"},
-                        "rate_preference": {"type": "string", "description": "Пайыздык ставка талабы"},
+                        "min_amount": {"type": "string", "description": "Кардар сала турган сумма, мисалы \"5000 сом\" же \"100 USD\""},
+                        "term": {"type": "string", "description": "Мөөнөт, мисалы \"12 ай\" же \"1 жыл\""},
+                        "rate_preference": {"type": "string", "description": "Пайыздык ставка талабы, мисалы \"12%\" (жок дегенде) же \"15%га чейин\""},
                         "replenishment_needed": {"type": "boolean", "description": "Толуктоо керекпи"},
                         "capitalization_needed": {"type": "boolean", "description": "Капитализация керекпи"}
                     }
@@ -698,5 +698,17 @@ gemini_function_schemas = {
             },
             "required": []
         }
+    },
+    "search_faq": {
+        "name": "search_faq",
+        "description": "Банктын көп берилүүчү суроолорунан (карталар, насыялар, интернет-банкинг, депозиттер, салыктар) суроого жакын жоопторду издейт.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Колдонуучунун суроосу"},
+                "language": {"type": "string", "description": "Язык ответа (ky, ru, en)", "enum": ["ky", "ru", "en"]}
+            },
+            "required": ["query"]
+        }
     }
 }
@@ -3,22 +3,44 @@ import os
 import dotenv
 dotenv.load_dotenv()
 
+import hashlib
 import logging
 import re
 import asyncio
+import time
 import json
+import uuid
 import httpx
 from google import genai
-from google.genai import types
-from app import db
+from google.genai import errors, types
+from app import app, db
 from sqlalchemy import func
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from gemini_function_schemas import gemini_function_schemas
+import tool_dispatch
+from response_templates import (
+    ChatReply, DEFAULT_LANGUAGE, RENDER_FAQ, RENDER_LLM, RENDER_LLM_TOOLS, RENDER_TEMPLATE, RENDER_TEMPLATE_CACHED, RENDER_TEMPLATE_LLM,
+    fill_free_text, free_text_fragments, normalize_language, render,
+)
+from translation_cache import translation_cache
+from context_cache import CONTEXT_CACHE_ENABLED, ContextCache
+from faq_index import faq_catalog
+from intent_router import ALL_TOOLS, route_tools, tool_declarations
+import worker_loop
 
-# Initialize Gemini client and model name
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+# Initialize Gemini client and model name; GEMINI_BASE_URL points it at another endpoint (e.g. a local fake)
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
+client = genai.Client(
+    api_key=os.getenv("GEMINI_API_KEY"),
+    http_options=types.HttpOptions(base_url=GEMINI_BASE_URL) if GEMINI_BASE_URL else None,
+)
 MODEL_NAME = "gemini-2.5-flash"
+CHAT_GENERATION_PARAMS = dict(max_output_tokens=1000, temperature=0.7)
+# Rounds of tool calls fed back to the model before the tool results are returned as they are
+MAX_TOOL_STEPS = int(os.environ.get("GEMINI_MAX_TOOL_STEPS", "3"))
+# Product text fragments per translation request
+TRANSLATION_BATCH_SIZE = int(os.environ.get("TRANSLATION_BATCH_SIZE", "40"))
+
+NO_RESPONSE_MESSAGE = "Кечиресиз, азыр жооп берүүдө кыйынчылык жаралууда. Кайра аракет кылыңыз же банкка түздөн-түз кайрылыңыз."
+ERROR_MESSAGE = "Кечиресиз, техникалык ката кетти. Бир аздан кийин кайра аракет кылыңыз же банкка түздөн-түз кайрылыңыз."
 
 # In-memory store for pending transfers: {user_id: {"to_name": ..., "amount": ...}}
 pending_transfers = {}
@@ -34,15 +56,30 @@ class BankingChatbot:
             "Колдонуучунун атын жоопторуңда жумшак жана досчолуктуу жол менен колдон."
             "МААНИЛҮҮ: user кайсыл тилде жазса, ошол тилде жооп бер."
         )
+        # The instruction is the same for every user (the name comes with the profile),
+        # so together with the tool schemas it is served from the Gemini context cache
+        self.system_instruction = self.system_prompt.format(user_name="<Аты>")
+        # {frozenset of tool names: ContextCache}, at most one per tool subset intent_router picks.
+        # Only the full tool set is uploaded (one cached content per deployment): routed
+        # subsets are about a quarter of the schema and go inline, so rarely used subsets
+        # never hold billed caches of the same system prompt.
+        self.context_caches = {}
+
+    def context_cache_for(self, user_message):
+        """Context cache holding the system instruction and the tools intent_router offers for the message"""
+        tool_names = route_tools(user_message) or ALL_TOOLS
+        cache = self.context_caches.get(tool_names)
+        if cache is None:
+            tools = [{"function_declarations": tool_declarations(tool_names)}]
+            enabled = CONTEXT_CACHE_ENABLED and tool_names == ALL_TOOLS
+            cache = self.context_caches.setdefault(
+                tool_names, ContextCache(client, MODEL_NAME, self.system_instruction, tools, enabled=enabled))
+        logging.info(f"Offering {len(tool_names)} of {len(ALL_TOOLS)} tools")
+        return cache
     
     def build_prompt(self, conversation_history, user_message, user):
         prompt_lines = []
-        # System prompt with MCP instruction and user name
-        if user and user.name:
-            system_prompt = self.system_prompt.format(user_name=user.name)
-        else:
-            system_prompt = self.system_prompt.format(user_name="колдонуучу")
-        prompt_lines.append(system_prompt)
+        # The system instruction is sent separately (see _generation_request)
         # Structured static user profile
         if user:
             accounts = ", ".join([f"{a.account_type}" for a in user.accounts])
@@ -62,47 +99,148 @@ class BankingChatbot:
         prompt_lines.append(f"User: {user_message}")
         return prompt_lines
 
-    async def translate_format_text(self, text: str, target_lang: str = "ky") -> str:
-        # Маппинг кодов языков для Gemini
+    async def translate_fragments(self, fragments, target_lang: str = "ky") -> dict:
+        """
+        Translate Kyrgyz product text fragments, from translation_cache when possible.
+        Returns ({fragment: translation}, whether Gemini was called); fragments that
+        could not be translated map to themselves.
+        """
+        fragments = list(dict.fromkeys(fragments))
+        target_lang = normalize_language(target_lang)
+        if not fragments or target_lang == DEFAULT_LANGUAGE:
+            return {f: f for f in fragments}, False
+
+        translations = await asyncio.to_thread(translation_cache.get_many, fragments, target_lang)
+        missing = [f for f in fragments if f not in translations]
+        batches = [missing[start:start + TRANSLATION_BATCH_SIZE]
+                   for start in range(0, len(missing), TRANSLATION_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *[self._translate_batch(batch, target_lang) for batch in batches], return_exceptions=True
+        )
+        translated = {}
+        for result in results:
+            if isinstance(result, Exception):
+                logging.warning(f"Fragment translation failed, keeping Kyrgyz text: {result}")
+            else:
+                translated.update(result)
+        if translated:
+            await asyncio.to_thread(translation_cache.put_many, translated, target_lang)
+            translations.update(translated)
+        return {f: translations.get(f, f) for f in fragments}, bool(missing)
+
+    async def _translate_batch(self, fragments, target_lang: str) -> dict:
+        """One generate_content call for a JSON array of fragments (see translation_cache.PROMPT_VERSION)"""
         lang_mapping = {
             'ky': 'kyrgyz',
-            'ru': 'russian', 
+            'ru': 'russian',
             'en': 'english'
         }
-        
-        target_lang_name = lang_mapping.get(target_lang, target_lang)
         prompt = [
-            f"translate my meaning to {target_lang_name} and return only 1 translation.",
-            "Give the comparison only. No explanations, no introductions, no phrases like 'Below is...' or 'The following...",
-            "also format text to easy-read to person:",
-            "When formatting lists, dictionaries, or structured data:",
-            "- Use bullet points (•) for lists",
-            "- Use numbered lists (1., 2., 3.) for steps or rankings", 
-            "- Use clear headings with emojis for sections",
-            "- Format currency amounts clearly (e.g., '1,000 сом', '500 USD')",
-            "- Use tables or structured format for comparisons",
-            "- Add spacing between sections for better readability",
-            "- Use bold text (**text**) for important information",
-            "- Format percentages clearly (e.g., '15% жылдык')",
-            f"Return only the formatted text without any additional explanations:\n\n{text}"
+            f"Translate each string of this JSON array from Kyrgyz to {lang_mapping[target_lang]}.",
+            "Keep numbers, currency codes, product and brand names unchanged.",
+            "Return only a JSON array of the translations, in the same order and of the same length:",
+            json.dumps(fragments, ensure_ascii=False),
         ]
+        config = types.GenerateContentConfig(
+            max_output_tokens=8000,
+            temperature=0.2,
+            response_mime_type="application/json",
+        )
+        response = await client.aio.models.generate_content(
+            model="gemini-2.0-flash",
+            contents=prompt,
+            config=config
+        )
+        translations = json.loads(response.text)
+        if not isinstance(translations, list) or len(translations) != len(fragments):
+            raise ValueError(f"expected {len(fragments)} translations, got {translations!r}")
+        return {f: str(t) for f, t in zip(fragments, translations)}
+
+    async def localize_tool_result(self, result: str, target_language: str) -> ChatReply:
+        """
+        Tool results are already rendered in the target language; only the marked
+        product text fragments (if any) are translated, from the cache or by the LLM.
+        """
+        fragments = free_text_fragments(result)
+        if not fragments:
+            return ChatReply(fill_free_text(result), RENDER_TEMPLATE)
+        translations, used_llm = await self.translate_fragments(fragments, target_language)
+        render_path = RENDER_TEMPLATE_LLM if used_llm else RENDER_TEMPLATE_CACHED
+        return ChatReply(fill_free_text(result, translations), render_path)
+
+
+    def _generation_request(self, user_message, conversation_history, user, context_cache, cached_content_name=None):
+        messages = self.build_prompt(conversation_history, user_message, user)
+        config = context_cache.request_config(cached_content_name, **CHAT_GENERATION_PARAMS)
+        return dict(model=MODEL_NAME, contents=messages, config=config)
+
+    def _cache_rejected(self, request, context_cache, error):
+        """
+        True if `request` referenced cached content and the API refused it; the
+        request is then switched to the inline prompt so the caller can resend it.
+        """
+        name = request["config"].cached_content
+        if not name or not isinstance(error, errors.ClientError) or error.code not in (400, 403, 404):
+            return False
+        logging.warning(f"Gemini rejected context cache {name} ({error}), resending the prompt inline")
+        context_cache.invalidate(name)
+        request["config"] = context_cache.request_config(None, **CHAT_GENERATION_PARAMS)
+        return True
+
+    async def _generate(self, request, context_cache):
+        """generate_content for a chat request, falling back to the inline prompt once"""
         try:
-            config = types.GenerateContentConfig(
-                max_output_tokens=2000,
-                temperature=0.6,
-            )
-            print("prompt", prompt)
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-                config=config
-            )
-            print("response", response)
-            return response.text.strip()
+            response = await client.aio.models.generate_content(**request)
+        except Exception as e:
+            if not self._cache_rejected(request, context_cache, e):
+                raise
+            response = await client.aio.models.generate_content(**request)
+        context_cache.record_usage(response, request["config"].cached_content)
+        return response
+
+    def _generate_stream(self, request, context_cache):
+        """generate_content_stream for a chat request, falling back to the inline prompt before the first chunk"""
+        try:
+            stream = iter(client.models.generate_content_stream(**request))
+            chunk = next(stream, None)
         except Exception as e:
-            print(f"Ошибка перевода: {e}")
-            return text
+            if not self._cache_rejected(request, context_cache, e):
+                raise
+            stream = iter(client.models.generate_content_stream(**request))
+            chunk = next(stream, None)
+        last = None
+        while chunk is not None:
+            last = chunk
+            yield chunk
+            chunk = next(stream, None)
+        if last is not None:
+            # Usage metadata of a stream arrives with its last chunk
+            context_cache.record_usage(last, request["config"].cached_content)
+
+    @staticmethod
+    def _unwrap_text(response_text: str) -> str:
+        """The model sometimes answers with {"language": ..., "text": ...}; return just the text"""
+        try:
+            parsed_response = json.loads(response_text)
+            if 'language' in parsed_response and 'text' in parsed_response:
+                return parsed_response['text']
+        except (json.JSONDecodeError, TypeError):
+            # Если не JSON, возвращаем как есть
+            pass
+        return response_text
 
+    def faq_answer(self, user_message: str):
+        """The stored answer of a FAQ question the message (nearly) repeats, or None"""
+        try:
+            hit = faq_catalog.index().direct_answer(user_message)
+        except Exception as e:
+            # The FAQ only short-cuts the model; without it the question goes to Gemini as usual
+            logging.exception(f"FAQ lookup failed: {e}")
+            return None
+        if hit is None:
+            return None
+        logging.info(f"Answered from the FAQ ({hit.score:.2f}): {hit.entry.question}")
+        return ChatReply(hit.entry.answer, RENDER_FAQ)
 
     def get_response(self, user_message: str, conversation_history: list = None, user=None) -> str:
         """
@@ -114,80 +252,201 @@ class BankingChatbot:
         Returns:
             The AI's response in user's language
         """
+        return worker_loop.run(self.get_response_async(user_message, conversation_history, user), app=app)
+
+    async def get_response_async(self, user_message: str, conversation_history: list = None, user=None) -> str:
+        """get_response for callers already on the worker loop"""
+        turn_id = str(uuid.uuid4())
         try:
-            messages = self.build_prompt(conversation_history, user_message, user)
-            tools = [{"function_declarations": list(gemini_function_schemas.values())}]
-            config = types.GenerateContentConfig(
-                max_output_tokens=1000,
-                temperature=0.7,
-                tools=tools
-            )
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=messages,
-                config=config
-            )
+            reply = await asyncio.to_thread(self.faq_answer, user_message)
+            if reply is not None:
+                return reply
+            context_cache = self.context_cache_for(user_message)
+            cached_content_name = await context_cache.cached_content_name()
+            request = self._generation_request(
+                user_message, conversation_history, user, context_cache, cached_content_name)
+            started = time.perf_counter()
+            response = await self._generate(request, context_cache)
+            logging.info(f"Chat turn {turn_id[:8]} step 0: model {(time.perf_counter() - started) * 1000:.0f} ms")
             logging.debug(f"Gemini raw response: {response}")
             
             # Сначала проверяем function calls
-            for candidate in response.candidates:
-                content = candidate.content
-                for part in content.parts:
-                    if hasattr(part, 'function_call') and part.function_call:
-                        logging.debug(f"Function call part: {part.function_call}")
-                        return self.handle_gemini_function_call(user, part.function_call)
+            model_content, function_calls = self._function_calls(response)
+            if len(function_calls) == 1:
+                # One tool answers the question: its rendered result is the reply, no second model call
+                return await self.handle_function_call_async(
+                    user, function_calls[0], idempotency_key=self._call_key(turn_id, function_calls[0]))
+            if function_calls:
+                return await self._compose_with_tools(
+                    request, context_cache, user, model_content, function_calls, turn_id)
             
             # Затем проверяем текстовые ответы
-            for candidate in response.candidates:
-                content = candidate.content
-                for part in content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        response_text = part.text.strip()
-                        
-                        # Пытаемся распарсить JSON ответ
-                        try:
-                            parsed_response = json.loads(response_text)
-                            if 'language' in parsed_response and 'text' in parsed_response:
-                                return parsed_response['text']
-                        except json.JSONDecodeError:
-                            # Если не JSON, возвращаем как есть
-                            pass
-                        
-                        return response_text
+            text = self._response_text(response)
+            if text:
+                return ChatReply(self._unwrap_text(text), RENDER_LLM)
             
             logging.error(f"No valid response from Gemini: {response}")
-            return "Кечиресиз, азыр жооп берүүдө кыйынчылык жаралууда. Кайра аракет кылыңыз же банкка түздөн-түз кайрылыңыз."
+            return ChatReply(NO_RESPONSE_MESSAGE, RENDER_LLM)
         except Exception as e:
             logging.exception(f"Error getting Gemini response: {e}")
-            return "Кечиресиз, техникалык ката кетти. Бир аздан кийин кайра аракет кылыңыз же банкка түздөн-түз кайрылыңыз."
+            return ChatReply(ERROR_MESSAGE, RENDER_LLM)
+
+    @staticmethod
+    def _function_calls(response):
+        """(model content, [function_call, ...]) of the first candidate that calls tools"""
+        for candidate in response.candidates or []:
+            content = candidate.content
+            calls = [part.function_call for part in (content.parts if content else None) or []
+                     if getattr(part, 'function_call', None)]
+            if calls:
+                return content, calls
+        return None, []
+
+    @staticmethod
+    def _response_text(response):
+        for candidate in response.candidates or []:
+            content = candidate.content
+            for part in (content.parts if content else None) or []:
+                if getattr(part, 'text', None):
+                    return part.text.strip()
+        return None
+
+    @staticmethod
+    def _call_key(turn_id, function_call):
+        """
+        Idempotency key of a tool call within one chat turn: the model repeating
+        the same transfer in a later step must not debit twice.
+        """
+        args = dict(getattr(function_call, 'args', None) or {})
+        raw = f"{turn_id}:{function_call.name}:{json.dumps(args, sort_keys=True, default=str)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def _compose_with_tools(self, request, context_cache, user, model_content, function_calls, turn_id):
+        """
+        Run the model's function calls concurrently and send the results back as
+        function responses until it answers in text, for at most MAX_TOOL_STEPS
+        rounds of tool calls. If the budget runs out, the last tool results are the reply.
+        """
+        # A copy, so that _generate can switch it to the inline prompt for the remaining steps
+        request = dict(request, contents=list(request["contents"]))
+        contents = request["contents"]
+        results = []
+        for step in range(1, MAX_TOOL_STEPS + 1):
+            started = time.perf_counter()
+            results = await asyncio.gather(*[
+                self.handle_function_call_async(user, call, idempotency_key=self._call_key(turn_id, call))
+                for call in function_calls
+            ])
+            tools_ms = (time.perf_counter() - started) * 1000
+            contents.append(model_content)
+            contents.append(types.Content(role="user", parts=[
+                types.Part.from_function_response(name=call.name, response={"result": str(result)})
+                for call, result in zip(function_calls, results)
+            ]))
+
+            started = time.perf_counter()
+            response = await self._generate(request, context_cache)
+            logging.info(f"Chat turn {turn_id[:8]} step {step}: tools {[c.name for c in function_calls]} "
+                         f"{tools_ms:.0f} ms, model {(time.perf_counter() - started) * 1000:.0f} ms")
+
+            model_content, function_calls = self._function_calls(response)
+            if not function_calls:
+                text = self._response_text(response)
+                if text:
+                    return ChatReply(self._unwrap_text(text), RENDER_LLM_TOOLS)
+                break
+        else:
+            logging.warning(f"Chat turn {turn_id[:8]}: tool budget of {MAX_TOOL_STEPS} steps exhausted")
+        paths = {result.render_path for result in results}
+        render_path = next((p for p in (RENDER_TEMPLATE_LLM, RENDER_TEMPLATE_CACHED) if p in paths), RENDER_TEMPLATE)
+        return ChatReply("\n\n".join(results), render_path)
+
+    def stream_response(self, user_message: str, conversation_history: list = None, user=None):
+        """
+        Streaming variant of get_response. Yields (event, data) pairs:
+            ("progress", {"tool": name})  - a tool is about to be called
+            ("delta", {"text": chunk})    - next piece of the answer text
+            ("reply", ChatReply)          - the complete answer, always last
+        """
+        chunks = []
+        # A JSON-wrapped answer can only be unwrapped once complete, so it is held back
+        held_back = None
+        turn_id = str(uuid.uuid4())
+        try:
+            reply = self.faq_answer(user_message)
+            if reply is not None:
+                yield "delta", {"text": str(reply)}
+                yield "reply", reply
+                return
+            context_cache = self.context_cache_for(user_message)
+            cached_content_name = worker_loop.run(context_cache.cached_content_name())
+            request = self._generation_request(
+                user_message, conversation_history, user, context_cache, cached_content_name)
+            for chunk in self._generate_stream(request, context_cache):
+                model_content, function_calls = self._function_calls(chunk)
+                if function_calls:
+                    for call in function_calls:
+                        yield "progress", {"tool": call.name}
+                    if len(function_calls) == 1:
+                        reply = self.handle_gemini_function_call(
+                            user, function_calls[0], idempotency_key=self._call_key(turn_id, function_calls[0]))
+                    else:
+                        reply = worker_loop.run(self._compose_with_tools(
+                            request, context_cache, user, model_content, function_calls, turn_id), app=app)
+                    yield "delta", {"text": str(reply)}
+                    yield "reply", reply
+                    return
+                for candidate in chunk.candidates or []:
+                    if not candidate.content:
+                        continue
+                    for part in candidate.content.parts or []:
+                        if getattr(part, 'text', None):
+                            chunks.append(part.text)
+                            if held_back is None and "".join(chunks).strip():
+                                held_back = "".join(chunks).lstrip().startswith("{")
+                                if not held_back:
+                                    yield "delta", {"text": "".join(chunks).lstrip()}
+                                continue
+                            if held_back is False:
+                                yield "delta", {"text": part.text}
+        except Exception as e:
+            logging.exception(f"Error streaming Gemini response: {e}")
+            reply = ChatReply(ERROR_MESSAGE, RENDER_LLM)
+            yield "delta", {"text": reply}
+            yield "reply", reply
+            return
+
+        text = "".join(chunks).strip()
+        if not text:
+            logging.error("No valid response from Gemini stream")
+            text = NO_RESPONSE_MESSAGE
+            yield "delta", {"text": text}
+        elif held_back:
+            text = self._unwrap_text(text)
+            yield "delta", {"text": text}
+        yield "reply", ChatReply(text, RENDER_LLM)
 
     async def call_mcp_tool(self, tool_name: str, **kwargs):
         """
-        Call an MCP tool using the standard MCP client
+        Call an MCP tool, either in-process or through the per-worker MCP session pool
         """
         try:
-            # Configure MCP server parameters
-            server_params = StdioServerParameters(
-                command="python",
-                args=["banking_mcp_server.py"],
-                env={}
-            )
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    # Call the tool
-                    result = await session.call_tool(tool_name, arguments=kwargs)
-                    return result.content[0].text if result.content else "No result"
+            result = await tool_dispatch.call_tool(tool_name, kwargs)
+            return result.content[0].text if result.content else "No result"
         except Exception as e:
             logging.exception(f"Error calling MCP tool {tool_name}: {e}")
-            return f"Кечиресиз, {tool_name} функциясы ишке ашкан жок."
+            return render("tool_failed", kwargs.get("language", DEFAULT_LANGUAGE), tool=tool_name)
 
-    def handle_gemini_function_call(self, user, function_call):
+    def handle_gemini_function_call(self, user, function_call, idempotency_key=None):
         """
         Handle function_call from Gemini: calls the appropriate MCP tool and returns the result.
         function_call: dict or object with keys 'name' and 'parameters' or 'args'.
         Returns a string response for the user.
         """
+        return worker_loop.run(self.handle_function_call_async(user, function_call, idempotency_key), app=app)
+
+    async def handle_function_call_async(self, user, function_call, idempotency_key=None):
+        """handle_gemini_function_call for callers already on the worker loop"""
         try:
             logging.info(f"Function call received: {function_call}")
             # Try to extract function name robustly
@@ -208,8 +467,8 @@ class BankingChatbot:
 
             logging.debug(f"Function name: {name}, params: {params}")
 
-            # Extract language parameter
-            target_language = params.get('language', 'ky')
+            # Extract language parameter; tools render their results in it directly
+            target_language = normalize_language(params.get('language'))
             logging.info(f"Target language: {target_language}")
 
             # General tool-call block
@@ -229,12 +488,16 @@ class BankingChatbot:
                             mcp_params[key] = int(value)
                         elif key == 'amount':
                             mcp_params[key] = float(value)
-                        elif key != 'language':  # Исключаем language из MCP параметров
+                        elif key != 'language':
                             mcp_params[key] = str(value)
-                result = asyncio.run(self.call_mcp_tool(name, **mcp_params))
-                # Переводим результат на целевой язык
-                result = asyncio.run(self.translate_format_text(result, target_language))
-                return result  
+                mcp_params['language'] = target_language
+                if name == 'transfer_money':
+                    # One key per function call: a retried tool call (e.g. after the
+                    # MCP session dies mid-call) cannot debit twice
+                    mcp_params['idempotency_key'] = (
+                        idempotency_key or getattr(function_call, 'id', None) or str(uuid.uuid4()))
+                result = await self.call_mcp_tool(name, **mcp_params)
+                return await self.localize_tool_result(result, target_language)
             elif name in [
                 'list_all_card_names', 'get_card_details', 'compare_cards', 'get_card_limits', 'get_card_benefits',
                 'get_card_instructions', 'get_card_conditions', 'get_cards_with_features', 'get_card_recommendations',
@@ -244,35 +507,28 @@ class BankingChatbot:
                 'list_all_deposit_names', 'get_deposit_details', 'compare_deposits', 'get_deposits_by_currency',
                 'get_deposits_by_term_range', 'get_deposits_by_min_amount', 'get_deposits_by_rate_range',
                 'get_deposits_with_replenishment', 'get_deposits_with_capitalization', 'get_deposits_by_withdrawal_type',
-                'get_deposit_recommendations', 'get_government_securities', 'get_child_deposits', 'get_online_deposits'
+                'get_deposit_recommendations', 'get_government_securities', 'get_child_deposits', 'get_online_deposits',
+                'search_faq'
             ]:  
-                # Убираем language из параметров для MCP
-                mcp_params = {k: v for k, v in params.items() if k != 'language'}
-                result = asyncio.run(self.call_mcp_tool(name, **mcp_params))
-
-                # Переводим результат на целевой язык
-                result = asyncio.run(self.translate_format_text(result, target_language))
-                return result
+                mcp_params = dict(params, language=target_language)
+                result = await self.call_mcp_tool(name, **mcp_params)
+                return await self.localize_tool_result(result, target_language)
             else:
                 logging.error(f"Unknown function call name: {name}")
-                error_msg = "Түшүнүксүз функциялык чакыруу."
-                if target_language != 'ky':
-                    error_msg = asyncio.run(self.translate_format_text(error_msg, target_language))
-                return error_msg
+                return ChatReply(render("unknown_function", target_language), RENDER_TEMPLATE)
         except Exception as e:
             logging.exception(f"Exception in handle_gemini_function_call: {e}, function_call: {function_call}")
-            error_msg = "Кечиресиз, функциялык чакыруу ишке ашкан жок. Кайра аракет кылыңыз же банкка кайрылыңыз."
             # Пытаемся получить язык из параметров
+            target_language = DEFAULT_LANGUAGE
             try:
-                params = getattr(function_call, 'parameters', None) or function_call.get('parameters', {})
+                params = getattr(function_call, 'parameters', None) or getattr(function_call, 'args', None) \
+                    or function_call.get('parameters', {})
                 if hasattr(params, 'items'):
                     params = dict(params.items())
-                target_language = params.get('language', 'ky')
-                if target_language != 'ky':
-                    error_msg = asyncio.run(self.translate_format_text(error_msg, target_language))
-            except:
+                target_language = normalize_language(params.get('language'))
+            except Exception:
                 pass
-            return error_msg
+            return ChatReply(render("function_call_failed", target_language), RENDER_TEMPLATE)
 
 
 # Create a global instance
@@ -0,0 +1,13 @@
+# gunicorn.conf.py
+"""
+Gunicorn hooks, read from the working directory by every gunicorn command in
+.replit. Command-line flags still take precedence over settings here.
+"""
+
+
+def post_worker_init(worker):
+    # Embed the FAQ (loading the sentence model, if installed) before the worker
+    # takes requests. Only web workers pay for it: MCP subprocesses, scripts and
+    # benchmarks import app without it and build the index on first use.
+    from faq_index import faq_catalog
+    faq_catalog.index()
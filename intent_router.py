@@ -0,0 +1,132 @@
+"""
+Local intent router: picks the tool groups a chat message is about, so only
+those function declarations are sent to Gemini.
+
+Like QuestionCategorizer, it is a keyword matcher, but over the tool groups of
+gemini_function_schemas.py and with ky/ru/en keywords. A keyword matches as
+the prefix of a word ("карт" matches "картаны", "карты", "cards"); prefixes
+are matched against the words as written, since text_index.stem would
+conflate e.g. "балдар" and "баланс". Weak keywords ("банк") only count when
+no strong keyword matched. When no group matches, or more than
+MAX_ROUTED_INTENTS do, the router is not sure and every tool is offered.
+The FAQ search (ALWAYS_OFFERED) comes with every subset: the FAQ covers
+questions about most products, so the model can fall back on it when the
+subset has no better tool.
+Accuracy over labeled ky/ru/en questions: supporting/eval_intent_router.py.
+"""
+
+import os
+import unicodedata
+from typing import FrozenSet, Optional
+
+from gemini_function_schemas import gemini_function_schemas
+from text_index import WORD_RE
+
+INTENT_ROUTER_ENABLED = os.environ.get("INTENT_ROUTER", "1") != "0"
+MAX_ROUTED_INTENTS = int(os.environ.get("INTENT_ROUTER_MAX_INTENTS", "2"))
+
+INTENT_TOOLS = {
+    "personal": [
+        "get_balance", "get_transactions", "transfer_money", "get_last_incoming_transaction",
+        "get_accounts_info", "get_incoming_sum_for_period", "get_outgoing_sum_for_period",
+        "get_last_3_transfer_recipients", "get_largest_transaction",
+    ],
+    "cards": [
+        "list_all_card_names", "get_card_details", "compare_cards", "get_card_limits", "get_card_benefits",
+        "get_cards_by_type", "get_cards_by_payment_system", "get_cards_by_fee_range", "get_cards_by_currency",
+        "get_card_instructions", "get_card_conditions", "get_cards_with_features", "get_card_recommendations",
+    ],
+    "deposits": [
+        "list_all_deposit_names", "get_deposit_details", "compare_deposits", "get_deposits_by_currency",
+        "get_deposits_by_term_range", "get_deposits_by_min_amount", "get_deposits_by_rate_range",
+        "get_deposits_with_replenishment", "get_deposits_with_capitalization", "get_deposits_by_withdrawal_type",
+        "get_deposit_recommendations", "get_government_securities", "get_child_deposits", "get_online_deposits",
+    ],
+    "about_us": [
+        "get_bank_info", "get_bank_mission", "get_bank_values", "get_ownership_info", "get_branch_network",
+        "get_contact_info", "get_complete_about_us", "get_about_us_section",
+    ],
+    "faq": ["search_faq"],
+}
+ALWAYS_OFFERED = frozenset(["search_faq"])
+
+INTENT_KEYWORDS = {
+    "personal": [
+        # ky
+        "баланс", "эсеп", "эсеб", "акча", "акчам", "котор", "жибер", "транзакц", "кирген", "келген", "чыккан",
+        "сарпта", "короттум", "алуучу", "калды", "төлөм",
+        # ru
+        "счет", "счёт", "счета", "перев", "отправ", "операци", "поступ", "пришл", "пришед", "входящ", "исходящ",
+        "потрат", "трат", "деньг", "остат", "получател",
+        # en
+        "balance", "account", "transfer", "send", "sent", "transaction", "spent", "spend", "incoming",
+        "outgoing", "money", "received", "recipient",
+    ],
+    "cards": [
+        "карт", "visa", "виза", "mastercard", "мастеркард", "elkart", "элкарт", "лимит", "limit", "кешбэк",
+        "cashback", "дебет", "debit", "кредитн", "credit", "бесконтакт", "контактсыз", "contactless",
+        "виртуал", "virtual", "card", "банкомат", "atm",
+    ],
+    "deposits": [
+        "депозит", "deposit", "вклад", "салым", "пайыз", "процент", "ставк", "rate", "interest",
+        "капитализац", "capitaliz", "толукто", "пополн", "replenish", "мөөнөт", "срок", "term",
+        "кагаз", "бумаг", "securit", "treasury", "казначейск", "nbkr", "нбкр", "балдар", "балага",
+        "детск", "ребен", "child", "kid", "сактоо", "накоп", "savings",
+    ],
+    "about_us": [
+        "миссия", "миссиясы", "mission", "баалуулук", "ценност", "values", "ээлик", "ээси", "владел", "owner",
+        "акционер", "shareholder", "филиал", "branch", "байланыш", "контакт", "contact", "телефон", "phone",
+        "дарек", "адрес", "address", "email", "почт", "лицензи", "license", "негизд", "основан", "founded",
+        "тарых", "истори", "history", "кеңсе", "офис", "office",
+    ],
+    "faq": [
+        # ky
+        "насыя", "ипотек", "салык", "айып", "интернет", "мобилд", "тиркеме", "сырсөз", "парол", "каттал",
+        "документ",
+        # ru
+        "займ", "налог", "штраф", "мобильн", "приложени", "логин",
+        # en
+        "loan", "mortgage", "tax", "fines", "penalt", "internet", "mobile", "password", "login", "register",
+        "document",
+    ],
+}
+
+WEAK_KEYWORDS = {
+    "about_us": ["банк", "bank", "demirbank", "демирбанк", "demir", "демир"],
+}
+
+ALL_TOOLS = frozenset(gemini_function_schemas)
+
+
+def _words(text: str):
+    return WORD_RE.findall(unicodedata.normalize("NFKC", str(text)).lower())
+
+
+_PREFIXES = {intent: tuple(keywords) for intent, keywords in INTENT_KEYWORDS.items()}
+_WEAK_PREFIXES = {intent: tuple(keywords) for intent, keywords in WEAK_KEYWORDS.items()}
+
+
+def _matches(words, prefixes):
+    return sorted({intent for intent, starts in prefixes.items() for word in words if word.startswith(starts)})
+
+
+def route_intents(text: str):
+    """Sorted names of the intents the message is about; [] when nothing matched"""
+    words = _words(text)
+    return _matches(words, _PREFIXES) or _matches(words, _WEAK_PREFIXES)
+
+
+def route_tools(text: str) -> Optional[FrozenSet[str]]:
+    """Names of the tools to offer for `text`, or None to offer all of them"""
+    if not INTENT_ROUTER_ENABLED:
+        return None
+    intents = route_intents(text)
+    if not intents or len(intents) > MAX_ROUTED_INTENTS:
+        return None
+    return frozenset(name for intent in intents for name in INTENT_TOOLS[intent]) | ALWAYS_OFFERED
+
+
+def tool_declarations(tool_names=None):
+    """Function declarations for `tool_names` (all tools for None), in schema order"""
+    return [schema for name, schema in gemini_function_schemas.items()
+            if tool_names is None or name in tool_names]
@@ -0,0 +1,334 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+import anyio
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+import worker_loop
+
+# Pool settings (per process, i.e. per gunicorn worker)
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "4"))
+MCP_POOL_ACQUIRE_TIMEOUT = float(os.environ.get("MCP_POOL_ACQUIRE_TIMEOUT", "10"))
+MCP_POOL_HEALTH_INTERVAL = float(os.environ.get("MCP_POOL_HEALTH_INTERVAL", "30"))
+MCP_CALL_TIMEOUT = float(os.environ.get("MCP_CALL_TIMEOUT", "30"))
+MCP_HEALTH_TIMEOUT = float(os.environ.get("MCP_HEALTH_TIMEOUT", "3"))
+MCP_RESPAWN_BACKOFF = float(os.environ.get("MCP_RESPAWN_BACKOFF", "1"))
+
+SERVER_PARAMS = StdioServerParameters(
+    command="python",
+    args=["banking_mcp_server.py"],
+    env={}
+)
+
+
+class PoolMetrics:
+    """Counters and wait-time samples for the MCP session pool"""
+
+    def __init__(self, window=1024):
+        self.acquisitions = 0
+        self.acquire_timeouts = 0
+        self.calls = 0
+        self.call_failures = 0
+        self.respawns = 0
+        self.health_checks = 0
+        self.health_failures = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._wait_samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.acquisitions += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+            self._wait_samples.append(seconds)
+
+    def _percentile(self, samples, pct):
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._wait_samples)
+            return {
+                'acquisitions': self.acquisitions,
+                'acquire_timeouts': self.acquire_timeouts,
+                'calls': self.calls,
+                'call_failures': self.call_failures,
+                'respawns': self.respawns,
+                'health_checks': self.health_checks,
+                'health_failures': self.health_failures,
+                'wait_ms_avg': (self.wait_time_total / self.acquisitions * 1000) if self.acquisitions else 0.0,
+                'wait_ms_p50': self._percentile(samples, 50) * 1000,
+                'wait_ms_p99': self._percentile(samples, 99) * 1000,
+                'wait_ms_max': self.wait_time_max * 1000,
+            }
+
+
+class PooledSession:
+    """
+    One warm MCP client session backed by its own banking_mcp_server.py process.
+    The stdio transport and ClientSession contexts are entered and exited by a
+    single owner task, as anyio requires.
+    """
+
+    def __init__(self, server_params):
+        self._server_params = server_params
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task = None
+        self.session = None
+        self.error = None
+
+    @property
+    def alive(self):
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def _run(self):
+        try:
+            async with stdio_client(self._server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self.error = e
+            logging.warning(f"MCP session terminated: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.session is None:
+            raise RuntimeError(f"MCP session failed to start: {self.error}")
+
+    async def ping(self, timeout):
+        await asyncio.wait_for(self.session.send_ping(), timeout)
+
+    async def close(self, timeout=5):
+        self._closing.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except Exception:
+            self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    Bounded pool of warm MCP client sessions.
+
+    At most `size` tool calls are in flight; further callers wait for a free
+    session up to `acquire_timeout` seconds. Broken sessions are replaced in the
+    background and idle sessions are pinged every `health_interval` seconds,
+    one at a time and for at most `health_timeout` seconds each, so a health
+    check never holds more than one session away from callers.
+    Sessions are built by `session_factory(server_params)`, PooledSession by default.
+    """
+
+    def __init__(self, server_params=SERVER_PARAMS, size=MCP_POOL_SIZE,
+                 acquire_timeout=MCP_POOL_ACQUIRE_TIMEOUT, health_interval=MCP_POOL_HEALTH_INTERVAL,
+                 call_timeout=MCP_CALL_TIMEOUT, health_timeout=MCP_HEALTH_TIMEOUT, session_factory=PooledSession):
+        self.server_params = server_params
+        self.session_factory = session_factory
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval
+        self.call_timeout = call_timeout
+        self.health_timeout = health_timeout
+        self.metrics = PoolMetrics()
+        self._idle = None
+        self._sessions = set()
+        self._background = set()
+        self._health_task = None
+        self._closed = False
+
+    async def start(self):
+        self._idle = asyncio.Queue()
+        results = await asyncio.gather(
+            *[self._spawn() for _ in range(self.size)], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"MCP pool: initial session failed: {result}")
+                self._schedule_respawn(None)
+            else:
+                self._idle.put_nowait(result)
+        self._health_task = asyncio.create_task(self._health_loop())
+        logging.info(f"MCP pool started with {self._idle.qsize()}/{self.size} sessions")
+
+    async def _spawn(self):
+        pooled = self.session_factory(self.server_params)
+        await pooled.start()
+        self._sessions.add(pooled)
+        return pooled
+
+    def _schedule_respawn(self, pooled):
+        if self._closed:
+            return
+        task = asyncio.create_task(self._respawn(pooled))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _respawn(self, pooled):
+        if pooled is not None:
+            self._sessions.discard(pooled)
+            await pooled.close()
+        backoff = MCP_RESPAWN_BACKOFF
+        while not self._closed:
+            try:
+                replacement = await self._spawn()
+                self.metrics.respawns += 1
+                self._idle.put_nowait(replacement)
+                return
+            except Exception as e:
+                logging.error(f"MCP pool: respawn failed, retrying in {backoff:.1f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def _health_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            # The queue is FIFO, so each session idle now comes up once
+            for _ in range(self._idle.qsize()):
+                if self._idle.empty():
+                    break
+                pooled = self._idle.get_nowait()
+                self.metrics.health_checks += 1
+                try:
+                    if not pooled.alive:
+                        raise RuntimeError("session is not running")
+                    await pooled.ping(self.health_timeout)
+                    self._idle.put_nowait(pooled)
+                except Exception as e:
+                    self.metrics.health_failures += 1
+                    logging.warning(f"MCP pool: health check failed, respawning: {e}")
+                    self._schedule_respawn(pooled)
+
+    async def _acquire(self):
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        while True:
+            try:
+                pooled = await asyncio.wait_for(self._idle.get(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self.metrics.acquire_timeouts += 1
+                raise TimeoutError(f"No MCP session available after {self.acquire_timeout}s")
+            if pooled.alive:
+                self.metrics.record_wait(time.monotonic() - started)
+                return pooled
+            # Server process died while idle: replace it and keep waiting
+            self._schedule_respawn(pooled)
+
+    async def call_tool(self, tool_name, arguments):
+        # A request written to a dead server's closed pipe was never delivered,
+        # so it is safe to retry once on a fresh session.
+        for attempt in range(2):
+            pooled = await self._acquire()
+            healthy = False
+            try:
+                self.metrics.calls += 1
+                result = await asyncio.wait_for(
+                    pooled.session.call_tool(tool_name, arguments=arguments), self.call_timeout
+                )
+                healthy = True
+                return result
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                self.metrics.call_failures += 1
+                if attempt:
+                    raise
+            except Exception:
+                self.metrics.call_failures += 1
+                raise
+            finally:
+                if healthy and pooled.alive:
+                    self._idle.put_nowait(pooled)
+                else:
+                    self._schedule_respawn(pooled)
+
+    async def close(self):
+        self._closed = True
+        if self._health_task:
+            self._health_task.cancel()
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*[s.close() for s in list(self._sessions)], return_exceptions=True)
+        self._sessions.clear()
+
+
+# Per-process pool running on the worker loop (see worker_loop.py)
+_pool = None
+_owner_pid = None
+_start_task = None
+
+
+async def _started_pool():
+    """The pool of the current process, started on first use. Runs on the worker loop."""
+    global _pool, _owner_pid, _start_task
+    failed = _start_task is not None and _start_task.done() and (
+        _start_task.cancelled() or _start_task.exception() is not None)
+    if _pool is None or _owner_pid != os.getpid() or failed:
+        pool = MCPSessionPool()
+        _pool, _owner_pid = pool, os.getpid()
+        _start_task = asyncio.ensure_future(pool.start())
+    await asyncio.shield(_start_task)
+    return _pool
+
+
+def get_pool():
+    """
+    Return the MCP pool of the current process, starting it on first use.
+    Gunicorn forks workers after import, so the pool is keyed by pid.
+    """
+    return asyncio.run_coroutine_threadsafe(_started_pool(), worker_loop.get_loop()).result()
+
+
+async def _call_tool(tool_name, arguments):
+    pool = await _started_pool()
+    return await pool.call_tool(tool_name, arguments)
+
+
+async def call_tool(tool_name, arguments):
+    """Call an MCP tool through the pool from any event loop"""
+    if worker_loop.on_worker_loop():
+        return await _call_tool(tool_name, arguments)
+    future = asyncio.run_coroutine_threadsafe(_call_tool(tool_name, arguments), worker_loop.get_loop())
+    return await asyncio.wrap_future(future)
+
+
+def call_tool_sync(tool_name, arguments):
+    """Call an MCP tool through the pool from synchronous code"""
+    return worker_loop.run(_call_tool(tool_name, arguments))
+
+
+def get_pool_metrics():
+    if _pool is None or _owner_pid != os.getpid():
+        return None
+    return _pool.metrics.snapshot()
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is None or _owner_pid != os.getpid():
+        return
+    try:
+        worker_loop.run(_pool.close(), timeout=10)
+    except Exception as e:
+        logging.warning(f"MCP pool shutdown failed: {e}")
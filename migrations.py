@@ -0,0 +1,147 @@
+"""
+Schema changes that db.create_all() does not apply to existing tables.
+
+create_all() only creates missing tables, so columns and indexes declared in
+models.py after a table already exists are added here. Every step is idempotent.
+run_migrations is a deploy step (supporting/migrate_db.py), not something to run
+on import: the schema changes hold a database-wide lock and inspect the schema
+again under it, so instances deployed at once never issue the same DDL twice.
+"""
+
+import logging
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+
+from database import db
+
+# pg_advisory_lock key shared by every process that migrates the schema
+MIGRATION_LOCK_KEY = 73_011
+
+
+@contextmanager
+def migration_lock(engine=None):
+    """
+    Connection holding the migration lock: a session-level advisory lock on
+    Postgres (CREATE INDEX CONCURRENTLY needs an autocommit connection), the
+    write lock on SQLite (BEGIN IMMEDIATE; the DDL commits with it).
+    """
+    engine = engine or db.engine
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield conn
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    elif engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+    else:
+        with engine.begin() as conn:
+            yield conn
+
+
+def ensure_columns(conn):
+    """
+    Add columns declared on the models that existing tables lack (nullable
+    only), on a connection from migration_lock. A column another tool added in
+    the meantime counts as added (ADD COLUMN IF NOT EXISTS on Postgres; the
+    SQLite write lock keeps the inspection current).
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+    if_not_exists = "IF NOT EXISTS " if conn.dialect.name == "postgresql" else ""
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            logging.info(f"Adding column {table.name}.{column.name}")
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {if_not_exists}"
+                f"{preparer.format_column(column)} {column.type.compile(conn.dialect)}"
+            ))
+            added.append((table.name, column.name))
+    return added
+
+
+def backfill_user_name_normalized(batch_size=1000):
+    """Normalize the names of users created before name_normalized existed, a batch per commit"""
+    from models import User
+    from recipient_lookup import normalize_person_name
+
+    filled, last_id = 0, 0
+    while True:
+        # Empty names stay unnormalized (see recipient_lookup), so they are not selected
+        users = User.query.filter(User.id > last_id, User.name_normalized.is_(None), User.name.isnot(None),
+                                  User.name != "").order_by(User.id).limit(batch_size).all()
+        if not users:
+            break
+        for user in users:
+            user.name_normalized = normalize_person_name(user.name)
+        db.session.commit()
+        filled, last_id = filled + len(users), users[-1].id
+    if filled:
+        logging.info(f"Backfilled name_normalized for {filled} users")
+    return filled
+
+
+def _invalid_indexes(conn):
+    """Indexes a failed CREATE INDEX CONCURRENTLY left behind (Postgres)"""
+    return set(conn.execute(text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid"
+    )).scalars())
+
+
+def ensure_indexes(conn):
+    """
+    Create every index declared on the models that the database lacks, on a
+    connection from migration_lock. Returns the names of the created indexes.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    postgres = conn.dialect.name == "postgresql"
+    invalid = _invalid_indexes(conn) if postgres else set()
+    preparer = conn.dialect.identifier_preparer
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)} - invalid
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            logging.info(f"Creating index {index.name} on {table.name}")
+            if postgres:
+                if index.name in invalid:
+                    # IF NOT EXISTS would keep the unusable index forever
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {preparer.quote(index.name)}"))
+                # CONCURRENTLY keeps the table writable while a large index builds;
+                # it cannot run inside a transaction block.
+                columns = ", ".join(preparer.quote(c.name) for c in index.columns)
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {preparer.quote(index.name)} "
+                    f"ON {preparer.format_table(table)} ({columns})"
+                ))
+            else:
+                index.create(bind=conn, checkfirst=True)
+            created.append(index.name)
+    return created
+
+
+def run_migrations(engine=None):
+    with migration_lock(engine) as conn:
+        ensure_columns(conn)
+        ensure_indexes(conn)
+    backfill_user_name_normalized()
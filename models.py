@@ -9,6 +9,8 @@ class User(UserMixin, db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=True)          
+    # Case-folded, whitespace-collapsed name for recipient lookup; set by recipient_lookup
+    name_normalized = db.Column(db.String(100), nullable=True, index=True)
     email = db.Column(db.String(255), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)  # хэш пароля
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -35,6 +37,9 @@ class User(UserMixin, db.Model):
 
 class Account(db.Model):
     __tablename__ = 'account'
+    __table_args__ = (
+        db.Index('ix_account_user_id', 'user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
@@ -62,6 +67,11 @@ class Account(db.Model):
 
 class Transaction(db.Model):
     __tablename__ = 'transaction'
+    # History/period queries filter one side and order or range by timestamp
+    __table_args__ = (
+        db.Index('ix_transaction_from_timestamp', 'account_from_id', 'timestamp'),
+        db.Index('ix_transaction_to_timestamp', 'account_to_id', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     account_from_id = db.Column(db.Integer, db.ForeignKey('account.id', ondelete='CASCADE'), nullable=True)
@@ -96,6 +106,10 @@ class QuestionCategory(db.Model):
 
 class ChatMessage(db.Model):
     __tablename__ = 'chat_message'
+    # /api/chat context and /api/history: WHERE user_id, is_visible ORDER BY timestamp
+    __table_args__ = (
+        db.Index('ix_chat_message_user_visible_timestamp', 'user_id', 'is_visible', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -124,7 +138,7 @@ class ChatMessage(db.Model):
             'message': self.message,
             'response': self.response,
             'timestamp': self.timestamp.isoformat(),
-            'category': self.category_id.name if self.category_id else None,
+            'category': self.category.name if self.category else None,
             'feedback': feedback_data,
             'is_visible': self.is_visible
         }
@@ -132,6 +146,9 @@ class ChatMessage(db.Model):
 
 class MessageFeedback(db.Model):
     __tablename__ = 'message_feedback'
+    __table_args__ = (
+        db.Index('ix_message_feedback_message_id', 'message_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     message_id = db.Column(
@@ -149,3 +166,38 @@ class MessageFeedback(db.Model):
             'is_helpful': self.is_helpful,
             'created_at': self.created_at.isoformat()
         }
+
+
+class DailyTransactionRollup(db.Model):
+    """Per-user, per-day (UTC) incoming/outgoing totals; maintained by transaction_rollups"""
+    __tablename__ = 'daily_transaction_rollup'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    incoming_total = db.Column(db.Numeric(15, 2), default=0, nullable=False)
+    incoming_count = db.Column(db.Integer, default=0, nullable=False)
+    outgoing_total = db.Column(db.Numeric(15, 2), default=0, nullable=False)
+    outgoing_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class TransferRequest(db.Model):
+    """Completed transfer per idempotency key, so a retried call returns the original result"""
+    __tablename__ = 'transfer_request'
+
+    idempotency_key = db.Column(db.String(128), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id', ondelete='SET NULL'), nullable=True)
+    message = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class TranslationCacheEntry(db.Model):
+    """Persistent tier of translation_cache: one translated text fragment per target language"""
+    __tablename__ = 'translation_cache'
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256(prompt version, language, source text)
+    target_language = db.Column(db.String(8), nullable=False)
+    prompt_version = db.Column(db.String(16), nullable=False)
+    source_text = db.Column(db.Text, nullable=False)
+    translation = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+from pathlib import Path
+from typing import List, Optional
+
+from catalog_index import normalize_name
+from embeddings import is_sidecar
+from product_catalog import CatalogFile, cards_catalog, deposits_catalog
+
+GENERAL_INFO_DIR = Path("generalInfo")
+INDEXED_SECTIONS = ("retail", "corporate")
+
+# Below this Dice score a fuzzy match is treated as "not found"
+MIN_CONFIDENCE = 0.55
+
+# Seconds between checks of the catalog files for edits; lookups in between
+# reuse the current index without touching the filesystem
+NAME_INDEX_CHECK_INTERVAL = float(os.environ.get("NAME_INDEX_CHECK_INTERVAL", "2"))
+
+NameMatch = namedtuple("NameMatch", ["name", "source", "confidence"])
+
+
+def trigrams(text: str):
+    text = f"  {normalize_name(text)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def collect_names(data, names):
+    """All "name" values of a generalInfo document, depth-first"""
+    if isinstance(data, dict):
+        name = data.get("name")
+        if isinstance(name, str) and name.strip():
+            names.append(name)
+        for value in data.values():
+            collect_names(value, names)
+    elif isinstance(data, list):
+        for value in data:
+            collect_names(value, names)
+    return names
+
+
+class TrigramIndex:
+    """Character trigram postings over product names, scored with the Dice coefficient"""
+
+    def __init__(self, entries):
+        # entries: iterable of (name, source)
+        self.entries = []
+        self.sizes = []
+        self.postings = {}
+        seen = set()
+        for name, source in entries:
+            if (name, source) in seen:
+                continue
+            seen.add((name, source))
+            entry_id = len(self.entries)
+            grams = trigrams(name)
+            self.entries.append((name, source))
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(entry_id)
+
+    def search(self, query: str, source: Optional[str] = None, limit: int = 5) -> List[NameMatch]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+        overlap = Counter()
+        for gram in grams:
+            for entry_id in self.postings.get(gram, ()):
+                overlap[entry_id] += 1
+        scored = []
+        for entry_id, shared in overlap.items():
+            name, entry_source = self.entries[entry_id]
+            if source is not None and entry_source != source:
+                continue
+            score = 2.0 * shared / (len(grams) + self.sizes[entry_id])
+            scored.append(NameMatch(name, entry_source, round(score, 4)))
+        scored.sort(key=lambda m: m.confidence, reverse=True)
+        return scored[:limit]
+
+
+class ProductNameResolver:
+    """
+    Fuzzy product-name resolution over every generalInfo retail and corporate
+    file. The trigram index is rebuilt only when one of the catalogs reloads,
+    and the catalogs are checked at most every `check_interval` seconds.
+    """
+
+    def __init__(self, root=GENERAL_INFO_DIR, sections=INDEXED_SECTIONS, catalogs=(),
+                 check_interval=NAME_INDEX_CHECK_INTERVAL):
+        known = {catalog.path: catalog for catalog in catalogs}
+        self.catalogs = {}
+        for section in sections:
+            for path in sorted((Path(root) / section).glob("*.json")):
+                if is_sidecar(path):
+                    continue
+                source = f"{section}/{path.name}"
+                self.catalogs[source] = known.get(path) or CatalogFile(path, None)
+        self.check_interval = check_interval
+        self._snapshots = None
+        self._index = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def index(self) -> TrigramIndex:
+        now = time.monotonic()
+        if self._index is not None and now < self._next_check:
+            return self._index
+        snapshots = tuple(catalog.snapshot() for catalog in self.catalogs.values())
+        if self._index is None or any(a is not b for a, b in zip(snapshots, self._snapshots)):
+            with self._lock:
+                entries = []
+                for source, snapshot in zip(self.catalogs, snapshots):
+                    entries.extend((name, source) for name in collect_names(snapshot.data, []))
+                self._index = TrigramIndex(entries)
+                self._snapshots = snapshots
+        self._next_check = now + self.check_interval
+        return self._index
+
+    def candidates(self, query: str, source: Optional[str] = None, limit: int = 5) -> List[NameMatch]:
+        return self.index().search(query, source=source, limit=limit)
+
+    def resolve(self, query: str, source: Optional[str] = None,
+                min_confidence: float = MIN_CONFIDENCE) -> Optional[NameMatch]:
+        """Best match at or above `min_confidence`, or None"""
+        matches = self.candidates(query, source=source, limit=1)
+        if matches and matches[0].confidence >= min_confidence:
+            return matches[0]
+        return None
+
+
+product_name_resolver = ProductNameResolver(catalogs=(cards_catalog, deposits_catalog))
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+from catalog_index import ProductIndex
+
+
+class FrozenDict(dict):
+    """Read-only dict shared between requests. Still a dict for json.dumps/isinstance."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("catalog data is read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class FrozenList(list):
+    """Read-only list shared between requests."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("catalog data is read-only")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Mutable deep copy of frozen catalog data"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+class CatalogSnapshot:
+    def __init__(self, signature, data, index=None):
+        self.signature = signature
+        self.data = data
+        self.index = index
+
+
+class CatalogFile:
+    """
+    A generalInfo JSON file parsed once and kept in memory.
+    `root_key` selects the section to keep; None keeps the whole document.
+
+    The file is re-parsed only when its mtime or size changes, so product data
+    can be edited without a restart. A new snapshot (data plus the indexes
+    produced by `build_index`) is built completely before it replaces the old
+    one; if the edited file does not parse, the previous snapshot keeps being
+    served.
+    """
+
+    def __init__(self, path, root_key, build_index=None):
+        self.path = Path(path)
+        self.root_key = root_key
+        self.build_index = build_index
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, signature):
+        with open(self.path, encoding='utf-8') as f:
+            raw = json.load(f)
+        data = freeze(raw if self.root_key is None else raw.get(self.root_key, {}))
+        index = self.build_index(data) if self.build_index else None
+        return CatalogSnapshot(signature, data, index)
+
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        signature = self._signature()
+        if snapshot is not None and snapshot.signature == signature:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.signature == signature:
+                return snapshot
+            try:
+                snapshot = self._load(signature)
+                logging.info(f"Catalog loaded: {self.path}")
+            except Exception as e:
+                logging.exception(f"Error loading catalog {self.path}: {e}")
+                if snapshot is None:
+                    empty = FrozenDict()
+                    snapshot = CatalogSnapshot(None, empty, self.build_index(empty) if self.build_index else None)
+                # Do not retry a broken file on every call; wait for the next edit
+                snapshot = CatalogSnapshot(signature, snapshot.data, snapshot.index)
+            self._snapshot = snapshot
+            return snapshot
+
+    def data(self) -> Dict[str, Any]:
+        return self.snapshot().data
+
+    def index(self):
+        return self.snapshot().index
+
+
+RETAIL_DIR = Path("generalInfo/retail")
+
+cards_catalog = CatalogFile(RETAIL_DIR / "cards.json", "cards", build_index=ProductIndex)
+deposits_catalog = CatalogFile(RETAIL_DIR / "deposits.json", "deposits", build_index=ProductIndex)
+about_us_catalog = CatalogFile(RETAIL_DIR / "about-us.json", "about-us")
@@ -0,0 +1,148 @@
+import re
+from collections import namedtuple
+
+# Typed values parsed once from the free-text fields of cards and deposits.
+# Missing or unparseable values are None; amounts are {currency: value}.
+ProductFacts = namedtuple("ProductFacts", [
+    "fee",                      # annual fee in KGS, 0 for "акысыз"
+    "rate_min", "rate_max",     # % per year
+    "term_min", "term_max",     # months
+    "min_amount", "max_amount",
+    "replenishment",            # True/False for "ооба"/"жок", None if not stated
+    "capitalization",
+])
+
+NUMBER_RE = re.compile(r"\d{1,3}(?:[  ]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?")
+PERCENT_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*%")
+WORD_RE = re.compile(r"\w+")
+TERM_RE = re.compile(r"(\d+)\s*(ай|жыл|күн|мес|год|лет|дн|day|month|year)?", re.IGNORECASE)
+
+FREE_WORDS = ("акысыз", "бекер", "бесплатно", "free")
+UP_TO_WORDS = ("чейин", "до ", "up to")
+FROM_WORDS = ("баштап", "от ", "from")
+# First word of a yes/no field; "Каалаган убакта" is "at any time"
+YES_WORDS = ("ооба", "yes", "да", "каалаган")
+NO_WORDS = ("жок", "no", "нет")
+
+CURRENCY_WORDS = (
+    ("KGS", ("kgs", "сом")),
+    ("USD", ("usd", "доллар", "$")),
+    ("EUR", ("eur", "евро", "€")),
+    ("RUB", ("rub", "рубл")),
+)
+
+MONTHS_PER_UNIT = {
+    "ай": 1, "мес": 1, "month": 1,
+    "жыл": 12, "год": 12, "лет": 12, "year": 12,
+    "күн": 1 / 30, "дн": 1 / 30, "day": 1 / 30,
+}
+
+
+def parse_number(text):
+    """First number in `text` ("1 200 сом" -> 1200.0), or None"""
+    match = NUMBER_RE.search(str(text or ""))
+    if not match:
+        return None
+    return float(match.group(0).replace(" ", "").replace(" ", "").replace(",", "."))
+
+
+def parse_fee(text):
+    if not isinstance(text, str):
+        return None
+    lowered = text.lower()
+    if any(word in lowered for word in FREE_WORDS):
+        return 0.0
+    if "сом" not in lowered:
+        return None
+    return parse_number(lowered)
+
+
+def parse_rate_range(text):
+    """(min %, max %) of a rate description; "15%га чейин" -> (0, 15), "22% баштап" -> (22, None)"""
+    if not isinstance(text, str):
+        return None, None
+    rates = [float(r.replace(",", ".")) for r in PERCENT_RE.findall(text)]
+    if not rates:
+        return None, None
+    lowered = text.lower()
+    if len(rates) == 1 and any(word in lowered for word in UP_TO_WORDS):
+        return 0.0, rates[0]
+    if len(rates) == 1 and any(word in lowered for word in FROM_WORDS):
+        return rates[0], None
+    return min(rates), max(rates)
+
+
+def parse_term_range(text):
+    """(min, max) term in months; "3 айдан 24 айга чейин" -> (3, 24), "36 айга чейин" -> (0, 36)"""
+    if not isinstance(text, str):
+        return None, None
+    lowered = text.lower()
+    values = []
+    pending = []
+    for number, unit in TERM_RE.findall(lowered):
+        pending.append(int(number))
+        if unit:
+            per_unit = MONTHS_PER_UNIT[unit]
+            values.extend(round(n * per_unit, 2) for n in pending)
+            pending = []
+    # Numbers with no unit after them at all are months ("3, 6 жана 12" is covered above)
+    values.extend(pending)
+    if not values:
+        return None, None
+    if len(values) == 1 and any(word in lowered for word in UP_TO_WORDS):
+        return 0.0, values[0]
+    return min(values), max(values)
+
+
+def parse_yes_no(text):
+    """True/False for "ооба ..."/"жок ..." style fields, None otherwise"""
+    words = WORD_RE.findall(text.lower()) if isinstance(text, str) else []
+    if not words:
+        return None
+    if words[0] in YES_WORDS:
+        return True
+    if words[0] in NO_WORDS:
+        return False
+    return None
+
+
+def parse_currency(text, default="KGS"):
+    lowered = (text or "").lower()
+    for code, words in CURRENCY_WORDS:
+        if any(word in lowered for word in words):
+            return code
+    return default
+
+
+def parse_amounts(text):
+    """{"KGS": 10000.0, "USD": 500.0} from "10 000 сом / 500 USD" """
+    if not isinstance(text, str):
+        return {}
+    amounts = {}
+    for part in text.split("/"):
+        value = parse_number(part)
+        if value is not None:
+            amounts.setdefault(parse_currency(part), value)
+    return amounts
+
+
+def parse_amount_query(text):
+    """(value, currency) of a user/Gemini supplied amount such as "5000", "100 USD" """
+    value = parse_number(text)
+    if value is None:
+        return None, None
+    return value, parse_currency(str(text))
+
+
+def product_facts(product):
+    rate_min, rate_max = parse_rate_range(product.get("rate") or product.get("interest_rate"))
+    term_min, term_max = parse_term_range(product.get("term"))
+    return ProductFacts(
+        fee=parse_fee(product.get("annual_fee")),
+        rate_min=rate_min, rate_max=rate_max,
+        term_min=term_min, term_max=term_max,
+        min_amount=parse_amounts(product.get("min_amount")),
+        max_amount=parse_amounts(product.get("max_amount")),
+        replenishment=parse_yes_no(product.get("replenishment")),
+        capitalization=parse_yes_no(product.get("capitalization")),
+    )
@@ -0,0 +1,115 @@
+"""
+Transfer recipient resolution.
+
+Names are matched on User.name_normalized (case-folded, whitespace-collapsed),
+which is indexed and kept up to date on every insert/update of a User. Before
+looking at the user table at all, the sender's recent recipients are checked:
+"send to Бакыт again" is answered from a small per-sender cache built from
+the same query as get_last_3_transfer_recipients.
+"""
+
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import aliased
+
+from database import db
+from models import Account, Transaction, User
+
+RECENT_RECIPIENTS = 3
+MAX_CACHED_SENDERS = 10000
+
+
+def normalize_person_name(name):
+    name = unicodedata.normalize("NFKC", name or "").casefold()
+    return " ".join(name.split())
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _set_name_normalized(mapper, connection, user):
+    user.name_normalized = normalize_person_name(user.name) if user.name else None
+
+
+def recent_recipients(acc_ids, limit=RECENT_RECIPIENTS):
+    """[(user_id, name)] of the recipients of the last `limit` transfers from `acc_ids`, newest first"""
+    to_acc, to_user = aliased(Account), aliased(User)
+    return db.session.query(to_user.id, to_user.name) \
+        .select_from(Transaction) \
+        .outerjoin(to_acc, Transaction.account_to_id == to_acc.id) \
+        .outerjoin(to_user, to_acc.user_id == to_user.id) \
+        .filter(Transaction.account_from_id.in_(acc_ids), Transaction.type == 'Которуу') \
+        .order_by(Transaction.timestamp.desc()).limit(limit).all()
+
+
+class RecentRecipientsCache:
+    """sender user id -> {normalized recipient name: recipient user id}, LRU-bounded"""
+
+    def __init__(self, max_senders=MAX_CACHED_SENDERS):
+        self.max_senders = max_senders
+        self._senders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sender_id):
+        with self._lock:
+            recipients = self._senders.get(sender_id)
+            if recipients is not None:
+                self._senders.move_to_end(sender_id)
+            return recipients
+
+    def put(self, sender_id, recipients):
+        with self._lock:
+            self._senders[sender_id] = recipients
+            self._senders.move_to_end(sender_id)
+            while len(self._senders) > self.max_senders:
+                self._senders.popitem(last=False)
+
+    def remember(self, sender_id, recipient):
+        """Record a completed transfer, keeping the newest RECENT_RECIPIENTS names"""
+        with self._lock:
+            recipients = self._senders.get(sender_id)
+            if recipients is None:
+                return
+            key = normalize_person_name(recipient.name)
+            recipients.pop(key, None)
+            recipients[key] = recipient.id
+            while len(recipients) > RECENT_RECIPIENTS:
+                recipients.pop(next(iter(recipients)))
+
+    def clear(self):
+        with self._lock:
+            self._senders.clear()
+
+
+recent_recipients_cache = RecentRecipientsCache()
+
+
+def _sender_recipients(sender):
+    recipients = recent_recipients_cache.get(sender.id)
+    if recipients is None:
+        acc_ids = [a.id for a in Account.query.filter_by(user_id=sender.id)]
+        recipients = OrderedDict()
+        # oldest first so the newest transfer wins for a repeated name
+        for user_id, name in reversed(recent_recipients(acc_ids) if acc_ids else []):
+            if user_id is not None and name:
+                key = normalize_person_name(name)
+                recipients.pop(key, None)
+                recipients[key] = user_id
+        recent_recipients_cache.put(sender.id, recipients)
+    return recipients
+
+
+def find_recipient(sender, to_name):
+    """User called `to_name` (case and spacing insensitive), recent recipients first; None if unknown"""
+    key = normalize_person_name(to_name)
+    if not key:
+        return None
+    user_id = _sender_recipients(sender).get(key)
+    if user_id is not None:
+        user = db.session.get(User, user_id)
+        # The user may have been renamed since the transfer
+        if user is not None and user.name_normalized == key:
+            return user
+    return User.query.filter(User.name_normalized == key).order_by(User.id).first()
@@ -0,0 +1,342 @@
+"""
+Kyrgyz / Russian / English templates for tool results.
+
+Tools render every label and fixed message from TEMPLATES in the requested
+language, so structured results (balances, transfers, product lists) need no
+LLM round trip. Free-form product text from generalInfo (descriptions, rates
+such as "3 айдан 24 айга чейин", conditions) exists only in Kyrgyz; for other
+languages tools wrap it with `free_text`, and the chatbot translates just
+those fragments. Kyrgyz output carries no markers.
+"""
+
+import re
+
+LANGUAGES = ("ky", "ru", "en")
+DEFAULT_LANGUAGE = "ky"
+
+# How a chat reply was produced; recorded on ChatReply.render_path
+RENDER_TEMPLATE = "template"                # tool result rendered from templates only
+RENDER_TEMPLATE_LLM = "template+llm_translation"  # templates + LLM translation of product text
+RENDER_TEMPLATE_CACHED = "template+cached_translation"  # templates + product text from translation_cache
+RENDER_LLM = "llm"                          # free-form Gemini answer
+RENDER_LLM_TOOLS = "llm+tools"              # Gemini answer composed from several tool results
+RENDER_FAQ = "faq"                          # stored FAQ answer, no Gemini call
+
+FREE_TEXT_OPEN, FREE_TEXT_CLOSE = "⟦", "⟧"  # ⟦ ⟧
+FREE_TEXT_RE = re.compile(f"{FREE_TEXT_OPEN}(.*?){FREE_TEXT_CLOSE}", re.DOTALL)
+
+TEMPLATES = {
+    # Common
+    "unknown": {"ky": "белгисиз", "ru": "неизвестно", "en": "unknown"},
+    "none": {"ky": "Жок", "ru": "Нет", "en": "None"},
+    "user_not_found": {
+        "ky": "Колдонуучу табылган жок.",
+        "ru": "Пользователь не найден.",
+        "en": "User not found.",
+    },
+    "unknown_function": {
+        "ky": "Түшүнүксүз функциялык чакыруу.",
+        "ru": "Непонятный вызов функции.",
+        "en": "Unknown function call.",
+    },
+    "function_call_failed": {
+        "ky": "Кечиресиз, функциялык чакыруу ишке ашкан жок. Кайра аракет кылыңыз же банкка кайрылыңыз.",
+        "ru": "Извините, не удалось выполнить запрос. Попробуйте ещё раз или обратитесь в банк.",
+        "en": "Sorry, the request could not be completed. Please try again or contact the bank.",
+    },
+    "tool_failed": {
+        "ky": "Кечиресиз, {tool} функциясы ишке ашкан жок.",
+        "ru": "Извините, функция {tool} не выполнилась.",
+        "en": "Sorry, the {tool} function failed.",
+    },
+
+    # Accounts and transactions
+    "no_account": {
+        "ky": "Сиздин банк эсебиңиз табылган жок.",
+        "ru": "Ваш банковский счёт не найден.",
+        "en": "Your bank account was not found.",
+    },
+    "balance_total": {
+        "ky": "Сиздин бардык эсептериңиздеги жалпы сумма: {total:.2f} сом.",
+        "ru": "Общая сумма на всех ваших счетах: {total:.2f} сом.",
+        "en": "Total across all your accounts: {total:.2f} KGS.",
+    },
+    "no_recent_transactions": {
+        "ky": "Акыркы транзакциялар табылган жок.",
+        "ru": "Последние транзакции не найдены.",
+        "en": "No recent transactions found.",
+    },
+    "recent_transactions": {"ky": "Акыркы транзакциялар:", "ru": "Последние транзакции:", "en": "Recent transactions:"},
+    "transaction_line": {
+        "ky": "- {type}: {amount:.2f} сом {direction}, {timestamp}",
+        "ru": "- {type}: {amount:.2f} сом {direction}, {timestamp}",
+        "en": "- {type}: {amount:.2f} KGS {direction}, {timestamp}",
+    },
+    "no_incoming": {
+        "ky": "Сизге акыркы убакта акча которулган эмес.",
+        "ru": "В последнее время вам не поступало переводов.",
+        "en": "You have not received any transfers recently.",
+    },
+    "last_incoming": {
+        "ky": "Сизге акыркы акчаны {sender} {amount:.2f} сом которгон ({timestamp}).",
+        "ru": "Последний перевод вам отправил(а) {sender}: {amount:.2f} сом ({timestamp}).",
+        "en": "The last transfer to you was {amount:.2f} KGS from {sender} ({timestamp}).",
+    },
+    "recipient_not_found": {
+        "ky": "{name} аттуу колдонуучу табылган жок.",
+        "ru": "Пользователь с именем {name} не найден.",
+        "en": "No user named {name} was found.",
+    },
+    "amount_required": {
+        "ky": "Акча которуу суммасын көрсөтүңүз.",
+        "ru": "Укажите сумму перевода.",
+        "en": "Please specify the transfer amount.",
+    },
+    "self_transfer": {
+        "ky": "Сиз өзүңүзгө которо албайсыз.",
+        "ru": "Вы не можете перевести деньги самому себе.",
+        "en": "You cannot transfer money to yourself.",
+    },
+    "accounts_not_found": {"ky": "Эсептер табылган жок.", "ru": "Счета не найдены.", "en": "Accounts not found."},
+    "insufficient_funds": {
+        "ky": "Сиздин эсебиңизде жетиштүү каражат жок.",
+        "ru": "На вашем счёте недостаточно средств.",
+        "en": "There are not enough funds in your account.",
+    },
+    "transfer_done": {
+        "ky": "{amount:.2f} сом {name} аттуу адамга ийгиликтүү которулду!",
+        "ru": "{amount:.2f} сом успешно переведено пользователю {name}!",
+        "en": "{amount:.2f} KGS was successfully transferred to {name}!",
+    },
+    "your_accounts": {"ky": "Сиздин эсептериңиз:", "ru": "Ваши счета:", "en": "Your accounts:"},
+    "account_line": {
+        "ky": "- {account_type}: {balance:.2f} сом",
+        "ru": "- {account_type}: {balance:.2f} сом",
+        "en": "- {account_type}: {balance:.2f} KGS",
+    },
+    "incoming_for_period": {
+        "ky": "{start} - {end} аралыгында кирген которуулар: {total:.2f} сом.",
+        "ru": "Входящие переводы за период {start} - {end}: {total:.2f} сом.",
+        "en": "Incoming transfers for {start} - {end}: {total:.2f} KGS.",
+    },
+    "outgoing_for_period": {
+        "ky": "{start} - {end} аралыгында чыккан которуулар: {total:.2f} сом.",
+        "ru": "Исходящие переводы за период {start} - {end}: {total:.2f} сом.",
+        "en": "Outgoing transfers for {start} - {end}: {total:.2f} KGS.",
+    },
+    "no_recent_recipients": {
+        "ky": "Акыркы алуучулар табылган жок.",
+        "ru": "Последние получатели не найдены.",
+        "en": "No recent recipients found.",
+    },
+    "last_3_recipients": {"ky": "Акыркы 3 алуучу:", "ru": "Последние 3 получателя:", "en": "Last 3 recipients:"},
+    "no_transactions": {"ky": "Транзакциялар табылган жок.", "ru": "Транзакции не найдены.", "en": "No transactions found."},
+    "largest_transaction": {
+        "ky": "Эң чоң транзакция: {amount:.2f} сом {direction}, {timestamp}",
+        "ru": "Самая крупная транзакция: {amount:.2f} сом {direction}, {timestamp}",
+        "en": "Largest transaction: {amount:.2f} KGS {direction}, {timestamp}",
+    },
+    "tx_deposit": {"ky": "Толуктоо", "ru": "Пополнение", "en": "Deposit"},
+    "tx_withdrawal": {"ky": "Чыгым", "ru": "Снятие", "en": "Withdrawal"},
+    "tx_transfer": {"ky": "Которуу", "ru": "Перевод", "en": "Transfer"},
+    "account_savings": {"ky": "Жинак", "ru": "Сберегательный", "en": "Savings"},
+    "account_checking": {"ky": "Агымдагы", "ru": "Текущий", "en": "Checking"},
+
+    # Product field labels
+    "label_currency": {"ky": "Валюта", "ru": "Валюта", "en": "Currency"},
+    "label_min_amount": {"ky": "Минималдык сумма", "ru": "Минимальная сумма", "en": "Minimum amount"},
+    "label_term": {"ky": "Мөөнөт", "ru": "Срок", "en": "Term"},
+    "label_rate": {"ky": "Пайыздык ставка", "ru": "Процентная ставка", "en": "Interest rate"},
+    "label_withdrawal": {"ky": "Чыгаруу", "ru": "Снятие", "en": "Withdrawal"},
+    "label_replenishment": {"ky": "Толуктоо", "ru": "Пополнение", "en": "Top-up"},
+    "label_capitalization": {"ky": "Капитализация", "ru": "Капитализация", "en": "Capitalization"},
+    "label_description": {"ky": "Сүрөттөмө", "ru": "Описание", "en": "Description"},
+    "label_annual_fee": {"ky": "Жылдык акы", "ru": "Годовое обслуживание", "en": "Annual fee"},
+    "label_score": {"ky": "упай", "ru": "баллы", "en": "score"},
+    "label_recommendation_score": {"ky": "Сунуштук балл", "ru": "Рекомендательный балл", "en": "Recommendation score"},
+    "label_nominal_amount": {"ky": "Номиналдык сумма", "ru": "Номинальная сумма", "en": "Nominal amount"},
+    "label_type": {"ky": "Түрү", "ru": "Тип", "en": "Type"},
+    "label_issuer": {"ky": "Чыгаруучу", "ru": "Эмитент", "en": "Issuer"},
+    "label_founded": {"ky": "Негизделген", "ru": "Основан", "en": "Founded"},
+    "label_license": {"ky": "Лицензия", "ru": "Лицензия", "en": "License"},
+    "label_main_shareholder": {"ky": "Негизги акционер", "ru": "Основной акционер", "en": "Main shareholder"},
+    "label_country": {"ky": "Өлкө", "ru": "Страна", "en": "Country"},
+    "label_ownership_share": {"ky": "Ээлик пайы", "ru": "Доля владения", "en": "Ownership share"},
+    "label_head_office": {"ky": "Башкы кеңсе", "ru": "Головной офис", "en": "Head office"},
+    "label_regional_branches": {"ky": "Аймактык филиалдар", "ru": "Региональные филиалы", "en": "Regional branches"},
+    "label_phone": {"ky": "Телефон", "ru": "Телефон", "en": "Phone"},
+    "label_email": {"ky": "Электрондук почта", "ru": "Электронная почта", "en": "Email"},
+    "label_address": {"ky": "Дарек", "ru": "Адрес", "en": "Address"},
+
+    # Cards
+    "card_name_line": {"ky": "Карта аты: {name}", "ru": "Название карты: {name}", "en": "Card name: {name}"},
+    "compare_cards_need_two": {
+        "ky": "Карта салыштыруу үчүн эң азы 2 карта керек.",
+        "ru": "Для сравнения нужно как минимум 2 карты.",
+        "en": "At least 2 cards are needed for a comparison.",
+    },
+    "compared_cards": {"ky": "📋 Салыштырылган карталар:", "ru": "📋 Сравниваемые карты:", "en": "📋 Compared cards:"},
+    "similarities": {"ky": "✅ Окшоштуктары:", "ru": "✅ Сходства:", "en": "✅ Similarities:"},
+    "differences": {"ky": "⚖️ Айырмачылыктары:", "ru": "⚖️ Различия:", "en": "⚖️ Differences:"},
+    "cards_of_kind": {"ky": "📋 {kind} карталары:", "ru": "📋 Карты {kind}:", "en": "📋 {kind} cards:"},
+    "cards": {"ky": "📋 Карталар:", "ru": "📋 Карты:", "en": "📋 Cards:"},
+    "cards_in_currency": {
+        "ky": "📋 {currency} валютасын колдогон карталар:",
+        "ru": "📋 Карты с поддержкой валюты {currency}:",
+        "en": "📋 Cards supporting {currency}:",
+    },
+    "card_instructions": {
+        "ky": "📖 {card} картасынын көрсөтмөлөрү:",
+        "ru": "📖 Инструкция к карте {card}:",
+        "en": "📖 {card} card instructions:",
+    },
+    "card_conditions": {
+        "ky": "📋 {card} картасынын шарттары:",
+        "ru": "📋 Условия карты {card}:",
+        "en": "📋 {card} card conditions:",
+    },
+    "cards_with_features": {
+        "ky": "📋 '{features}' өзгөчөлүктөрү бар карталар:",
+        "ru": "📋 Карты с функциями '{features}':",
+        "en": "📋 Cards with '{features}':",
+    },
+    "card_recommendations": {"ky": "🎯 Карта сунуштары:", "ru": "🎯 Рекомендуемые карты:", "en": "🎯 Recommended cards:"},
+
+    # About us
+    "bank_mission": {"ky": "🎯 Банктын миссиясы:", "ru": "🎯 Миссия банка:", "en": "🎯 Bank mission:"},
+    "bank_values": {"ky": "💎 Банктын баалуулуктары:", "ru": "💎 Ценности банка:", "en": "💎 Bank values:"},
+    "ownership_info": {"ky": "👥 Ээлик маалыматтары:", "ru": "👥 Информация о владельцах:", "en": "👥 Ownership:"},
+    "branch_network": {"ky": "🏢 Филиалдар тармагы:", "ru": "🏢 Филиальная сеть:", "en": "🏢 Branch network:"},
+    "contact_info": {"ky": "📞 Байланыш маалыматтары:", "ru": "📞 Контактная информация:", "en": "📞 Contact information:"},
+    "section_mission": {"ky": "🎯 Миссия:", "ru": "🎯 Миссия:", "en": "🎯 Mission:"},
+    "section_values": {"ky": "💎 Баалуулуктар:", "ru": "💎 Ценности:", "en": "💎 Values:"},
+    "section_ownership": {"ky": "👥 Ээлик:", "ru": "👥 Владельцы:", "en": "👥 Ownership:"},
+    "section_branches": {"ky": "🏢 Филиалдар:", "ru": "🏢 Филиалы:", "en": "🏢 Branches:"},
+    "section_contact": {"ky": "📞 Байланыш:", "ru": "📞 Контакты:", "en": "📞 Contact:"},
+
+    # Deposits
+    "all_deposits": {"ky": "💰 Бардык депозиттер:", "ru": "💰 Все депозиты:", "en": "💰 All deposits:"},
+    "compare_deposits_need_two": {
+        "ky": "Депозит салыштыруу үчүн эң азы 2 депозит керек.",
+        "ru": "Для сравнения нужно как минимум 2 депозита.",
+        "en": "At least 2 deposits are needed for a comparison.",
+    },
+    "compared_deposits": {"ky": "📋 Салыштырылган депозиттер:", "ru": "📋 Сравниваемые депозиты:", "en": "📋 Compared deposits:"},
+    "all_same": {"ky": "✅ Бардыгы бирдей: {value}", "ru": "✅ Одинаково у всех: {value}", "en": "✅ Same for all: {value}"},
+    "deposits_in_currency": {
+        "ky": "💰 {currency} валютасындагы депозиттер:",
+        "ru": "💰 Депозиты в валюте {currency}:",
+        "en": "💰 Deposits in {currency}:",
+    },
+    "deposits_by_term": {"ky": "⏰ Мөөнөт боюнча депозиттер:", "ru": "⏰ Депозиты по сроку:", "en": "⏰ Deposits by term:"},
+    "deposits_by_min_amount": {
+        "ky": "💵 {amount} чейинки минималдык суммадагы депозиттер:",
+        "ru": "💵 Депозиты с минимальной суммой до {amount}:",
+        "en": "💵 Deposits with a minimum amount up to {amount}:",
+    },
+    "deposits_by_rate": {
+        "ky": "📈 Пайыздык ставка боюнча депозиттер:",
+        "ru": "📈 Депозиты по процентной ставке:",
+        "en": "📈 Deposits by interest rate:",
+    },
+    "deposits_with_replenishment": {
+        "ky": "➕ Толуктоого мүмкүндүк берген депозиттер:",
+        "ru": "➕ Депозиты с возможностью пополнения:",
+        "en": "➕ Deposits that allow top-ups:",
+    },
+    "deposits_with_capitalization": {
+        "ky": "📊 Капитализация мүмкүндүгүн берген депозиттер:",
+        "ru": "📊 Депозиты с капитализацией:",
+        "en": "📊 Deposits with capitalization:",
+    },
+    "deposits_by_withdrawal": {
+        "ky": "💸 {kind} чыгаруу түрүндөгү депозиттер:",
+        "ru": "💸 Депозиты с типом снятия «{kind}»:",
+        "en": "💸 Deposits with '{kind}' withdrawal:",
+    },
+    "deposit_recommendations": {"ky": "🎯 Депозит сунуштары:", "ru": "🎯 Рекомендуемые депозиты:", "en": "🎯 Recommended deposits:"},
+    "government_securities": {
+        "ky": "🏛️ Мамлекеттик баалуу кагаздар:",
+        "ru": "🏛️ Государственные ценные бумаги:",
+        "en": "🏛️ Government securities:",
+    },
+    "child_deposits": {"ky": "👶 Балдар үчүн депозиттер:", "ru": "👶 Детские депозиты:", "en": "👶 Deposits for children:"},
+    "online_deposits": {"ky": "🌐 Онлайн депозиттер:", "ru": "🌐 Онлайн-депозиты:", "en": "🌐 Online deposits:"},
+
+    # FAQ
+    "faq_header": {
+        "ky": "❓ Көп берилүүчү суроолордон:",
+        "ru": "❓ Из часто задаваемых вопросов:",
+        "en": "❓ From the frequently asked questions:",
+    },
+    "faq_not_found": {
+        "ky": "Көп берилүүчү суроолордон жооп табылган жок.",
+        "ru": "В часто задаваемых вопросах ответ не найден.",
+        "en": "No answer was found in the frequently asked questions.",
+    },
+}
+
+# Stored transaction/account type values (English or Kyrgyz) -> template key
+TRANSACTION_TYPES = {
+    "deposit": "tx_deposit", "Толуктоо": "tx_deposit",
+    "withdrawal": "tx_withdrawal", "Чыгым": "tx_withdrawal",
+    "transfer": "tx_transfer", "Которуу": "tx_transfer",
+}
+ACCOUNT_TYPES = {
+    "savings": "account_savings", "Жинак": "account_savings",
+    "checking": "account_checking", "Агымдагы": "account_checking",
+}
+
+
+def normalize_language(language) -> str:
+    language = (language or DEFAULT_LANGUAGE).strip().lower()[:2]
+    if language == "kg":
+        language = "ky"
+    return language if language in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def render(key: str, language: str = DEFAULT_LANGUAGE, **fields) -> str:
+    variants = TEMPLATES[key]
+    template = variants.get(normalize_language(language)) or variants[DEFAULT_LANGUAGE]
+    return template.format(**fields) if fields else template
+
+
+def label(key: str, language: str = DEFAULT_LANGUAGE) -> str:
+    return render(f"label_{key}", language)
+
+
+def transaction_type(value: str, language: str = DEFAULT_LANGUAGE) -> str:
+    key = TRANSACTION_TYPES.get(value)
+    return render(key, language) if key else value
+
+
+def account_type(value: str, language: str = DEFAULT_LANGUAGE) -> str:
+    key = ACCOUNT_TYPES.get(value)
+    return render(key, language) if key else value
+
+
+def free_text(value, language: str = DEFAULT_LANGUAGE) -> str:
+    """Mark Kyrgyz product text for translation; unchanged for Kyrgyz replies"""
+    value = str(value)
+    if normalize_language(language) == DEFAULT_LANGUAGE or not value.strip():
+        return value
+    return f"{FREE_TEXT_OPEN}{value}{FREE_TEXT_CLOSE}"
+
+
+def free_text_fragments(text: str):
+    return FREE_TEXT_RE.findall(text or "")
+
+
+def fill_free_text(text: str, translations=None) -> str:
+    """Replace marked fragments with their translations (or the original text) and drop the markers"""
+    translations = translations or {}
+    return FREE_TEXT_RE.sub(lambda m: translations.get(m.group(1), m.group(1)), text or "")
+
+
+class ChatReply(str):
+    """A chat answer that remembers how it was produced (see RENDER_*)"""
+
+    def __new__(cls, text, render_path=RENDER_LLM):
+        reply = super().__new__(cls, text)
+        reply.render_path = render_path
+        return reply
@@ -1,9 +1,12 @@
+import json
 import logging
 from functools import wraps
-from flask import render_template, request, jsonify, session
+from flask import Response, render_template, request, jsonify, session, stream_with_context
 from app import app, db
 from models import User, ChatMessage, MessageFeedback, QuestionCategory
 from gemini_service import banking_chatbot
+import mcp_pool
+from categorization_queue import categorization_queue
 # from aitilbot import AitilBankingChatbot
 from supporting.categorization_service import question_categorizer
 
@@ -75,51 +78,122 @@ def index():
     return render_template('index.html')
 
 
+def recent_conversation(user):
+    recent_messages = ChatMessage.query.filter_by(user_id=user.id, is_visible=True)\
+        .order_by(ChatMessage.timestamp.desc()).limit(5).all()
+    return [
+        {'message': msg.message, 'response': msg.response}
+        for msg in reversed(recent_messages)
+    ]
+
+
+def save_chat_message(user, user_message, ai_response):
+    """
+    Persist one exchange; returns the JSON payload sent back to the client.
+    The keyword categorizer is instant, so its category is saved with the
+    message and returned; with the embedding backend the message is categorized
+    in the background and `category` is null until /api/history shows it.
+    """
+    categorized, category = question_categorizer.categorize_inline(user_message)
+    chat_message = ChatMessage(
+        user_id=user.id,
+        message=user_message,
+        response=ai_response,
+        category_id=category.id if category else None
+    )
+    db.session.add(chat_message)
+    db.session.commit()
+    if not categorized:
+        categorization_queue.submit(app, chat_message.id, user_message)
+
+    render_path = getattr(ai_response, 'render_path', None)
+    logging.info(f"Chat message {chat_message.id} answered via {render_path}")
+
+    return {
+        'response': ai_response,
+        'render_path': render_path,
+        'category': category.name if category else None,
+        'message_id': chat_message.id,
+        'timestamp': chat_message.timestamp.isoformat(),
+        'user_name': user.name if user.name else None
+    }
+
+
+def message_from_request():
+    """The stripped `message` of the JSON body; '' for a missing, non-JSON or malformed body"""
+    data = request.get_json(silent=True)
+    message = data.get('message') if isinstance(data, dict) else None
+    return message.strip() if isinstance(message, str) else ''
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @app.route('/api/chat', methods=['POST'])
 @login_required
 def chat(user):
     try:
-        data = request.get_json()
-        user_message = data.get('message', '').strip()
-
+        user_message = message_from_request()
         if not user_message:
             return jsonify({'error': 'Message cannot be empty'}), 400
 
-        recent_messages = ChatMessage.query.filter_by(user_id=user.id, is_visible=True)\
-            .order_by(ChatMessage.timestamp.desc()).limit(5).all()
-
-        conversation_history = [
-            {'message': msg.message, 'response': msg.response}
-            for msg in reversed(recent_messages)
-        ]
+        conversation_history = recent_conversation(user)
+        # Load what the prompt needs, then give the pooled connection back while the model works
+        user.accounts
+        db.session.close()
 
         # Передаем user в get_response
         ai_response = banking_chatbot.get_response(user_message, conversation_history, user=user)
-        # ai_response = asyncio.run(banking_chatbot.get_response(user_message, conversation_history, user=user))
-        category = question_categorizer.categorize_question(user_message)
-
-        chat_message = ChatMessage(
-            user_id=user.id,
-            message=user_message,
-            response=ai_response,
-            category_id=category.id if category else None
-        )
-        db.session.add(chat_message)
-        db.session.commit()
-
-        return jsonify({
-            'response': ai_response,
-            'message_id': chat_message.id,
-            'timestamp': chat_message.timestamp.isoformat(),
-            'category': category.name if category else None,
-            'user_name': user.name if user.name else None
-        })
+        return jsonify(save_chat_message(user, user_message, ai_response))
 
     except Exception as e:
         logging.error(f"Error in chat endpoint: {e}")
         return jsonify({'error': 'An error occurred processing your message'}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+@login_required
+def chat_stream(user):
+    """
+    Server-Sent Events variant of /api/chat: `progress` events while tools run,
+    `delta` events with answer text as it is generated, then `done` with the
+    same payload /api/chat returns. The message is saved once the answer is complete.
+    """
+    user_message = message_from_request()
+    if not user_message:
+        return jsonify({'error': 'Message cannot be empty'}), 400
+
+    conversation_history = recent_conversation(user)
+    user_id = user.id
+    db.session.close()
+
+    def generate():
+        # The stream runs after the view returns, under a new app context and session
+        try:
+            user = db.session.get(User, user_id)
+            if user is None:
+                # Deleted after the view checked the session
+                yield sse_event('error', {'error': 'User not found'})
+                return
+            user.accounts
+            db.session.close()
+            for event, payload in banking_chatbot.stream_response(user_message, conversation_history, user=user):
+                if event == 'reply':
+                    yield sse_event('done', save_chat_message(user, user_message, payload))
+                else:
+                    yield sse_event(event, payload)
+        except Exception as e:
+            logging.error(f"Error in chat stream endpoint: {e}")
+            db.session.rollback()
+            yield sse_event('error', {'error': 'An error occurred processing your message'})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let a reverse proxy buffer the stream
+    })
+
+
 @app.route('/api/history', methods=['GET'])
 @login_required
 def get_chat_history(user):
@@ -234,6 +308,14 @@ def get_analytics():
         return jsonify({'error': 'An error occurred getting analytics'}), 500
 
 
+@app.route('/api/mcp/pool', methods=['GET'])
+def get_mcp_pool_metrics():
+    metrics = mcp_pool.get_pool_metrics()
+    if metrics is None:
+        return jsonify({'started': False})
+    return jsonify({'started': True, 'metrics': metrics})
+
+
 @app.errorhandler(404)
 def not_found(error):
     return render_template('index.html'), 404
@@ -227,7 +227,7 @@ class BankingChatbot {
         try {
             this.isLoading = true;
             this.updateSendButton(false);
-            const response = await fetch('/api/chat', {
+            const response = await fetch('/api/chat/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -235,22 +235,16 @@ class BankingChatbot {
                 credentials: 'include',
                 body: JSON.stringify({ message: message })
             });
-            const data = await response.json();
-            if (response.ok) {
+            if (!response.ok) {
                 this.hideTypingIndicator();
-                // Update user name if provided in response
-                if (data.user_name && !this.userName) {
-                    this.userName = data.user_name;
-                }
-                this.addMessage(data.response, 'bot', data.timestamp, data.message_id, data.category);
-            } else {
                 if (response.status === 401) {
-                    this.hideTypingIndicator();
                     this.showError('Кирүү же катталуу талап кылынат.');
-                } else {
-                    throw new Error(data.error || 'Failed to send message');
+                    return;
                 }
+                const data = await response.json();
+                throw new Error(data.error || 'Failed to send message');
             }
+            await this.readChatStream(response);
         } catch (error) {
             console.error('Error sending message:', error);
             this.hideTypingIndicator();
@@ -260,6 +254,67 @@ class BankingChatbot {
             this.updateSendButton(true);
         }
     }
+
+    async readChatStream(response) {
+        // Server-Sent Events over a POST response: "event: <name>\ndata: <json>\n\n"
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let streamed = null;
+        let text = '';
+
+        const handleEvent = (event, data) => {
+            if (event === 'progress') {
+                this.updateTypingIndicator(`${data.tool} функциясы аткарылууда`);
+            } else if (event === 'delta') {
+                if (!streamed) {
+                    this.hideTypingIndicator();
+                    streamed = this.addMessage('', 'bot');
+                }
+                text += data.text;
+                streamed.querySelector('.message-text').innerHTML = this.formatBotMessage(text);
+                this.scrollToBottom();
+            } else if (event === 'done') {
+                this.hideTypingIndicator();
+                if (data.user_name && !this.userName) {
+                    this.userName = data.user_name;
+                }
+                // Replace the streamed text with the saved message (header, category, feedback)
+                if (streamed) {
+                    streamed.remove();
+                }
+                this.addMessage(data.response, 'bot', data.timestamp, data.message_id, data.category);
+                streamed = null;
+            } else if (event === 'error') {
+                throw new Error(data.error || 'Failed to send message');
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                const dataLines = [];
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) {
+                        event = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        dataLines.push(line.slice(5).trim());
+                    }
+                });
+                if (dataLines.length) {
+                    handleEvent(event, JSON.parse(dataLines.join('\n')));
+                }
+            }
+        }
+    }
     
     addMessage(text, sender, timestamp = null, messageId = null, category = null, feedback = null) {
         const messageDiv = document.createElement('div');
@@ -305,6 +360,7 @@ class BankingChatbot {
         
         this.chatMessages.appendChild(messageDiv);
         this.scrollToBottom();
+        return messageDiv;
     }
     
     createFeedbackSection(messageId, existingFeedback = null) {
@@ -410,6 +466,13 @@ class BankingChatbot {
         this.scrollToBottom();
     }
     
+    updateTypingIndicator(status) {
+        const typingIndicator = document.getElementById('typing-indicator');
+        if (typingIndicator) {
+            typingIndicator.querySelector('.typing-indicator span').textContent = status;
+        }
+    }
+    
     hideTypingIndicator() {
         const typingIndicator = document.getElementById('typing-indicator');
         if (typingIndicator) {
@@ -0,0 +1,99 @@
+# bench_categorizer.py
+"""
+Cost of QuestionCategorizer.categorize_question over many questions: the
+original per-message path (categories query, json.loads, substring scan of
+every keyword) against the cached Aho-Corasick matcher.
+
+Questions are generated from ky/ru/en templates, some with category keywords
+in them, and categorized against the default categories in a scratch SQLite
+database. Both paths must agree on every question; SQL statements are counted.
+
+Run from the repository root:
+    python supporting/bench_categorizer.py                       # 100k questions
+    python supporting/bench_categorizer.py --questions 10000 --seed 7
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask
+from sqlalchemy import event
+
+from database import db
+from models import QuestionCategory
+from supporting.categorization_service import QuestionCategorizer
+
+TEMPLATES = [
+    "What is the {kw} for my account?", "How do I get a {kw}?", "Tell me about {kw} please",
+    "Сколько стоит {kw}?", "Расскажите про {kw} в вашем банке", "Кантип {kw} алсам болот?",
+    "{kw} жөнүндө маалымат бериңизчи", "Балансым канча?", "Салам! Жардам керек", "Какой курс доллара сегодня?",
+]
+
+
+def sample_questions(count, keywords, seed):
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(kw=rng.choice(keywords)) for _ in range(count)]
+
+
+def substring_scan(question_text):
+    """categorize_question before the cached matcher"""
+    question_lower = question_text.lower()
+    best_match, best_score = None, 0
+    for category in QuestionCategory.query.all():
+        keywords = json.loads(category.keywords or '[]')
+        score = sum(1 for keyword in keywords if keyword.lower() in question_lower)
+        if keywords:
+            score = score / len(keywords)
+        if score > best_score:
+            best_match, best_score = category, score
+    return best_match if best_score > 0.1 else None
+
+
+def timed(label, categorize, questions, statements):
+    statements.clear()
+    started = time.perf_counter()
+    names = []
+    for question in questions:
+        match = categorize(question)
+        names.append(match.name if match else None)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<18} {elapsed:7.2f} s  {elapsed / len(questions) * 1e6:8.1f} µs/question  "
+          f"{len(statements)} SQL statements")
+    return names
+
+
+def main(args):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench_categorizer.db"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        categorizer = QuestionCategorizer()
+        categorizer.initialize_categories()
+        keywords = [kw for c in categorizer.default_categories for kw in c["keywords"]]
+        questions = sample_questions(args.questions, keywords + ["депозит", "карта"], args.seed)
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        legacy = timed("substring scan", substring_scan, questions, statements)
+        compiled = timed("cached automaton", categorizer.categorize_question, questions, statements)
+
+        mismatches = sum(a != b for a, b in zip(legacy, compiled))
+        categorized = sum(name is not None for name in compiled)
+        print(f"{len(questions)} questions, {categorized} categorized, {mismatches} mismatches")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,94 @@
+# bench_faq_index.py
+"""
+Latency of FaqIndex.search: encoding the query against the top-k lookup
+(one matrix-vector product plus argpartition), and the lookup against a
+Python loop over per-entry vector lists, as they used to be stored inline in
+useful-info.json. Queries are the FAQ questions with their last
+word dropped.
+
+--rows tiles the FAQ matrix (with a little noise) to show how the lookup
+scales with the number of entries. Without sentence-transformers, or with
+--trigrams, the character trigram encoder is used.
+
+Run from the repository root:
+    python supporting/bench_faq_index.py
+    python supporting/bench_faq_index.py --rows 100000 --queries 200
+    python supporting/bench_faq_index.py --trigrams
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from embeddings import TrigramEncoder, default_encoder, normalize
+from faq_index import FaqIndex, faq_catalog
+
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return f"p50 {np.percentile(ms, 50):7.3f} ms  p95 {np.percentile(ms, 95):7.3f} ms"
+
+
+def loop_top_k(vectors, query, k):
+    """Top k by cosine similarity, one entry at a time"""
+    scores = [(sum(a * b for a, b in zip(vector, query)), i) for i, vector in enumerate(vectors)]
+    return [i for _, i in sorted(scores, reverse=True)[:k]]
+
+
+def main(args):
+    encoder = TrigramEncoder() if args.trigrams else default_encoder()
+    started = time.perf_counter()
+    index = FaqIndex(json.loads(faq_catalog.path.read_text(encoding="utf-8"))["useful-info"], encoder)
+    print(f"{encoder.name}: {len(index.entries)} entries embedded in {time.perf_counter() - started:.2f} s")
+
+    if args.rows > len(index.entries):
+        rng = np.random.default_rng(args.seed)
+        tiled = np.resize(index.matrix, (args.rows, index.matrix.shape[1]))
+        index.matrix = normalize(tiled + rng.normal(0, 0.01, tiled.shape).astype(np.float32))
+        index.entries = [index.entries[i % len(index.entries)] for i in range(args.rows)]
+    print(f"matrix {index.matrix.shape[0]} x {index.matrix.shape[1]} float32, {index.matrix.nbytes / 1e6:.1f} MB")
+
+    questions = [entry.question for entry in index.entries[:args.queries]]
+    queries = [question.rsplit(" ", 1)[0] for question in questions]
+
+    encode_times, lookup_times, hits = [], [], 0
+    vectors = []
+    for query, question in zip(queries, questions):
+        started = time.perf_counter()
+        vector = encoder([query])[0]
+        encoded = time.perf_counter()
+        scores = index.matrix @ vector
+        top = np.argpartition(-scores, args.k - 1)[:args.k]
+        top = top[np.argsort(-scores[top])]
+        lookup_times.append(time.perf_counter() - encoded)
+        encode_times.append(encoded - started)
+        hits += question in [index.entries[i].question for i in top]
+        vectors.append(vector)
+    print(f"encode query        {percentiles(encode_times)}")
+    print(f"matrix top-{args.k}        {percentiles(lookup_times)}")
+
+    rows = index.matrix.tolist()
+    loop_times = []
+    for vector in vectors[:args.loop_queries]:
+        started = time.perf_counter()
+        loop_top_k(rows, vector.tolist(), args.k)
+        loop_times.append(time.perf_counter() - started)
+    print(f"python loop top-{args.k}   {percentiles(loop_times)}")
+    print(f"{hits}/{len(queries)} truncated questions find their own entry in the top {args.k}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=0, help="tile the FAQ matrix to this many rows")
+    parser.add_argument("--queries", type=int, default=182)
+    parser.add_argument("--loop-queries", type=int, default=20, help="queries timed with the Python loop")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--trigrams", action="store_true", help="use character trigrams even if a model is installed")
+    args = parser.parse_args()
+    main(args)
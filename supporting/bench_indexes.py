@@ -0,0 +1,193 @@
+# bench_indexes.py
+"""
+Query plans and latency of the hot transaction/chat queries without and with
+the secondary indexes declared in models.py.
+
+Seeds a scratch database with synthetic users, accounts, transactions and
+chat messages, drops the secondary indexes, times the queries, creates the
+indexes through migrations.ensure_indexes (as the deploy step does) and times them again.
+
+By default the scratch database is a new SQLite file in a temporary
+directory. The benchmark starts with db.drop_all(), so another database is
+only used with --database-url plus --i-know-this-drops-tables, and never the
+app's own DATABASE_URL.
+
+Run from the repository root:
+    python supporting/bench_indexes.py                         # 1M transactions, 5M messages, SQLite
+    python supporting/bench_indexes.py --transactions 100000 --messages 500000
+    python supporting/bench_indexes.py --database-url postgresql://localhost/bench --i-know-this-drops-tables
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask
+from sqlalchemy import insert, text
+
+from database import db
+from models import Account, ChatMessage, MessageFeedback, Transaction, User
+from migrations import ensure_indexes, migration_lock
+
+BATCH = 50_000
+
+QUERIES = {
+    "transactions_history": (
+        'SELECT * FROM "transaction" WHERE account_from_id IN (:a, :b) OR account_to_id IN (:a, :b) '
+        'ORDER BY timestamp DESC LIMIT 20'
+    ),
+    "outgoing_period_sum": (
+        'SELECT SUM(amount) FROM "transaction" WHERE account_from_id IN (:a, :b) '
+        'AND timestamp >= :start AND timestamp <= :end'
+    ),
+    "user_accounts": "SELECT * FROM account WHERE user_id = :user_id",
+    "chat_context": (
+        "SELECT * FROM chat_message WHERE user_id = :user_id AND is_visible = :visible "
+        "ORDER BY timestamp DESC LIMIT 5"
+    ),
+    "chat_history": (
+        "SELECT * FROM chat_message WHERE user_id = :user_id AND is_visible = :visible "
+        "ORDER BY timestamp ASC"
+    ),
+    "message_feedback": "SELECT * FROM message_feedback WHERE message_id = :message_id",
+}
+
+
+def create_app(database_url):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    db.init_app(app)
+    return app
+
+
+def insert_batches(table, rows, total):
+    batch = []
+    for i, row in enumerate(rows, 1):
+        batch.append(row)
+        if len(batch) == BATCH:
+            db.session.execute(insert(table), batch)
+            db.session.commit()
+            batch = []
+            print(f"  {table.name}: {i}/{total}", end="\r")
+    if batch:
+        db.session.execute(insert(table), batch)
+        db.session.commit()
+    print(f"  {table.name}: {total}/{total}")
+
+
+def seed(users, transactions, messages):
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+    span = 2 * 365 * 24 * 3600
+    print("Seeding...")
+    insert_batches(User.__table__, (
+        {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "password_hash": "x"}
+        for i in range(1, users + 1)), users)
+    accounts = users * 2
+    insert_batches(Account.__table__, (
+        {"id": i, "user_id": (i + 1) // 2, "account_type": "checking" if i % 2 else "savings", "balance": 1000}
+        for i in range(1, accounts + 1)), accounts)
+    insert_batches(Transaction.__table__, (
+        {"account_from_id": rng.randint(1, accounts), "account_to_id": rng.randint(1, accounts),
+         "type": "Которуу", "amount": rng.randint(1, 100_000) / 100,
+         "timestamp": start + timedelta(seconds=rng.randrange(span))}
+        for _ in range(transactions)), transactions)
+    insert_batches(ChatMessage.__table__, (
+        {"user_id": rng.randint(1, users), "message": "Балансым канча?", "response": "...",
+         "timestamp": start + timedelta(seconds=rng.randrange(span)), "is_visible": rng.random() < 0.8}
+        for _ in range(messages)), messages)
+    feedback = messages // 100
+    insert_batches(MessageFeedback.__table__, (
+        {"message_id": rng.randint(1, messages), "rating": rng.randint(1, 5)}
+        for _ in range(feedback)), feedback)
+
+
+def drop_indexes():
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(bind=db.engine, checkfirst=True)
+
+
+def random_params(rng, users):
+    user_id = rng.randint(1, users)
+    start = datetime(2023, 1, 1) + timedelta(days=rng.randrange(600))
+    return {"user_id": user_id, "a": user_id * 2 - 1, "b": user_id * 2, "visible": True,
+            "start": start, "end": start + timedelta(days=90),
+            "message_id": rng.randint(1, 1000)}
+
+
+def explain(sql, params):
+    if db.engine.dialect.name == "postgresql":
+        rows = db.session.execute(text(f"EXPLAIN {sql}"), params).all()
+        return "\n".join(f"    {row[0]}" for row in rows)
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+    return "\n".join(f"    {row[-1]}" for row in rows)
+
+
+def bench(label, users, runs):
+    rng = random.Random(7)
+    print(f"\n=== {label} ===")
+    for name, sql in QUERIES.items():
+        print(f"{name}:\n{explain(sql, random_params(rng, users))}")
+        samples = []
+        for _ in range(runs):
+            params = random_params(rng, users)
+            started = time.perf_counter()
+            db.session.execute(text(sql), params).all()
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"    p50={statistics.median(samples) * 1000:9.3f} ms  p99={p99 * 1000:9.3f} ms")
+
+
+def scratch_database_url(args, parser):
+    """A new SQLite file, or --database-url once the caller has acknowledged it is wiped"""
+    if args.database_url is None:
+        return f"sqlite:///{tempfile.mkdtemp(prefix='bench_indexes_')}/bench_indexes.db"
+    if not args.i_know_this_drops_tables:
+        parser.error("--database-url is wiped with db.drop_all(); add --i-know-this-drops-tables to use it")
+    if args.database_url == os.environ.get("DATABASE_URL"):
+        parser.error("--database-url is the app database (DATABASE_URL); use a throwaway database")
+    return args.database_url
+
+
+def main(args, database_url):
+    print(f"Scratch database: {database_url}")
+    app = create_app(database_url)
+    with app.app_context():
+        import transaction_rollups  # noqa: F401 (rollup table is part of the schema)
+        db.drop_all()
+        db.create_all()
+        seed(args.users, args.transactions, args.messages)
+        drop_indexes()
+        if db.engine.dialect.name == "sqlite":
+            db.session.execute(text("ANALYZE"))
+        bench("without secondary indexes", args.users, args.runs)
+        db.session.commit()
+        started = time.perf_counter()
+        with migration_lock() as conn:
+            ensure_indexes(conn)
+        print(f"\nensure_indexes: {time.perf_counter() - started:.1f} s")
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        bench("with secondary indexes", args.users, args.runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="throwaway database to use instead of a temporary SQLite file")
+    parser.add_argument("--i-know-this-drops-tables", action="store_true",
+                        help="confirm that every table of --database-url may be dropped")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--messages", type=int, default=5_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    main(args, scratch_database_url(args, parser))
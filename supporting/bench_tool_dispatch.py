@@ -0,0 +1,59 @@
+# bench_tool_dispatch.py
+"""
+Per-call latency of the two tool dispatch modes: "local" (in-process FastMCP
+tool) and "stdio" (pooled banking_mcp_server.py session over JSON-RPC).
+
+Run from the repository root:
+    python supporting/bench_tool_dispatch.py --calls 200
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import app
+from models import User
+import tool_dispatch
+
+
+def summarize(mode, tool_name, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{mode:>6} {tool_name:<28} mean={statistics.mean(samples) * 1000:8.3f} ms  "
+          f"p50={statistics.median(samples) * 1000:8.3f} ms  p99={p99 * 1000:8.3f} ms")
+
+
+async def bench(mode, tool_name, arguments, calls):
+    # Warm-up call starts the pool / imports the server module
+    await tool_dispatch.call_tool(tool_name, arguments, mode=mode)
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await tool_dispatch.call_tool(tool_name, arguments, mode=mode)
+        samples.append(time.perf_counter() - started)
+    summarize(mode, tool_name, samples)
+
+
+async def main(calls):
+    with app.app_context():
+        user = User.query.first()
+    cases = [
+        ("get_bank_mission", {}),
+        ("get_card_details", {"card_name": "Visa Gold Debit"}),
+    ]
+    if user:
+        cases.append(("get_balance", {"user_id": user.id}))
+    for tool_name, arguments in cases:
+        for mode in ("local", "stdio"):
+            await bench(mode, tool_name, arguments, calls)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
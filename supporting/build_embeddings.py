@@ -0,0 +1,117 @@
+# build_embeddings.py
+"""
+Precompute sentence embeddings of the generalInfo JSON documents into the
+sidecar files next to each of them (see embeddings.py). Replaces
+add_embeddings.py, which encoded the FAQ questions one at a time and wrote
+the vectors into useful-info.json itself.
+
+Texts embedded per document: the "question" of every Q&A pair (the FAQ
+index looks them up as they are) and "name: descr" of every named entry with
+a description. Each text is keyed by content_hash(encoder, text): vectors
+already in the sidecar are kept, only new or edited texts are encoded,
+--batch-size at a time, and vectors of texts that are gone are dropped. A
+document whose texts did not change is not rewritten. The JSON documents
+themselves are never modified.
+
+Run from the repository root:
+    python supporting/build_embeddings.py                    # every document under generalInfo/
+    python supporting/build_embeddings.py generalInfo/retail/useful-info.json
+    python supporting/build_embeddings.py --dry-run          # only report what would be encoded
+    EMBEDDING_MODEL=... python supporting/build_embeddings.py
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from embeddings import EmbeddingStore, content_hash, default_encoder, is_sidecar
+from name_resolver import GENERAL_INFO_DIR
+
+
+def embeddable_texts(data):
+    """Distinct texts of a generalInfo document to embed, in document order"""
+    texts = {}
+
+    def collect(node):
+        if isinstance(node, dict):
+            question = node.get("question")
+            if isinstance(question, str) and question.strip():
+                texts.setdefault(question, None)
+            name, descr = node.get("name"), node.get("descr") or node.get("description")
+            if isinstance(name, str) and isinstance(descr, str) and descr.strip():
+                texts.setdefault(f"{name}: {descr}", None)
+            for value in node.values():
+                collect(value)
+        elif isinstance(node, list):
+            for value in node:
+                collect(value)
+
+    collect(data)
+    return list(texts)
+
+
+def documents(paths):
+    """The JSON documents named by `paths` (files or directories), sidecars excluded"""
+    for path in map(Path, paths):
+        candidates = sorted(path.rglob("*.json")) if path.is_dir() else [path]
+        yield from (candidate for candidate in candidates if not is_sidecar(candidate))
+
+
+def build(json_path, encoder, batch_size=256, dry_run=False):
+    """Bring the sidecar of one document up to date; (texts, kept, encoded, dropped)"""
+    texts = embeddable_texts(json.loads(Path(json_path).read_text(encoding="utf-8")))
+    store = EmbeddingStore(json_path)
+    rows, matrix = store.load(encoder.name)
+    keys = [content_hash(encoder.name, text) for text in texts]
+    missing = [i for i, key in enumerate(keys) if key not in rows]
+    dropped = len(set(rows) - set(keys))
+    stats = (len(texts), len(texts) - len(missing), len(missing), dropped)
+    if dry_run or keys == list(rows) or (not texts and matrix is None):
+        return stats
+
+    vectors = None
+    if matrix is not None:
+        vectors = np.empty((len(texts), matrix.shape[1]), dtype=np.float32)
+        kept = [i for i, key in enumerate(keys) if key in rows]
+        vectors[kept] = matrix[[rows[keys[i]] for i in kept]]
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        encoded = encoder([texts[i] for i in batch])
+        if vectors is None:
+            vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+        vectors[batch] = encoded
+        if len(missing) > batch_size:
+            print(f"  {json_path}: {start + len(batch)}/{len(missing)} encoded", flush=True)
+    store.save(encoder.name, keys, vectors if vectors is not None else np.zeros((0, matrix.shape[1])))
+    return stats
+
+
+def main(args):
+    encoder = default_encoder()
+    print(f"Encoder: {encoder.name}")
+    totals = np.zeros(4, dtype=int)
+    started = time.perf_counter()
+    for json_path in documents(args.paths):
+        stats = build(json_path, encoder, args.batch_size, args.dry_run)
+        totals += stats
+        texts, kept, encoded, dropped = stats
+        if texts or dropped:
+            print(f"{json_path}: {texts} texts, {kept} kept, {encoded} "
+                  f"{'to encode' if args.dry_run else 'encoded'}, {dropped} dropped")
+    texts, kept, encoded, dropped = totals
+    print(f"{texts} texts, {kept} kept, {encoded} {'to encode' if args.dry_run else 'encoded'}, "
+          f"{dropped} dropped in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", default=[str(GENERAL_INFO_DIR)], help="JSON files or directories")
+    parser.add_argument("--batch-size", type=int, default=256, help="texts per encoder call")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be encoded without writing")
+    args = parser.parse_args()
+    main(args)
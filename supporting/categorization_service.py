@@ -1,9 +1,120 @@
 import json
 import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+from sqlalchemy import event
+
 from models import QuestionCategory, db
 
+# Other workers may edit categories too; rebuild the matcher from the database at least this often
+CATEGORY_MATCHER_TTL = int(os.environ.get("CATEGORY_MATCHER_TTL", "300"))
+# "keywords" (CategoryMatcher) or "embeddings" (supporting/embedding_categorizer.py)
+CATEGORIZER_BACKEND = os.environ.get("CATEGORIZER_BACKEND", "keywords")
+CATEGORIZER_BACKENDS = ("keywords", "embeddings")
+
+# What categorize_question returns: a snapshot of the row, usable without a session
+CategoryMatch = namedtuple("CategoryMatch", ["id", "name", "score"])
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a set of keywords: one pass over a text finds
+    every keyword that occurs in it as a substring, overlapping ones included
+    ("account" inside "account type").
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for keyword in keywords:
+            if not keyword:
+                continue
+            node = 0
+            for char in keyword:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                    self.goto[node][char] = child
+                node = child
+            if keyword not in self.out[node]:
+                self.out[node] += (keyword,)
+
+        # Breadth-first, so the failure target of every node is finished before its children
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                target = self.fail[node]
+                while target and char not in self.goto[target]:
+                    target = self.fail[target]
+                self.fail[child] = self.goto[target].get(char, 0)
+                self.out[child] += self.out[self.fail[child]]
+
+    def find(self, text):
+        """Set of the keywords occurring in `text`"""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class CategoryMatcher:
+    """The keywords of all categories compiled into one automaton, scored like the original substring scan"""
+
+    def __init__(self, categories, threshold=0.1):
+        self.threshold = threshold
+        self.categories = []
+        # {lowercase keyword: [(category position, weight)]}, weight = occurrences / len(keywords)
+        self.weights = {}
+        for position, category in enumerate(categories):
+            keywords = json.loads(category.keywords or '[]')
+            self.categories.append((category.id, category.name))
+            for keyword in keywords:
+                entries = self.weights.setdefault(keyword.lower(), [])
+                entries.append((position, 1 / len(keywords)))
+        self.automaton = KeywordAutomaton(self.weights)
+
+    def match(self, question_text):
+        """Best CategoryMatch for the question, or None below the threshold"""
+        scores = [0.0] * len(self.categories)
+        for keyword in self.automaton.find(question_text.lower()):
+            for position, weight in self.weights[keyword]:
+                scores[position] += weight
+        best_position, best_score = None, 0
+        for position, score in enumerate(scores):
+            if score > best_score:
+                best_position, best_score = position, score
+        if best_score > self.threshold:
+            return CategoryMatch(*self.categories[best_position], best_score)
+        return None
+
+    def match_many(self, question_texts):
+        return [self.match(text) for text in question_texts]
+
+
 class QuestionCategorizer:
-    def __init__(self):
+    def __init__(self, backend=CATEGORIZER_BACKEND):
+        if backend not in CATEGORIZER_BACKENDS:
+            raise ValueError(f"Unknown CATEGORIZER_BACKEND {backend!r}, expected one of {CATEGORIZER_BACKENDS}")
+        if backend == "embeddings":
+            # Fail at startup rather than on the first question
+            from supporting.embedding_categorizer import require_sentence_transformers
+            require_sentence_transformers()
+        self.backend = backend
         self.default_categories = [
             {
                 'name': 'Account Services',
@@ -43,6 +154,35 @@ class QuestionCategorizer:
         ]
         
         self._initialized = False
+        self._matcher = None
+        self._matcher_built_at = 0
+        self._matcher_lock = threading.Lock()
+        event.listen(QuestionCategory, "after_insert", self.invalidate)
+        event.listen(QuestionCategory, "after_update", self.invalidate)
+        event.listen(QuestionCategory, "after_delete", self.invalidate)
+
+    def invalidate(self, *args):
+        """Categories changed: the next categorization rebuilds the matcher"""
+        self._matcher = None
+
+    def matcher(self):
+        """The compiled CategoryMatcher, rebuilt from the database when stale"""
+        matcher = self._matcher
+        if matcher is not None and time.monotonic() - self._matcher_built_at < CATEGORY_MATCHER_TTL:
+            return matcher
+        with self._matcher_lock:
+            if self._matcher is matcher:
+                self.initialize_categories()
+                self._matcher = self._build_matcher(QuestionCategory.query.order_by(QuestionCategory.id).all())
+                self._matcher_built_at = time.monotonic()
+            return self._matcher
+
+    def _build_matcher(self, categories):
+        if self.backend == "embeddings":
+            from supporting.embedding_categorizer import EmbeddingMatcher, sentence_encoder
+            return EmbeddingMatcher(categories, sentence_encoder())
+        # Only return a category if we have a reasonable match (at least 10% keyword match)
+        return CategoryMatcher(categories, threshold=0.1)
     
     def initialize_categories(self):
         """Initialize default categories in the database if they don't exist"""
@@ -68,50 +208,44 @@ class QuestionCategorizer:
     
     def categorize_question(self, question_text):
         """
-        Categorize a question based on keywords and content
+        Categorize a question based on keywords and content: one pass over the
+        text with the cached matcher, no database queries unless it is stale
         
         Args:
             question_text: The user's question
             
         Returns:
-            QuestionCategory object or None
+            CategoryMatch(id, name, score) or None
         """
         try:
-            # Initialize categories if not done yet
-            self.initialize_categories()
-            
-            question_lower = question_text.lower()
-            categories = QuestionCategory.query.all()
-            
-            best_match = None
-            best_score = 0
-            
-            for category in categories:
-                keywords = json.loads(category.keywords or '[]')
-                score = 0
-                
-                # Count keyword matches
-                for keyword in keywords:
-                    if keyword.lower() in question_lower:
-                        score += 1
-                
-                # Weight by keyword density
-                if len(keywords) > 0:
-                    score = score / len(keywords)
-                
-                if score > best_score:
-                    best_score = score
-                    best_match = category
-            
-            # Only return a category if we have a reasonable match
-            if best_score > 0.1:  # At least 10% keyword match
-                return best_match
-            
-            return None
+            return self.matcher().match(question_text)
             
         except Exception as e:
             logging.error(f"Error categorizing question: {e}")
             return None
+
+    def categorize_inline(self, question_text):
+        """
+        (True, CategoryMatch or None) when the keyword matcher is active: it takes
+        microseconds, so the category can be saved with the message. (False, None)
+        with the embedding backend, whose questions go to the background queue.
+        """
+        try:
+            matcher = self.matcher()
+            if isinstance(matcher, CategoryMatcher):
+                return True, matcher.match(question_text)
+        except Exception as e:
+            logging.error(f"Error categorizing question: {e}")
+        return False, None
+
+    def categorize_questions(self, question_texts):
+        """categorize_question for a batch (one encode call with the embedding backend)"""
+        question_texts = list(question_texts)
+        try:
+            return self.matcher().match_many(question_texts)
+        except Exception as e:
+            logging.error(f"Error categorizing {len(question_texts)} questions: {e}")
+            return [None] * len(question_texts)
     
     def get_categories(self):
         """Get all available categories"""
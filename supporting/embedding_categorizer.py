@@ -0,0 +1,127 @@
+"""
+Embedding backend for QuestionCategorizer (CATEGORIZER_BACKEND=embeddings).
+
+The keyword lists of the default categories are English, while most questions
+are Kyrgyz or Russian. This backend embeds, once per matcher build, each
+category's description, keywords and the ky/ru/en example questions below
+with a multilingual sentence-transformers model. The normalized mean of those
+vectors is the category centroid. Questions are assigned to the nearest
+centroid by cosine similarity: one matrix product for a whole batch.
+Below CATEGORY_EMBEDDING_MIN_SIMILARITY a question stays uncategorized.
+
+sentence-transformers is the optional "embeddings" extra (see embeddings.py).
+Selecting this backend without it is a configuration error, raised when the
+categorizer is created: character trigrams are no substitute here, since they
+cannot match across languages, and silently falling back to keywords would
+hide that the configured backend is not running.
+"""
+
+import json
+import os
+
+import numpy as np
+
+import embeddings
+from embeddings import normalize
+from supporting.categorization_service import CategoryMatch
+
+CATEGORY_EMBEDDING_MODEL = os.environ.get("CATEGORY_EMBEDDING_MODEL", embeddings.EMBEDDING_MODEL)
+CATEGORY_EMBEDDING_MIN_SIMILARITY = float(os.environ.get("CATEGORY_EMBEDDING_MIN_SIMILARITY", "0.35"))
+
+# Example questions of the default categories, by category name
+CATEGORY_EXAMPLES = {
+    'Account Services': [
+        "Балансым канча?", "Эсебимден көчүрмө алсам болобу?", "Акча которуу кантип жасалат?",
+        "Какой у меня остаток на счете?", "Как открыть сберегательный счет?", "Как перевести деньги на другой счет?",
+        "What is my account balance?", "How do I open a savings account?",
+    ],
+    'Loans & Credit': [
+        "Насыя алсам болобу?", "Ипотеканын пайызы канча?", "Кредиттик картанын лимити кандай?",
+        "Какая ставка по потребительскому кредиту?", "Как получить ипотеку?", "Можно ли увеличить кредитный лимит?",
+        "How can I apply for a personal loan?", "What is the mortgage interest rate?",
+    ],
+    'Online Banking': [
+        "Мобилдик тиркемеге кантип кирем?", "Сырсөзүмдү унутуп калдым", "Онлайн төлөм кантип жасайм?",
+        "Не могу войти в мобильное приложение", "Как сменить пароль в интернет-банкинге?",
+        "Как подключить двухфакторную аутентификацию?",
+        "How do I log in to the mobile app?", "I forgot my online banking password",
+    ],
+    'Fees & Charges': [
+        "Картаны тейлөө канча турат?", "Банкоматтан акча алуу үчүн комиссия барбы?", "Айлык төлөм канча?",
+        "Какая комиссия за снятие наличных?", "Сколько стоит обслуживание карты?", "За что с меня списали плату?",
+        "Is there a monthly maintenance fee?", "What is the ATM withdrawal fee?",
+    ],
+    'Investment Services': [
+        "Мамлекеттик баалуу кагаздарга кантип салым салам?", "Акчамды кайда инвестициялайм?",
+        "Как купить государственные облигации?", "Есть ли у вас инвестиционные продукты?",
+        "Какая доходность по казначейским векселям?",
+        "How can I invest in treasury bills?", "Do you offer investment advice?",
+    ],
+    'Customer Service': [
+        "Банк саат канчада иштейт?", "Жакынкы филиал кайда?", "Колл-борбордун номери кандай?",
+        "Во сколько открывается отделение?", "Где ближайший банкомат?", "Как связаться со службой поддержки?",
+        "What are your opening hours?", "Where is the nearest branch?",
+    ],
+    'Security & Fraud': [
+        "Картам уурдалып кетти", "Шектүү транзакция көрдүм", "Мага алдамчылар чалышты",
+        "Мою карту украли, что делать?", "С моего счета списали деньги без моего ведома",
+        "Пришло подозрительное сообщение от имени банка",
+        "My card was stolen", "I see an unauthorized transaction on my account",
+    ],
+}
+
+
+def require_sentence_transformers():
+    if not embeddings.sentence_transformers_installed():
+        raise RuntimeError('CATEGORIZER_BACKEND=embeddings needs sentence-transformers: pip install ".[embeddings]"')
+
+
+def sentence_encoder():
+    """Encoder of CATEGORY_EMBEDDING_MODEL"""
+    require_sentence_transformers()
+    return embeddings.sentence_encoder(CATEGORY_EMBEDDING_MODEL)
+
+
+def category_texts(category):
+    texts = [category.description] if category.description else []
+    texts += json.loads(category.keywords or '[]')
+    texts += CATEGORY_EXAMPLES.get(category.name, [])
+    return texts
+
+
+class EmbeddingMatcher:
+    """Nearest-centroid categories; same interface as categorization_service.CategoryMatcher"""
+
+    def __init__(self, categories, encode, min_similarity=None):
+        self.encode = encode
+        self.min_similarity = CATEGORY_EMBEDDING_MIN_SIMILARITY if min_similarity is None else min_similarity
+        self.categories, texts, owners = [], [], []
+        for category in categories:
+            own_texts = category_texts(category)
+            if not own_texts:
+                continue
+            owners += [len(self.categories)] * len(own_texts)
+            texts += own_texts
+            self.categories.append((category.id, category.name))
+        self.centroids = np.zeros((len(self.categories), 0), dtype=np.float32)
+        if texts:
+            vectors = normalize(encode(texts))
+            sums = np.zeros((len(self.categories), vectors.shape[1]), dtype=np.float32)
+            np.add.at(sums, np.asarray(owners), vectors)
+            self.centroids = normalize(sums)
+
+    def match_many(self, question_texts):
+        """A CategoryMatch or None per question, from one batched encode and one matrix product"""
+        question_texts = list(question_texts)
+        if not question_texts or not self.categories:
+            return [None] * len(question_texts)
+        similarities = normalize(self.encode(question_texts)) @ self.centroids.T
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(question_texts)), best]
+        return [
+            CategoryMatch(*self.categories[position], float(score)) if score >= self.min_similarity else None
+            for position, score in zip(best, scores)
+        ]
+
+    def match(self, question_text):
+        return self.match_many([question_text])[0]
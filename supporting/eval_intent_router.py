@@ -0,0 +1,120 @@
+# eval_intent_router.py
+"""
+Accuracy of intent_router over labeled ky/ru/en questions, and how much of
+the tool schema it saves.
+
+Each sample is labeled with the tool that answers it (null for small talk,
+where the router should not narrow). The label's intent is the group that
+tool belongs to; sending every tool (too many or no intents matched) is a
+fallback, neither right nor wrong. Per language it reports:
+    precision  narrowed messages whose intents include the labeled one
+               (small talk that got narrowed counts against it)
+    recall     labeled questions narrowed to their intent
+    fallback   labeled questions sent with every tool
+    available  the labeled tool was offered at all (narrowed or fallback)
+    schema     mean size of the offered function declarations vs. all of them
+followed by precision and recall per intent and the misrouted questions.
+
+intent_samples.json is the set the keyword lists were written against;
+intent_samples_heldout.json holds paraphrases and ky/ru inflections written
+without looking at the keyword lists. Only the held-out numbers say how the
+router does on unseen questions, so do not tune keywords against it.
+
+Run from the repository root:
+    python supporting/eval_intent_router.py
+    python supporting/eval_intent_router.py --samples my_questions.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from intent_router import INTENT_TOOLS, route_intents, route_tools, tool_declarations
+
+SAMPLES = Path(__file__).resolve().parent / "intent_samples.json"
+HELDOUT = Path(__file__).resolve().parent / "intent_samples_heldout.json"
+
+TOOL_INTENT = {name: intent for intent, names in INTENT_TOOLS.items() for name in names}
+
+
+def schema_size(tool_names):
+    return len(json.dumps(tool_declarations(tool_names), ensure_ascii=False))
+
+
+def ratio(part, whole):
+    return part / whole if whole else 0.0
+
+
+def evaluate(samples):
+    """({language: metrics}, {intent: metrics}, misrouted samples)"""
+    full_size = schema_size(None)
+    metrics, per_intent, misrouted = {}, {intent: {"tp": 0, "fp": 0, "fn": 0} for intent in INTENT_TOOLS}, []
+    for sample in samples:
+        tools = route_tools(sample["text"])
+        gold = TOOL_INTENT[sample["tool"]] if sample["tool"] is not None else None
+        routed = route_intents(sample["text"]) if tools is not None else []
+        m = metrics.setdefault(sample["language"], {"n": 0, "labeled": 0, "narrowed": 0, "correct": 0,
+                                                    "fallback": 0, "available": 0, "schema": 0})
+        m["n"] += 1
+        m["narrowed"] += tools is not None
+        m["schema"] += schema_size(tools) / full_size
+        if gold is not None:
+            m["labeled"] += 1
+            m["correct"] += gold in routed
+            m["fallback"] += tools is None
+            m["available"] += tools is None or sample["tool"] in tools
+        for intent in routed:
+            per_intent[intent]["tp" if intent == gold else "fp"] += 1
+        if gold is not None and gold not in routed:
+            per_intent[gold]["fn"] += 1
+        if routed and gold not in routed:
+            misrouted.append((sample, routed))
+    for m in metrics.values():
+        m["wrong"] = m["narrowed"] - m["correct"]
+        m["precision"] = ratio(m["correct"], m["narrowed"])
+        m["recall"] = ratio(m["correct"], m["labeled"])
+        m["fallback"] = ratio(m["fallback"], m["labeled"])
+        m["available"] = ratio(m["available"], m["labeled"])
+        m["schema"] = m["schema"] / m["n"]
+    for m in per_intent.values():
+        m["precision"] = ratio(m["tp"], m["tp"] + m["fp"])
+        m["recall"] = ratio(m["tp"], m["tp"] + m["fn"])
+    return metrics, per_intent, misrouted
+
+
+def report(path):
+    samples = json.loads(Path(path).read_text(encoding="utf-8"))
+    metrics, per_intent, misrouted = evaluate(samples)
+    print(f"{Path(path).name}:")
+    for language, m in sorted(metrics.items()):
+        print(f"  {language}: n={m['n']}  precision={m['precision']:.1%}  recall={m['recall']:.1%}  "
+              f"fallback={m['fallback']:.1%}  available={m['available']:.1%}  wrong={m['wrong']}  "
+              f"schema={m['schema']:.0%} of all tools")
+    for intent, m in per_intent.items():
+        print(f"  {intent}: precision={m['precision']:.1%}  recall={m['recall']:.1%}  "
+              f"(tp={m['tp']} fp={m['fp']} fn={m['fn']})")
+    for sample, intents in misrouted:
+        print(f"  misrouted [{sample['language']}] {sample['text']!r}: expected {sample['tool']}, routed to {intents}")
+    return samples
+
+
+def main(args):
+    samples = [sample for path in args.samples for sample in report(path)]
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for sample in samples:
+            route_tools(sample["text"])
+    elapsed = time.perf_counter() - started
+    print(f"routing: {elapsed / (args.repeat * len(samples)) * 1e6:.1f} µs per message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", nargs="+", default=[str(SAMPLES), str(HELDOUT)])
+    parser.add_argument("--repeat", type=int, default=100, help="passes over the samples for the timing")
+    args = parser.parse_args()
+    main(args)
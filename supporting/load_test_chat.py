@@ -0,0 +1,147 @@
+# load_test_chat.py
+"""
+Throughput of one worker for /api/chat under N concurrent users.
+
+By default the app is started in this process behind a threaded WSGI server
+(one worker, like a gunicorn gthread worker) on a scratch SQLite database,
+with tools dispatched locally and Gemini replaced by a fake client. The fake
+answers after --model-latency seconds, alternately with text and with a
+get_balance function call, so the numbers measure the chat pipeline and
+not the model. With --url it drives a running deployment (real Gemini)
+instead. Each simulated user registers, logs in and sends messages back to
+back for --duration seconds.
+
+Run from the repository root:
+    python supporting/load_test_chat.py                      # 50 users, 30 s, in-process
+    python supporting/load_test_chat.py --users 50 --model-latency 0.8
+    python supporting/load_test_chat.py --url http://localhost:5000 --duration 60
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+QUESTIONS = ["Салам!", "Балансым канча?", "Какой у меня баланс?", "What can you do?"]
+
+
+class _Obj:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def _fake_response(counter):
+    if next(counter) % 2:
+        part = _Obj(text=None, function_call=_Obj(name="get_balance", args={"language": "ru"}, id=str(uuid.uuid4())))
+    else:
+        part = _Obj(text="Салам! Кантип жардам бере алам?", function_call=None)
+    return _Obj(candidates=[_Obj(content=_Obj(parts=[part]))])
+
+
+class FakeGeminiClient:
+    """Just enough of genai.Client for gemini_service, answering after a fixed latency"""
+
+    def __init__(self, latency):
+        counter = itertools.count()
+
+        def generate_content(**kwargs):
+            time.sleep(latency)
+            return _fake_response(counter)
+
+        def generate_content_stream(**kwargs):
+            yield generate_content(**kwargs)
+
+        async def generate_content_async(**kwargs):
+            await asyncio.sleep(latency)
+            return _fake_response(counter)
+
+        self.models = _Obj(generate_content=generate_content, generate_content_stream=generate_content_stream)
+        self.aio = _Obj(models=_Obj(generate_content=generate_content_async))
+
+
+def start_in_process_app(model_latency, port):
+    scratch = tempfile.mkdtemp(prefix="load_test_chat_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}/load_test.db"
+    os.environ["TOOL_DISPATCH_MODE"] = "local"
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+
+    import logging
+    from werkzeug.serving import make_server
+
+    from app import app
+    import gemini_service
+    import tool_dispatch
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    tool_dispatch.TOOL_DISPATCH_MODE = "local"
+    gemini_service.client = FakeGeminiClient(model_latency)
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+async def log_in(base_url, index):
+    email = f"load-{uuid.uuid4().hex[:8]}-{index}@example.com"
+    client = httpx.AsyncClient(base_url=base_url, timeout=120)
+    await client.post("/api/register", json={"name": f"Колдонуучу {index}", "email": email, "password": "load-test"})
+    response = await client.post("/api/login", json={"email": email, "password": "load-test"})
+    response.raise_for_status()
+    return client
+
+
+async def simulate_user(client, deadline, latencies, errors):
+    for question in itertools.cycle(QUESTIONS):
+        if time.perf_counter() >= deadline:
+            return
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/chat", json={"message": question})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors.append(repr(e))
+
+
+async def main(args):
+    base_url = args.url or start_in_process_app(args.model_latency, args.port)
+    # Registration hashes passwords; keep it out of the measured window
+    clients = await asyncio.gather(*[log_in(base_url, i) for i in range(args.users)])
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*[simulate_user(client, deadline, latencies, errors) for client in clients])
+    elapsed = time.perf_counter() - started
+    await asyncio.gather(*[client.aclose() for client in clients])
+
+    latencies.sort()
+    print(f"{args.users} users, {elapsed:.1f} s against {base_url}")
+    print(f"requests: {len(latencies)}  errors: {len(errors)}  throughput: {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"latency: mean={statistics.mean(latencies) * 1000:.0f} ms  "
+              f"p50={statistics.median(latencies) * 1000:.0f} ms  p95={p95 * 1000:.0f} ms")
+    if errors:
+        print("first error:", errors[0])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--model-latency", type=float, default=0.5,
+                        help="seconds per fake Gemini call (in-process mode only)")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--url", help="drive a running deployment instead of an in-process app")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,39 @@
+# migrate_db.py
+"""
+One-shot migrations for an existing database, run once per deploy before
+the web workers start (the run commands in .replit do), instead of in every
+process that imports app: each gunicorn worker and every MCP stdio
+subprocess.
+
+Adds the columns and indexes declared in models.py that existing tables
+lack (migrations.run_migrations), then backfills the daily transaction
+rollups of databases created before the rollup table existed. Both hold a
+database-wide lock and re-check under it, so deploys that start several
+instances at once apply each change once.
+
+Run from the repository root:
+    python supporting/migrate_db.py
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import app
+from migrations import run_migrations
+import transaction_rollups
+
+
+def main():
+    with app.app_context():
+        run_migrations()
+        if transaction_rollups.ensure_rollups():
+            logging.info("Daily transaction rollups built")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.parse_args()
+    main()
@@ -0,0 +1,89 @@
+# recategorize_messages.py
+"""
+Re-run the question categorizer over stored chat messages, e.g. after the
+category keywords changed, and update ChatMessage.category_id where the
+result differs.
+
+Messages are read in id order, --chunk-size at a time (keyset pagination, so
+the cost per chunk stays flat on large tables), and every chunk is committed
+on its own; an interrupted run can be resumed with --start-after. Progress is
+printed after each chunk.
+
+Run from the repository root:
+    python supporting/recategorize_messages.py                       # every message
+    python supporting/recategorize_messages.py --uncategorized-only  # e.g. left over from a crashed worker
+    python supporting/recategorize_messages.py --chunk-size 5000 --dry-run
+    CATEGORIZER_BACKEND=embeddings python supporting/recategorize_messages.py  # needs sentence-transformers
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select
+
+from app import app
+from categorization_queue import apply_categories, categorize_messages
+from database import db
+from models import ChatMessage
+from supporting.categorization_service import question_categorizer
+
+
+def message_chunks(chunk_size, start_after, uncategorized_only):
+    """Lists of (id, message, category_id) rows in id order"""
+    last_id = start_after
+    while True:
+        query = select(ChatMessage.id, ChatMessage.message, ChatMessage.category_id).where(ChatMessage.id > last_id)
+        if uncategorized_only:
+            query = query.where(ChatMessage.category_id.is_(None))
+        rows = db.session.execute(query.order_by(ChatMessage.id).limit(chunk_size)).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def main(args):
+    with app.app_context():
+        question_categorizer.invalidate()  # always start from the categories as they are now
+        count_query = select(func.count(ChatMessage.id)).where(ChatMessage.id > args.start_after)
+        if args.uncategorized_only:
+            count_query = count_query.where(ChatMessage.category_id.is_(None))
+        total = db.session.execute(count_query).scalar()
+        print(f"{total} messages to categorize")
+
+        done = changed = 0
+        started = time.perf_counter()
+        for rows in message_chunks(args.chunk_size, args.start_after, args.uncategorized_only):
+            current = {row.id: row.category_id for row in rows}
+            groups = categorize_messages([(row.id, row.message) for row in rows], question_categorizer)
+            updates = {}
+            for category_id, message_ids in groups.items():
+                moved = [message_id for message_id in message_ids if current[message_id] != category_id]
+                if moved:
+                    updates[category_id] = moved
+            if updates and not args.dry_run:
+                apply_categories(updates)
+                db.session.commit()
+
+            done += len(rows)
+            changed += sum(len(ids) for ids in updates.values())
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed else 0
+            eta = (total - done) / rate if rate else 0
+            print(f"{done}/{total} ({done / max(total, 1):.0%})  changed {changed}  "
+                  f"{rate:.0f} msg/s  eta {eta:.0f} s  last id {rows[-1].id}", flush=True)
+        db.session.rollback()
+        print(f"{'Would change' if args.dry_run else 'Changed'} {changed} of {done} messages")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--start-after", type=int, default=0, help="resume after this message id")
+    parser.add_argument("--uncategorized-only", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,83 @@
+# warm_translations.py
+"""
+Pre-translate the product text of the generalInfo catalog into the
+translation cache, so ru/en product answers are served without a Gemini call.
+
+Every catalog tool is rendered in each target language for every card,
+deposit and about-us section (in-process, as TOOL_DISPATCH_MODE=local does).
+The marked Kyrgyz fragments are collected, and whatever is not cached yet is
+translated in batches through BankingChatbot.translate_fragments.
+Re-running only translates new or changed text.
+
+Run from the repository root:
+    python supporting/warm_translations.py                 # ru and en
+    python supporting/warm_translations.py --languages ru
+    python supporting/warm_translations.py --dry-run       # count fragments and cache hits only
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import app
+from gemini_service import banking_chatbot
+from demir_functions import list_all_card_names, list_all_deposit_names, load_about_us_data
+from response_templates import free_text_fragments
+from translation_cache import translation_cache
+import tool_dispatch
+
+CATALOG_TOOLS = [
+    "list_all_card_names", "get_bank_info", "get_bank_mission", "get_bank_values",
+    "get_ownership_info", "get_branch_network", "get_contact_info", "get_complete_about_us",
+    "list_all_deposit_names", "get_deposits_with_replenishment", "get_deposits_with_capitalization",
+    "get_government_securities", "get_child_deposits", "get_online_deposits",
+]
+CARD_TOOLS = ["get_card_details", "get_card_limits", "get_card_benefits",
+              "get_card_instructions", "get_card_conditions"]
+CURRENCIES = ["KGS", "USD", "EUR", "RUB"]
+
+
+def catalog_calls():
+    calls = [(name, {}) for name in CATALOG_TOOLS]
+    for card in list_all_card_names():
+        calls += [(name, {"card_name": card["name"]}) for name in CARD_TOOLS]
+    for deposit in list_all_deposit_names():
+        calls.append(("get_deposit_details", {"deposit_name": deposit["name"]}))
+    for section in load_about_us_data():
+        calls.append(("get_about_us_section", {"section": section}))
+    for currency in CURRENCIES:
+        calls.append(("get_cards_by_currency", {"currency": currency}))
+        calls.append(("get_deposits_by_currency", {"currency": currency}))
+    return calls
+
+
+async def collect_fragments(language):
+    fragments = {}
+    for name, arguments in catalog_calls():
+        result = await tool_dispatch.call_tool(name, dict(arguments, language=language), mode="local")
+        for block in result.content:
+            fragments.update(dict.fromkeys(free_text_fragments(getattr(block, "text", ""))))
+    return list(fragments)
+
+
+async def main(languages, dry_run):
+    with app.app_context():
+        for language in languages:
+            fragments = await collect_fragments(language)
+            cached = translation_cache.get_many(fragments, language)
+            print(f"{language}: {len(fragments)} fragments, {len(cached)} already cached")
+            if dry_run or len(cached) == len(fragments):
+                continue
+            await banking_chatbot.translate_fragments(fragments, language)
+            cached = translation_cache.get_many(fragments, language)
+            print(f"{language}: {len(cached)} cached, {len(fragments) - len(cached)} failed (retry later)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--languages", nargs="+", default=["ru", "en"], choices=["ru", "en"])
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.languages, args.dry_run))
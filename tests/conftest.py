@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# app.py opens DATABASE_URL and gemini_service builds its client when imported:
+# tests that import them get a throwaway database and a dummy key
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/banking_chatbot.db"
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+import pytest
+from flask import Flask
+from google import genai
+from google.genai import types
+
+from database import db
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app bound to a fresh SQLite database, with an app context pushed"""
+    import models
+    import recipient_lookup
+    import transaction_rollups
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'bank.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    """
+    Just the cachedContents and generateContent endpoints of the Gemini API.
+    generateContent answers with the next of `replies` (candidate contents),
+    then with a plain greeting; listing cachedContents returns `cached_contents`.
+    """
+    calls = []
+    replies = []
+    cached_contents = []
+    fail_create = False
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        path = self.path.split("?")[0]
+        self.calls.append((self.command, path, body))
+        if path.endswith("/cachedContents") and self.command == "GET":
+            return self._reply(200, {"cachedContents": self.cached_contents})
+        if path.endswith("/cachedContents") and self.fail_create:
+            return self._reply(400, {"error": {"code": 400, "message": "Cached content is too small",
+                                               "status": "INVALID_ARGUMENT"}})
+        if "cachedContents" in path:
+            return self._reply(200, {"name": "cachedContents/prefix-1", "usageMetadata": {"totalTokenCount": 5000}})
+        cached = 5000 if body.get("cachedContent") else 0
+        content = self.replies.pop(0) if self.replies else {"role": "model", "parts": [{"text": "Салам!"}]}
+        return self._reply(200, {
+            "candidates": [{"content": content}],
+            "usageMetadata": {"promptTokenCount": 5040, "cachedContentTokenCount": cached},
+        })
+
+    do_GET = do_POST = do_PATCH = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gemini():
+    """genai.Client talking to a FakeGemini server"""
+    FakeGemini.calls = []
+    FakeGemini.replies = []
+    FakeGemini.cached_contents = []
+    FakeGemini.fail_create = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield genai.Client(api_key="test", http_options=types.HttpOptions(
+        base_url=f"http://127.0.0.1:{server.server_address[1]}"))
+    server.shutdown()
@@ -0,0 +1,94 @@
+"""
+Query-count regression tests for the transaction listings in bank_functions.
+
+Each listing must resolve counterparty names in the same query as the
+transactions, so the number of statements does not grow with the history.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from database import db
+from models import Account, Transaction, User
+import bank_functions
+
+
+@pytest.fixture
+def customer(app):
+    """A user with 20 transfers to and from 10 other users"""
+    users = [User(name=f"User {i}", email=f"user{i}@example.com", password_hash="x") for i in range(11)]
+    db.session.add_all(users)
+    db.session.flush()
+    accounts = [Account(user_id=u.id, account_type="checking", balance=Decimal("1000.00")) for u in users]
+    db.session.add_all(accounts)
+    db.session.flush()
+    start = datetime(2025, 1, 1, 12, 0)
+    for i in range(20):
+        other = accounts[1 + i % 10]
+        outgoing = i % 2 == 0
+        db.session.add(Transaction(
+            account_from_id=accounts[0].id if outgoing else other.id,
+            account_to_id=other.id if outgoing else accounts[0].id,
+            type="Которуу",
+            amount=Decimal(10 + i),
+            timestamp=start + timedelta(hours=i),
+        ))
+    db.session.commit()
+    # Load the (commit-expired) customer now so its refresh is not counted
+    db.session.refresh(users[0])
+    return users[0]
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_get_transactions_query_count(customer):
+    with count_queries() as statements:
+        txs, err = bank_functions.get_transactions(customer, limit=20)
+    assert err is None
+    assert len(txs) == 20
+    # accounts of the user + one joined transaction query
+    assert len(statements) == 2
+    # newest first: i=19 is incoming from User 10, i=18 outgoing to User 9
+    assert txs[0]["direction"] == "<- User 10"
+    assert txs[1]["direction"] == "-> User 9"
+
+
+def test_get_last_3_transfer_recipients_query_count(customer):
+    with count_queries() as statements:
+        recipients, err = bank_functions.get_last_3_transfer_recipients(customer)
+    assert err is None
+    assert recipients == ["User 9", "User 7", "User 5"]
+    assert len(statements) == 2
+
+
+def test_get_largest_transaction_query_count(customer):
+    with count_queries() as statements:
+        tx, err = bank_functions.get_largest_transaction(customer)
+    assert err is None
+    assert tx["amount"] == 29.0
+    assert tx["direction"] == "<- User 10"
+    assert len(statements) == 2
+
+
+def test_get_last_incoming_transaction_query_count(customer):
+    with count_queries() as statements:
+        _, message = bank_functions.get_last_incoming_transaction(customer)
+    assert "User 10" in message
+    assert "29.00" in message
+    assert len(statements) == 2
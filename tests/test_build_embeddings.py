@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+
+from embeddings import EmbeddingStore, TrigramEncoder
+from faq_index import FaqIndex
+from supporting.build_embeddings import build, documents, embeddable_texts
+
+FAQ = {
+    "useful-info": {
+        "cards": [
+            {"question": "Картаны кантип заказ кылса болот?", "answer": "Филиалдан же тиркемеден."},
+            {"question": "Карта жоголсо эмне кылуу керек?", "answer": "Бөгөттөңүз."},
+            {"question": "Картаны кантип заказ кылса болот?", "answer": "Онлайн."},
+        ],
+        "loans": [{"question": "Кредит алуу үчүн кандай документтер керек?", "answer": "Паспорт."}],
+    }
+}
+
+
+class CountingEncoder(TrigramEncoder):
+    def __init__(self, dimensions=256):
+        super().__init__(dimensions)
+        self.batches = []
+
+    def __call__(self, texts):
+        texts = list(texts)
+        self.batches.append(len(texts))
+        return super().__call__(texts)
+
+
+def write_faq(path, data=FAQ):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_texts_are_questions_and_described_names():
+    data = {"a": [{"question": "Q?", "answer": "A"}, {"name": "Card", "descr": "Nice"}, {"name": "Bare"}]}
+    assert embeddable_texts(data) == ["Q?", "Card: Nice"]
+    assert embeddable_texts(FAQ) == [
+        "Картаны кантип заказ кылса болот?", "Карта жоголсо эмне кылуу керек?",
+        "Кредит алуу үчүн кандай документтер керек?",
+    ]
+
+
+def test_only_changed_texts_are_encoded(tmp_path):
+    path = tmp_path / "useful-info.json"
+    write_faq(path)
+    encoder = CountingEncoder()
+    assert build(path, encoder, batch_size=2) == (3, 0, 3, 0)
+    assert encoder.batches == [2, 1]
+    store = EmbeddingStore(path)
+    assert np.load(store.vectors_path).shape == (3, 256)
+
+    written = store.vectors_path.stat().st_mtime_ns
+    assert build(path, encoder) == (3, 3, 0, 0)
+    assert encoder.batches == [2, 1] and store.vectors_path.stat().st_mtime_ns == written
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["useful-info"]["loans"][0]["question"] = "Насыя алуу үчүн кандай документтер керек?"
+    write_faq(path, data)
+    assert build(path, encoder) == (3, 2, 1, 1)
+    assert encoder.batches[-1] == 1
+    rows, matrix = store.load(encoder.name)
+    assert len(rows) == matrix.shape[0] == 3
+
+
+def test_faq_index_reads_the_sidecar(tmp_path):
+    path = tmp_path / "useful-info.json"
+    write_faq(path)
+    build(path, CountingEncoder())
+
+    encoder = CountingEncoder()
+    index = FaqIndex(FAQ["useful-info"], encoder, EmbeddingStore(path))
+    assert encoder.batches == []
+    assert np.allclose(index.matrix, FaqIndex(FAQ["useful-info"], CountingEncoder()).matrix)
+    assert index.search("Карта жоголсо эмне кылам?")[0].entry.section == "cards"
+
+    # Vectors of another encoder are never mixed in
+    other = CountingEncoder(128)
+    assert FaqIndex(FAQ["useful-info"], other, EmbeddingStore(path)).matrix.shape == (4, 128)
+    assert other.batches == [4]
+
+
+def test_sidecars_are_not_documents(tmp_path):
+    path = tmp_path / "useful-info.json"
+    write_faq(path)
+    build(path, CountingEncoder())
+    assert list(documents([tmp_path])) == [path]
@@ -0,0 +1,48 @@
+from database import db
+from models import ChatMessage, QuestionCategory, User
+from categorization_queue import CategorizationQueue, apply_categories, categorize_messages
+from supporting.categorization_service import QuestionCategorizer
+
+
+def _messages(texts):
+    user = User(name="Айзада", email="a@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    messages = [ChatMessage(user_id=user.id, message=text, response="ok") for text in texts]
+    db.session.add_all(messages)
+    db.session.commit()
+    return [(m.id, m.message) for m in messages]
+
+
+def _categories():
+    return {m.id: (m.category.name if m.category else None) for m in ChatMessage.query.all()}
+
+
+def test_queue_backfills_categories_in_batches(app):
+    categorizer = QuestionCategorizer()
+    queue = CategorizationQueue(categorizer, batch_size=2, flush_seconds=0.05)
+    saved = _messages(["What is the ATM fee?", "I forgot my online banking password", "Салам", "Loan interest rate?"])
+    for message_id, text in saved:
+        queue.submit(app, message_id, text)
+    queue.close(timeout=10)
+
+    db.session.expire_all()
+    assert list(_categories().values()) == ["Fees & Charges", "Online Banking", None, "Loans & Credit"]
+
+
+def test_recategorizing_moves_and_clears(app):
+    categorizer = QuestionCategorizer()
+    saved = _messages(["What is the ATM fee?", "Салам"])
+    apply_categories(categorize_messages(saved, categorizer))
+    db.session.commit()
+    fees = QuestionCategory.query.filter_by(name="Fees & Charges").one()
+    assert _categories() == {saved[0][0]: "Fees & Charges", saved[1][0]: None}
+
+    fees.keywords = '["комиссия"]'
+    db.session.commit()
+    groups = categorize_messages(saved, categorizer)
+    assert set(groups[None]) == {saved[0][0], saved[1][0]}
+    apply_categories(groups)
+    db.session.commit()
+    db.session.expire_all()
+    assert set(_categories().values()) == {None}
@@ -0,0 +1,71 @@
+import json
+
+from sqlalchemy import event
+
+from database import db
+from models import QuestionCategory
+from supporting.categorization_service import KeywordAutomaton, QuestionCategorizer
+
+QUESTIONS = [
+    "What is the minimum balance for a savings account type?",
+    "How do I reset my online banking password?",
+    "Is there an ATM fee abroad?",
+    "My card was stolen, I see suspicious charges",
+    "What is the interest rate on a home loan?",
+    "Where is the nearest branch and what are the hours?",
+    "Балансым канча?",
+    "",
+]
+
+
+def substring_scan(question, categories):
+    """The categorizer before the automaton: every keyword of every category against the text"""
+    best_match, best_score = None, 0
+    for category in categories:
+        keywords = json.loads(category.keywords or '[]')
+        score = sum(keyword.lower() in question.lower() for keyword in keywords)
+        if keywords:
+            score = score / len(keywords)
+        if score > best_score:
+            best_match, best_score = category, score
+    return best_match.name if best_score > 0.1 else None
+
+
+def count_queries():
+    queries = []
+    event.listen(db.engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    return queries
+
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "hers", "account", "account type", "atm", "atm fee"])
+    assert automaton.find("ushers account type atm fee") == {
+        "he", "she", "hers", "account", "account type", "atm", "atm fee"}
+    assert automaton.find("") == set()
+
+
+def test_same_categories_as_the_substring_scan(app):
+    categorizer = QuestionCategorizer()
+    categorizer.initialize_categories()
+    categories = QuestionCategory.query.order_by(QuestionCategory.id).all()
+    for question in QUESTIONS:
+        match = categorizer.categorize_question(question)
+        assert (match.name if match else None) == substring_scan(question, categories), question
+
+
+def test_categorizing_does_not_query_the_database(app):
+    categorizer = QuestionCategorizer()
+    categorizer.categorize_question("warm up")
+    queries = count_queries()
+    for question in QUESTIONS:
+        categorizer.categorize_question(question)
+    assert queries == []
+
+
+def test_matcher_is_rebuilt_when_categories_change(app):
+    categorizer = QuestionCategorizer()
+    assert categorizer.categorize_question("Балансым канча?") is None
+    db.session.add(QuestionCategory(name="Баланс", keywords=json.dumps(["баланс"])))
+    db.session.commit()
+    match = categorizer.categorize_question("Балансым канча?")
+    assert match.name == "Баланс" and match.score == 1
@@ -0,0 +1,125 @@
+import json
+import uuid
+
+import pytest
+
+from app import app as chat_app
+from database import db
+from gemini_service import banking_chatbot
+from models import ChatMessage, User
+from response_templates import ChatReply, RENDER_TEMPLATE
+
+QUESTION = "What is my account balance?"
+
+
+def read_events(body):
+    """(event, data) pairs of an SSE body, framed the way static/js/chat.js reads it"""
+    events = []
+    for raw_event in body.split("\n\n"):
+        event, data_lines = "message", []
+        for line in raw_event.split("\n"):
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+        if data_lines:
+            events.append((event, json.loads("\n".join(data_lines))))
+    return events
+
+
+@pytest.fixture
+def client():
+    with chat_app.app_context():
+        user = User(name="Айбек", email=f"{uuid.uuid4().hex}@example.com")
+        user.set_password("secret")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = chat_app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+    return client
+
+
+def test_stream_events_end_with_the_chat_payload(client, monkeypatch):
+    def stream_response(user_message, conversation_history=None, user=None):
+        yield "progress", {"tool": "get_balance"}
+        yield "delta", {"text": "Балансыңыз "}
+        yield "delta", {"text": "100 сом"}
+        yield "reply", ChatReply("Балансыңыз 100 сом", RENDER_TEMPLATE)
+
+    monkeypatch.setattr(banking_chatbot, "stream_response", stream_response)
+    response = client.post("/api/chat/stream", json={"message": QUESTION})
+    assert response.status_code == 200 and response.mimetype == "text/event-stream"
+
+    events = read_events(response.get_data(as_text=True))
+    assert [event for event, _ in events] == ["progress", "delta", "delta", "done"]
+    assert events[0][1] == {"tool": "get_balance"}
+    assert "".join(data["text"] for event, data in events if event == "delta") == "Балансыңыз 100 сом"
+    done = events[-1][1]
+    assert done["response"] == "Балансыңыз 100 сом"
+    assert done["render_path"] == RENDER_TEMPLATE
+    assert done["category"] == "Account Services"
+    with chat_app.app_context():
+        saved = db.session.get(ChatMessage, done["message_id"])
+        assert saved.message == QUESTION and saved.category.name == "Account Services"
+
+
+def test_chat_and_stream_return_the_same_payload_keys(client, monkeypatch):
+    monkeypatch.setattr(banking_chatbot, "get_response",
+                        lambda *args, **kwargs: ChatReply("Балансыңыз 100 сом", RENDER_TEMPLATE))
+    monkeypatch.setattr(banking_chatbot, "stream_response",
+                        lambda *args, **kwargs: iter([("reply", ChatReply("Балансыңыз 100 сом", RENDER_TEMPLATE))]))
+    chat = client.post("/api/chat", json={"message": QUESTION}).get_json()
+    done = read_events(client.post("/api/chat/stream", json={"message": QUESTION}).get_data(as_text=True))[-1][1]
+    assert set(chat) == set(done)
+    assert chat["category"] == done["category"] == "Account Services"
+
+
+def test_stream_failure_is_an_error_event(client, monkeypatch):
+    def stream_response(*args, **kwargs):
+        yield "progress", {"tool": "get_balance"}
+        raise RuntimeError("model went away")
+
+    monkeypatch.setattr(banking_chatbot, "stream_response", stream_response)
+    events = read_events(client.post("/api/chat/stream", json={"message": QUESTION}).get_data(as_text=True))
+    assert [event for event, _ in events] == ["progress", "error"]
+
+
+def test_user_deleted_before_the_stream_starts_is_an_error_event(client, monkeypatch):
+    import routes
+    recent_conversation = routes.recent_conversation
+
+    def delete_user(user):
+        history = recent_conversation(user)
+        db.session.delete(user)
+        db.session.commit()
+        return history
+
+    monkeypatch.setattr(routes, "recent_conversation", delete_user)
+    events = read_events(client.post("/api/chat/stream", json={"message": QUESTION}).get_data(as_text=True))
+    assert events == [("error", {"error": "User not found"})]
+
+
+def test_database_error_before_the_stream_starts_is_an_error_event(client, monkeypatch):
+    def get(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(db.session, "get", get)
+    events = read_events(client.post("/api/chat/stream", json={"message": QUESTION}).get_data(as_text=True))
+    assert [event for event, _ in events] == ["error"]
+
+
+@pytest.mark.parametrize("endpoint", ["/api/chat", "/api/chat/stream"])
+@pytest.mark.parametrize("body", [
+    dict(),
+    dict(data="not json", content_type="text/plain"),
+    dict(data="{", content_type="application/json"),
+    dict(json=["a list"]),
+    dict(json={"message": 42}),
+    dict(json={"message": "   "}),
+])
+def test_bad_bodies_are_rejected(client, endpoint, body):
+    response = client.post(endpoint, **body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Message cannot be empty"}
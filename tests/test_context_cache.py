@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from conftest import FakeGemini
+from context_cache import ContextCache
+
+SYSTEM_INSTRUCTION = "Сен банк ассистентисиң."
+TOOLS = [{"function_declarations": [{"name": "get_balance", "description": "Баланс",
+                                     "parameters": {"type": "object", "properties": {}}}]}]
+
+
+class Clock:
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(client, clock, **kwargs):
+    return ContextCache(client, "gemini-2.5-flash", SYSTEM_INSTRUCTION, TOOLS,
+                        enabled=True, ttl=3600, refresh=300, retry=600, clock=clock, **kwargs)
+
+
+def _methods():
+    return [(method, path.rsplit("/", 1)[-1]) for method, path, _ in FakeGemini.calls]
+
+
+def test_prefix_is_uploaded_once_and_referenced(gemini):
+    cache = _cache(gemini, Clock())
+
+    async def two_requests():
+        saved = []
+        for _ in range(2):
+            name = await cache.cached_content_name()
+            response = await gemini.aio.models.generate_content(
+                model="gemini-2.5-flash", contents=["Салам"], config=cache.request_config(name, temperature=0.7))
+            saved.append(cache.record_usage(response, name))
+        return saved
+
+    assert asyncio.run(two_requests()) == [5000, 5000]
+    assert _methods() == [("GET", "cachedContents"), ("POST", "cachedContents"),
+                          ("POST", "gemini-2.5-flash:generateContent"), ("POST", "gemini-2.5-flash:generateContent")]
+    created = FakeGemini.calls[1][2]
+    assert created["systemInstruction"]["parts"][0]["text"] == SYSTEM_INSTRUCTION
+    assert created["ttl"] == "3600s"
+    request = FakeGemini.calls[2][2]
+    assert request["cachedContent"] == "cachedContents/prefix-1"
+    assert "tools" not in request and "systemInstruction" not in request
+    assert cache.stats == {"requests": 2, "cached_requests": 2, "tokens_saved": 10000}
+
+
+def test_ttl_is_extended_before_expiry(gemini):
+    clock = Clock()
+    cache = _cache(gemini, clock)
+    asyncio.run(cache.cached_content_name())
+    clock.now += 3600 - 299
+    assert asyncio.run(cache.cached_content_name()) == "cachedContents/prefix-1"
+    assert _methods() == [("GET", "cachedContents"), ("POST", "cachedContents"), ("PATCH", "prefix-1")]
+    assert cache.expires_at == clock.now + 3600
+
+
+def test_falls_back_to_inline_prompt_and_retries_later(gemini):
+    clock = Clock()
+    cache = _cache(gemini, clock)
+    FakeGemini.fail_create = True
+    assert asyncio.run(cache.cached_content_name()) is None
+    assert asyncio.run(cache.cached_content_name()) is None
+    assert _methods() == [("GET", "cachedContents"), ("POST", "cachedContents")]
+
+    config = cache.request_config(None, temperature=0.7)
+    assert config.system_instruction == SYSTEM_INSTRUCTION and config.tools and not config.cached_content
+
+    FakeGemini.fail_create = False
+    clock.now += 600
+    assert asyncio.run(cache.cached_content_name()) == "cachedContents/prefix-1"
+
+
+def test_rejected_handle_is_recreated_after_the_retry_interval(gemini):
+    clock = Clock()
+    cache = _cache(gemini, clock)
+    name = asyncio.run(cache.cached_content_name())
+    cache.invalidate(name)
+    assert asyncio.run(cache.cached_content_name()) is None
+    clock.now += 600
+    assert asyncio.run(cache.cached_content_name()) == name
+    assert _methods() == [("GET", "cachedContents"), ("POST", "cachedContents")] * 2
+
+
+def test_disabled_cache_never_calls_the_api(gemini):
+    cache = _cache(gemini, Clock())
+    cache.enabled = False
+    assert asyncio.run(cache.cached_content_name()) is None
+    assert FakeGemini.calls == []
+
+
+def listed(cache, name, seconds_left, display_name=None):
+    expire = datetime.now(timezone.utc) + timedelta(seconds=seconds_left)
+    return {"name": name, "model": "models/gemini-2.5-flash", "displayName": display_name or cache.display_name,
+            "expireTime": expire.isoformat().replace("+00:00", "Z"), "usageMetadata": {"totalTokenCount": 5000}}
+
+
+def test_live_cache_of_another_process_is_reused(gemini):
+    clock = Clock()
+    cache = _cache(gemini, clock)
+    FakeGemini.cached_contents = [
+        listed(cache, "cachedContents/other-prompt", 3000, display_name="banking-chat-0000000000000000"),
+        listed(cache, "cachedContents/expiring", 200),
+        listed(cache, "cachedContents/shared", 3000),
+    ]
+    assert asyncio.run(cache.cached_content_name()) == "cachedContents/shared"
+    assert _methods() == [("GET", "cachedContents")]
+    assert 2990 < cache.expires_at - clock.now <= 3000 and cache.cached_tokens == 5000
+    # Extended like one this process created
+    clock.now += 3000 - 299
+    assert asyncio.run(cache.cached_content_name()) == "cachedContents/shared"
+    assert _methods()[-1] == ("PATCH", "shared")
+
+
+def test_only_the_full_tool_set_is_uploaded():
+    from app import app  # noqa: F401 (gemini_service is imported through the app)
+    from context_cache import CONTEXT_CACHE_ENABLED
+    from gemini_service import BankingChatbot
+    from intent_router import ALL_TOOLS
+
+    chatbot = BankingChatbot()
+    routed = chatbot.context_cache_for("Балансым канча?")
+    full = chatbot.context_cache_for("Салам!")
+    assert not routed.enabled
+    assert len(routed.tools[0]["function_declarations"]) < len(ALL_TOOLS)
+    assert full.enabled == CONTEXT_CACHE_ENABLED and chatbot.context_caches[ALL_TOOLS] is full
+    assert len(full.tools[0]["function_declarations"]) == len(ALL_TOOLS)
+    assert chatbot.context_cache_for("Менин балансым канча?") is routed
@@ -0,0 +1,63 @@
+import pytest
+
+import embeddings
+from embeddings import TrigramEncoder
+import supporting.embedding_categorizer as embedding_categorizer
+from models import QuestionCategory
+from supporting.categorization_service import CategoryMatcher, QuestionCategorizer
+from supporting.embedding_categorizer import EmbeddingMatcher
+
+
+def trigram_encoder(calls):
+    """Deterministic stand-in for a sentence model that records its batch sizes"""
+    encoder = TrigramEncoder(512)
+
+    def encode(texts):
+        texts = list(texts)
+        calls.append(len(texts))
+        return encoder(texts)
+    return encode
+
+
+def test_nearest_centroid_in_one_batch(app):
+    QuestionCategorizer(backend="keywords").initialize_categories()
+    calls = []
+    matcher = EmbeddingMatcher(QuestionCategory.query.all(), trigram_encoder(calls), min_similarity=0.2)
+    assert calls == [sum(len(embedding_categorizer.category_texts(c)) for c in QuestionCategory.query.all())]
+
+    matches = matcher.match_many(["Картам уурдалып кетти!", "Какая комиссия за снятие наличных?", "zzzz qqqq"])
+    assert calls[1:] == [3]
+    assert [m.name if m else None for m in matches] == ["Security & Fraud", "Fees & Charges", None]
+    assert 0.2 <= matches[0].score <= 1
+
+
+def test_categorizer_uses_the_embedding_backend_for_batches(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(embeddings, "sentence_transformers_installed", lambda: True)
+    monkeypatch.setattr(embedding_categorizer, "sentence_encoder", lambda: trigram_encoder(calls))
+    monkeypatch.setattr(embedding_categorizer, "CATEGORY_EMBEDDING_MIN_SIMILARITY", 0.2)
+    categorizer = QuestionCategorizer(backend="embeddings")
+    assert isinstance(categorizer.matcher(), EmbeddingMatcher)
+    matches = categorizer.categorize_questions(["Мою карту украли", "Где ближайший банкомат?"])
+    assert [m.name for m in matches] == ["Security & Fraud", "Customer Service"]
+    assert calls[-1] == 2
+
+
+def test_embedding_backend_refuses_to_start_without_sentence_transformers(monkeypatch):
+    monkeypatch.setattr(embeddings, "sentence_transformers_installed", lambda: False)
+    with pytest.raises(RuntimeError, match="sentence-transformers"):
+        QuestionCategorizer(backend="embeddings")
+    with pytest.raises(RuntimeError, match="sentence-transformers"):
+        embedding_categorizer.sentence_encoder()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="CATEGORIZER_BACKEND"):
+        QuestionCategorizer(backend="embedding")
+
+
+def test_keyword_backend_needs_nothing_extra(app, monkeypatch):
+    monkeypatch.setattr(embeddings, "sentence_transformers_installed", lambda: False)
+    categorizer = QuestionCategorizer(backend="keywords")
+    assert isinstance(categorizer.matcher(), CategoryMatcher)
+    assert categorizer.categorize_question("What is the ATM fee?").name == "Fees & Charges"
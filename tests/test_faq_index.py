@@ -0,0 +1,122 @@
+import json
+import logging
+import runpy
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import faq_index
+from embeddings import SentenceEncoder, TrigramEncoder
+from faq_index import FaqIndex, build_faq_index, direct_answer_similarity, faq_catalog, is_kyrgyz
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Reworded questions -> the FAQ question that answers them
+KY_PARAPHRASES = {
+    "Карта жоголсо эмне кылам?": "Карта жоголсо же уурдалса эмне кылуу керек?",
+    "Картага кантип заказ берем?": "Картаны кантип заказ кылса болот?",
+    "Кредит алууга кайсы документтер керек?": "Кредит алуу үчүн кандай документтер керек?",
+    "Ипотека насыясын кантип алам?": "Ипотекалык насыяны кантип алса болот?",
+    "Интернет-банкингге кантип катталса болот?": "Интернет-банкингге кантип катталам?",
+    "Паролду унутуп калдым, эмне кылам?": "Паролумду унутуп калсам эмне кылам?",
+    "Депозит эсебин кантип ачса болот?": "Депозиттик эсепти кантип ачам?",
+    "Депозитти мөөнөтүнөн эрте жапса болобу?": "Депозитти мөөнөтүнөн мурда жапсам болобу?",
+    "Филиалдар саат канчада иштейт?": "DemirBank филиалдарынын жумуш убактысы кандай?",
+    "Салыкты онлайн кантип төлөйм?": "Салыктарды онлайн кантип төлөсө болот?",
+    "Айып пулду кантип текшерем?": "Айып пулдарды кантип текшерип жана төлөсө болот?",
+    "Кардарларды колдоо кызматынын телефону кандай?": "Кардарларды колдоо телефону кайсы?",
+}
+CROSS_LANGUAGE_PARAPHRASES = {
+    "Что делать, если карта потерялась?": "Карта жоголсо же уурдалса эмне кылуу керек?",
+    "Какие документы нужны для кредита?": "Кредит алуу үчүн кандай документтер керек?",
+    "Я забыл пароль, что делать?": "Паролумду унутуп калсам эмне кылам?",
+    "Можно ли закрыть депозит досрочно?": "Депозитти мөөнөтүнөн мурда жапсам болобу?",
+    "How do I pay taxes online?": "Салыктарды онлайн кантип төлөсө болот?",
+    "How can I get a mortgage?": "Ипотекалык насыяны кантип алса болот?",
+    "How do I register for internet banking?": "Интернет-банкингге кантип катталам?",
+    "What is the customer support phone number?": "Кардарларды колдоо телефону кайсы?",
+}
+FAQ = json.loads(faq_catalog.path.read_text(encoding="utf-8"))["useful-info"]
+
+
+def recall_at_3(index, paraphrases):
+    found = 0
+    for query, question in paraphrases.items():
+        hits = index.search(query, k=3, min_similarity=0)
+        found += question in [hit.entry.question for hit in hits]
+    return found / len(paraphrases)
+
+
+@pytest.fixture(scope="module")
+def trigram_index():
+    return FaqIndex(FAQ, TrigramEncoder())
+
+
+def test_matrix_is_normalized_float32(trigram_index):
+    matrix = trigram_index.matrix
+    assert matrix.dtype == "float32" and matrix.shape[0] == len(trigram_index.entries) > 150
+    assert abs(float((matrix[0] ** 2).sum()) - 1) < 1e-5
+
+
+def test_kyrgyz_paraphrases_are_found(trigram_index):
+    assert recall_at_3(trigram_index, KY_PARAPHRASES) >= 0.9
+
+
+def test_hits_are_ranked_and_thresholded(trigram_index):
+    hits = trigram_index.search("Карта жоголсо эмне кылам?")
+    assert 1 <= len(hits) <= 3
+    assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+    assert trigram_index.search("Салам!") == []
+    assert trigram_index.search("   ") == []
+
+
+def test_direct_answer_only_for_near_repeats_in_kyrgyz(trigram_index):
+    hit = trigram_index.direct_answer("Картаны кантип заказ кылса болот?")
+    assert hit is not None and hit.entry.section == "cards"
+    assert trigram_index.direct_answer("Карта жоголсо эмне кылам?") is None
+    assert trigram_index.direct_answer("Балансым канча?") is None
+    assert is_kyrgyz("Балансым канча?") and not is_kyrgyz("Какой у меня баланс?")
+
+
+def test_trigram_direct_answers_never_pick_another_question(trigram_index):
+    for entry in trigram_index.entries:
+        for query in (entry.question, entry.question.rstrip("?").lower(), entry.question.rsplit(" ", 1)[0]):
+            hit = trigram_index.direct_answer(query)
+            assert hit is None or hit.entry.question == entry.question, query
+
+
+def test_direct_answer_threshold_depends_on_the_encoder(monkeypatch):
+    assert direct_answer_similarity(TrigramEncoder()) == faq_index.DIRECT_ANSWER_SIMILARITY["trigrams"]
+    assert direct_answer_similarity(SentenceEncoder(None, "model")) == faq_index.DIRECT_ANSWER_SIMILARITY["sentence"]
+    assert faq_index.DIRECT_ANSWER_SIMILARITY["trigrams"] > faq_index.DIRECT_ANSWER_SIMILARITY["sentence"]
+    monkeypatch.setattr(faq_index, "FAQ_DIRECT_ANSWER_SIMILARITY", "0.5")
+    assert direct_answer_similarity(TrigramEncoder()) == 0.5
+
+
+def test_index_build_logs_the_encoder(caplog, monkeypatch):
+    monkeypatch.setattr(faq_index, "default_encoder", TrigramEncoder)
+    with caplog.at_level(logging.INFO):
+        index = build_faq_index(FAQ)
+    assert f"embedded with {index.encoder.name}" in caplog.text
+    assert f">= {faq_index.DIRECT_ANSWER_SIMILARITY['trigrams']}" in caplog.text
+
+
+def test_importing_app_leaves_the_index_to_the_web_workers():
+    # A fresh interpreter: this one may have built the index in another test
+    code = "import app; from faq_index import faq_catalog; print(faq_catalog._snapshot is None)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert result.stdout.strip().splitlines()[-1] == "True", result.stderr[-2000:]
+
+    hooks = runpy.run_path(str(ROOT / "gunicorn.conf.py"))
+    hooks["post_worker_init"](None)
+    assert faq_catalog._snapshot is not None and faq_catalog._snapshot.index is not None
+
+
+def test_sentence_model_finds_russian_and_english_paraphrases():
+    pytest.importorskip("sentence_transformers")
+    from embeddings import sentence_encoder
+    index = FaqIndex(FAQ, sentence_encoder())
+    assert recall_at_3(index, KY_PARAPHRASES) >= 0.9
+    assert recall_at_3(index, CROSS_LANGUAGE_PARAPHRASES) >= 0.75
@@ -0,0 +1,233 @@
+import asyncio
+import time
+
+import anyio
+import pytest
+
+import mcp_pool
+from mcp_pool import MCPSessionPool
+
+
+class StubSession:
+    """
+    Stands in for PooledSession: no server process, the stub is its own
+    ClientSession. `call_errors` are raised by the next calls, in order.
+    """
+
+    def __init__(self, number):
+        self.number = number
+        self.session = self
+        self.started = self.closed = self.dead = False
+        self.ping_error = None
+        self.ping_delay = 0
+        self.call_errors = []
+        self.call_delay = 0
+
+    @property
+    def alive(self):
+        return self.started and not self.closed and not self.dead
+
+    async def start(self):
+        self.started = True
+
+    async def ping(self, timeout):
+        if self.ping_error:
+            raise self.ping_error
+        await asyncio.wait_for(asyncio.sleep(self.ping_delay), timeout)
+
+    async def call_tool(self, tool_name, arguments):
+        if self.call_errors:
+            raise self.call_errors.pop(0)
+        await asyncio.sleep(self.call_delay)
+        return self.number, tool_name
+
+    async def close(self):
+        self.closed = True
+
+
+class StubFactory:
+    """Session factory for MCPSessionPool; the next `fail_starts` spawns fail"""
+
+    def __init__(self):
+        self.sessions = []
+        self.attempts = []
+        self.fail_starts = 0
+
+    def __call__(self, server_params):
+        self.attempts.append(time.monotonic())
+        if self.fail_starts:
+            self.fail_starts -= 1
+            return FailingSession()
+        session = StubSession(len(self.sessions))
+        self.sessions.append(session)
+        return session
+
+
+class FailingSession(StubSession):
+    def __init__(self):
+        super().__init__(-1)
+
+    async def start(self):
+        raise RuntimeError("server did not start")
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    monkeypatch.setattr(mcp_pool, "MCP_RESPAWN_BACKOFF", 0.02)
+    return StubFactory()
+
+
+def run_with_pool(factory, scenario, **settings):
+    """Run `scenario(pool)` on a started pool of stub sessions, then close the pool"""
+    settings = {"size": 2, "acquire_timeout": 1, "health_interval": 60, "call_timeout": 1, "health_timeout": 1,
+                **settings}
+
+    async def main():
+        pool = MCPSessionPool(session_factory=factory, **settings)
+        await pool.start()
+        try:
+            return await scenario(pool)
+        finally:
+            await pool.close()
+
+    return asyncio.run(main())
+
+
+async def settle(pool):
+    """Wait for scheduled respawns to finish"""
+    while pool._background:
+        await asyncio.gather(*pool._background, return_exceptions=True)
+
+
+def test_calls_round_trip_and_are_counted(factory):
+    async def scenario(pool):
+        results = await asyncio.gather(*[pool.call_tool("get_balance", {}) for _ in range(3)])
+        return results, pool.metrics.snapshot()
+
+    results, metrics = run_with_pool(factory, scenario)
+    assert [name for _, name in results] == ["get_balance"] * 3
+    assert {number for number, _ in results} <= {0, 1}
+    assert (metrics["acquisitions"], metrics["calls"], metrics["call_failures"]) == (3, 3, 0)
+    assert metrics["acquire_timeouts"] == metrics["respawns"] == 0
+    assert 0 <= metrics["wait_ms_p50"] <= metrics["wait_ms_p99"] <= metrics["wait_ms_max"]
+
+
+def test_acquire_times_out_when_every_session_is_busy(factory):
+    async def scenario(pool):
+        factory.sessions[0].call_delay = 0.5
+        busy = asyncio.create_task(pool.call_tool("slow", {}))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await pool.call_tool("fast", {})
+        waited = time.monotonic() - started
+        await busy
+        return waited, pool.metrics.snapshot()
+
+    waited, metrics = run_with_pool(factory, scenario, size=1, acquire_timeout=0.1)
+    assert 0.1 <= waited < 0.4
+    assert metrics["acquire_timeouts"] == 1
+    assert (metrics["acquisitions"], metrics["calls"]) == (1, 1)
+
+
+def test_a_dead_session_is_respawned_with_backoff(factory):
+    async def scenario(pool):
+        factory.sessions[0].dead = True
+        factory.fail_starts = 2
+        result = await pool.call_tool("get_balance", {})
+        return result, pool.metrics.snapshot()
+
+    result, metrics = run_with_pool(factory, scenario, size=1)
+    # The dead session is dropped on acquire; two failed spawns back off 0.02 s, then 0.04 s
+    assert result == (1, "get_balance")
+    assert factory.sessions[0].closed
+    respawns = factory.attempts[1:]
+    assert len(respawns) == 3
+    assert respawns[1] - respawns[0] >= 0.02 and respawns[2] - respawns[1] >= 0.04
+    assert metrics["respawns"] == 1
+
+
+@pytest.mark.parametrize("error", [anyio.ClosedResourceError, anyio.BrokenResourceError])
+def test_a_closed_pipe_is_retried_once_on_another_session(factory, error):
+    async def scenario(pool):
+        for session in factory.sessions:
+            session.call_errors = [error()]
+        factory.sessions[1].call_errors = []
+        result = await pool.call_tool("get_balance", {})
+        await settle(pool)
+        return result, pool.metrics.snapshot(), [session.closed for session in factory.sessions]
+
+    result, metrics, closed = run_with_pool(factory, scenario)
+    assert result == (1, "get_balance")
+    assert (metrics["calls"], metrics["call_failures"], metrics["respawns"]) == (2, 1, 1)
+    # The broken session is replaced, the one that answered goes back to the pool
+    assert closed == [True, False, False]
+
+
+def test_the_retry_happens_only_once(factory):
+    async def scenario(pool):
+        for session in factory.sessions:
+            session.call_errors = [anyio.ClosedResourceError()]
+        with pytest.raises(anyio.ClosedResourceError):
+            await pool.call_tool("get_balance", {})
+        await settle(pool)
+        return pool.metrics.snapshot()
+
+    metrics = run_with_pool(factory, scenario)
+    assert (metrics["calls"], metrics["call_failures"], metrics["respawns"]) == (2, 2, 2)
+
+
+def test_other_errors_are_not_retried(factory):
+    async def scenario(pool):
+        for session in factory.sessions:
+            session.call_errors = [ValueError("bad arguments")]
+        with pytest.raises(ValueError):
+            await pool.call_tool("get_balance", {})
+        await settle(pool)
+        return pool.metrics.snapshot()
+
+    metrics = run_with_pool(factory, scenario)
+    assert (metrics["calls"], metrics["call_failures"], metrics["respawns"]) == (1, 1, 1)
+
+
+def test_health_loop_evicts_failing_idle_sessions(factory):
+    async def scenario(pool):
+        factory.sessions[0].ping_error = RuntimeError("no pong")
+        factory.sessions[1].dead = True
+        await asyncio.sleep(0.05)
+        await settle(pool)
+        return pool.metrics.snapshot(), pool._idle.qsize(), set(pool._sessions)
+
+    metrics, idle, sessions = run_with_pool(factory, scenario, health_interval=0.03)
+    old, replacements = factory.sessions[:2], factory.sessions[2:]
+    assert all(session.closed for session in old)
+    assert len(replacements) == 2 and sessions == set(replacements)
+    assert idle == 2
+    assert metrics["health_failures"] == 2 and metrics["respawns"] == 2
+    assert metrics["health_checks"] >= 2
+
+
+def test_health_checks_leave_the_other_sessions_to_callers(factory):
+    async def scenario(pool):
+        for session in factory.sessions:
+            session.ping_delay = 0.2
+        await asyncio.sleep(0.05)  # the health check is pinging one session now
+        results = [await pool.call_tool("get_balance", {}) for _ in range(5)]
+        return results, pool.metrics.snapshot()
+
+    results, metrics = run_with_pool(factory, scenario, health_interval=0.03, acquire_timeout=0.1)
+    assert len(results) == 5
+    assert metrics["acquire_timeouts"] == metrics["health_failures"] == 0
+    assert metrics["health_checks"] >= 1
+
+
+def test_hung_ping_fails_after_the_health_timeout(factory):
+    async def scenario(pool):
+        factory.sessions[0].ping_delay = 10
+        await asyncio.sleep(0.2)
+        await settle(pool)
+        return pool.metrics.snapshot()
+
+    metrics = run_with_pool(factory, scenario, health_interval=0.03, health_timeout=0.05)
+    assert factory.sessions[0].closed
+    assert metrics["health_failures"] == 1 and metrics["respawns"] == 1
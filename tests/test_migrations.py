@@ -0,0 +1,97 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from database import db
+from migrations import backfill_user_name_normalized, ensure_columns, ensure_indexes, migration_lock, run_migrations
+from models import User
+
+INDEXES = ["ix_account_user_id", "ix_transaction_from_timestamp", "ix_chat_message_user_visible_timestamp"]
+
+
+def index_names():
+    inspector = inspect(db.engine)
+    return {ix["name"] for table in inspector.get_table_names() for ix in inspector.get_indexes(table)}
+
+
+def drop(names):
+    with db.engine.begin() as conn:
+        for name in names:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+
+@pytest.fixture
+def old_users(app):
+    """A user table from before name_normalized, with a few users"""
+    drop(["ix_user_name_normalized"])
+    with db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE "user" DROP COLUMN name_normalized'))
+        for i, name in enumerate(["  Айбек  Асанов", "ALICE", "", "Бакыт"]):
+            conn.execute(text('INSERT INTO "user" (name, email, password_hash) VALUES (:name, :email, \'x\')'),
+                         {"name": name, "email": f"user{i}@example.com"})
+    return ["айбек асанов", "alice", None, "бакыт"]
+
+
+def normalized_names():
+    db.session.expire_all()
+    return [user.name_normalized for user in User.query.order_by(User.id)]
+
+
+def test_missing_columns_are_added_and_backfilled(old_users):
+    with migration_lock() as conn:
+        assert ensure_columns(conn) == [("user", "name_normalized")]
+    with migration_lock() as conn:
+        assert ensure_columns(conn) == []
+    assert backfill_user_name_normalized(batch_size=1) == 3
+    assert normalized_names() == old_users
+    assert backfill_user_name_normalized() == 0
+
+
+def test_missing_indexes_are_created_once(app):
+    drop(INDEXES)
+    with migration_lock() as conn:
+        assert sorted(ensure_indexes(conn)) == sorted(INDEXES)
+    with migration_lock() as conn:
+        assert ensure_indexes(conn) == []
+    assert index_names() >= set(INDEXES)
+
+
+def test_migration_lock_holds_the_sqlite_write_lock(app):
+    path = db.engine.url.database
+    with migration_lock():
+        other = sqlite3.connect(path, timeout=0)
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+        other.close()
+    other = sqlite3.connect(path, timeout=0)
+    other.execute("BEGIN IMMEDIATE")
+    other.rollback()
+    other.close()
+
+
+def migrate_in_process(database_url):
+    """run_migrations from a separate process, as a deploy starting several instances would"""
+    import models  # noqa: F401
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    db.init_app(app)
+    with app.app_context():
+        run_migrations()
+
+
+def test_migrations_from_several_processes(old_users):
+    drop(INDEXES)
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=migrate_in_process, args=(str(db.engine.url),)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert index_names() >= set(INDEXES)
+    assert "ix_user_name_normalized" in index_names()
+    assert normalized_names() == old_users
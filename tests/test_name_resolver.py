@@ -0,0 +1,89 @@
+import json
+import time
+
+import pytest
+
+import demir_functions
+from name_resolver import MIN_CONFIDENCE, ProductNameResolver, product_name_resolver
+from product_catalog import CatalogFile
+
+CARDS = "retail/cards.json"
+DEPOSITS = "retail/deposits.json"
+
+
+@pytest.mark.parametrize("query, source, name", [
+    ("visa gold debet", CARDS, "Visa Gold Debit"),
+    ("  VISA   gold  DEBIT ", CARDS, "Visa Gold Debit"),
+    ("Elcart", CARDS, "Elkart"),
+    ("mastercard platinun credit", CARDS, "Mastercard Platinum Credit"),
+    ("master card gold", CARDS, "Mastercard Gold Debit"),
+    ("visa campus", CARDS, "Visa Campus Card"),
+    ("Replenishible deposit", DEPOSITS, "Replenishable Deposit"),
+    ("clasic term deposit", DEPOSITS, "Classic Term Deposit"),
+    ("child deposite", DEPOSITS, "Child Deposit"),
+    ("onlain deposit", DEPOSITS, "Online Deposit"),
+    ("treasury bils", DEPOSITS, "Government Treasury Bills"),
+])
+def test_variants_of_real_names_resolve(query, source, name):
+    match = product_name_resolver.resolve(query, source=source)
+    assert match is not None and match.confidence >= MIN_CONFIDENCE
+    assert (match.name, match.source) == (name, source)
+
+
+@pytest.mark.parametrize("query", ["Балансымды көрсөт", "what is the weather today", "kredit", "xyzzy", ""])
+def test_non_product_strings_resolve_to_none(query):
+    assert product_name_resolver.resolve(query) is None
+
+
+def test_card_tools_use_the_resolver():
+    assert demir_functions.get_card_details("visa gold debet")["name"] == "Visa Gold Debit"
+    assert demir_functions.get_card_details("Балансымды көрсөт") == {"error": "Карта табылган жок."}
+
+
+def test_lookup_is_sub_millisecond():
+    queries = ["visa gold debet", "Elcart", "clasic term deposit", "what is the weather today"]
+    product_name_resolver.resolve(queries[0])
+    rounds = 200
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            product_name_resolver.resolve(query)
+    per_lookup = (time.perf_counter() - started) / (rounds * len(queries))
+    assert per_lookup < 0.001
+
+
+def write_cards(path, *names):
+    path.write_text(json.dumps({"cards": {name: {"name": name} for name in names}}), encoding="utf-8")
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """Counts the catalog file stat calls"""
+    counted = []
+    signature = CatalogFile._signature
+
+    def counting(catalog):
+        counted.append(catalog.path.name)
+        return signature(catalog)
+
+    monkeypatch.setattr(CatalogFile, "_signature", counting)
+    return counted
+
+
+def test_catalogs_are_checked_at_most_once_per_interval(tmp_path, stats):
+    (tmp_path / "retail").mkdir()
+    write_cards(tmp_path / "retail" / "cards.json", "Visa Gold Debit")
+    write_cards(tmp_path / "retail" / "other.json", "Elkart")
+    resolver = ProductNameResolver(root=tmp_path, sections=("retail",), check_interval=0.2)
+
+    assert resolver.resolve("visa gold debet").name == "Visa Gold Debit"
+    assert sorted(stats) == ["cards.json", "other.json"]
+    for _ in range(100):
+        resolver.resolve("Elcart")
+    assert len(stats) == 2
+
+    write_cards(tmp_path / "retail" / "cards.json", "Visa Gold Debit", "Visa Campus Card")
+    assert resolver.resolve("visa campus") is None
+    time.sleep(0.2)
+    assert resolver.resolve("visa campus").name == "Visa Campus Card"
+    assert len(stats) == 4
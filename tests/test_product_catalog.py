@@ -0,0 +1,117 @@
+import copy
+import json
+import os
+
+import pytest
+
+from catalog_index import ProductIndex
+from product_catalog import CatalogFile, FrozenDict, FrozenList, freeze, thaw
+
+CARDS = {"cards": {"Visa_Gold": {"name": "Visa Gold", "currency": ["KGS", "USD"], "annual_fee": "1000 сом"}}}
+
+
+def write(path, data, mtime_ns=None):
+    path.write_text(json.dumps(data, ensure_ascii=False) if not isinstance(data, str) else data, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "cards.json"
+    write(path, CARDS, mtime_ns=1_000_000_000)
+    return CatalogFile(path, "cards", build_index=ProductIndex)
+
+
+def test_snapshot_is_reused_until_the_file_changes(catalog):
+    first = catalog.snapshot()
+    assert catalog.snapshot() is first
+    assert catalog.data() is first.data and catalog.index() is first.index
+    assert catalog.index().find_by_name("visa gold") is catalog.data()["Visa_Gold"]
+
+
+def test_reload_on_mtime_change(catalog):
+    first = catalog.snapshot()
+    # Same size, new mtime
+    write(catalog.path, {"cards": {"Visa_Gold": dict(CARDS["cards"]["Visa_Gold"], annual_fee="2000 сом")}},
+          mtime_ns=2_000_000_000)
+    second = catalog.snapshot()
+    assert second is not first
+    assert second.data["Visa_Gold"]["annual_fee"] == "2000 сом"
+    assert second.index.facts[0].fee == 2000.0
+
+
+def test_reload_on_size_change(catalog):
+    first = catalog.snapshot()
+    data = {"cards": dict(CARDS["cards"], Elkart={"name": "Elkart"})}
+    write(catalog.path, data, mtime_ns=1_000_000_000)
+    second = catalog.snapshot()
+    assert second is not first
+    assert list(second.data) == ["Visa_Gold", "Elkart"]
+    assert second.index.find_by_name("Elkart") is second.data["Elkart"]
+
+
+def test_malformed_json_keeps_the_last_good_snapshot(catalog):
+    good = catalog.snapshot()
+    write(catalog.path, '{"cards": {"Visa_Gold": ', mtime_ns=2_000_000_000)
+    broken = catalog.snapshot()
+    assert broken.data is good.data and broken.index is good.index
+    # The broken file is not re-parsed on every call
+    assert catalog.snapshot() is broken
+
+    write(catalog.path, CARDS, mtime_ns=3_000_000_000)
+    fixed = catalog.snapshot()
+    assert fixed.data is not good.data and fixed.data == good.data
+
+
+def test_missing_file_gives_an_empty_catalog(tmp_path):
+    catalog = CatalogFile(tmp_path / "missing.json", "cards", build_index=ProductIndex)
+    assert catalog.data() == {}
+    assert catalog.index().products == []
+
+
+def test_root_key_none_keeps_the_document(tmp_path):
+    path = tmp_path / "about-us.json"
+    write(path, {"about-us": {"mission": "…"}, "other": [1]})
+    assert CatalogFile(path, None).data() == {"about-us": {"mission": "…"}, "other": [1]}
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda d: d.__setitem__("new", 1),
+    lambda d: d.__delitem__("Visa_Gold"),
+    lambda d: d.update(new=1),
+    lambda d: d.pop("Visa_Gold"),
+    lambda d: d.setdefault("new", 1),
+    lambda d: d.clear(),
+    lambda d: d["Visa_Gold"].__setitem__("annual_fee", "0"),
+    lambda d: d["Visa_Gold"]["currency"].append("EUR"),
+    lambda d: d["Visa_Gold"]["currency"].__setitem__(0, "EUR"),
+    lambda d: d["Visa_Gold"]["currency"].sort(),
+])
+def test_catalog_data_rejects_mutation(catalog, mutate):
+    data = catalog.data()
+    with pytest.raises(TypeError):
+        mutate(data)
+    assert data == CARDS["cards"]
+
+
+def test_frozen_data_is_still_plain_json(catalog):
+    data = catalog.data()
+    assert isinstance(data, dict) and isinstance(data["Visa_Gold"]["currency"], list)
+    assert json.loads(json.dumps(data)) == CARDS["cards"]
+
+
+def test_copies_are_mutable(catalog):
+    data = catalog.data()
+    for copied in (copy.deepcopy(data), thaw(data)):
+        assert type(copied) is dict and type(copied["Visa_Gold"]["currency"]) is list
+        copied["Visa_Gold"]["currency"].append("EUR")
+    shallow = copy.copy(data)
+    shallow["new"] = 1
+    assert "new" not in data and data["Visa_Gold"]["currency"] == ["KGS", "USD"]
+
+
+def test_freeze_nests():
+    frozen = freeze({"a": [{"b": [1]}]})
+    assert isinstance(frozen, FrozenDict)
+    assert isinstance(frozen["a"], FrozenList) and isinstance(frozen["a"][0], FrozenDict)
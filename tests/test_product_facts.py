@@ -0,0 +1,160 @@
+import pytest
+
+import demir_functions
+from product_facts import (
+    parse_amount_query, parse_amounts, parse_fee, parse_number, parse_rate_range, parse_term_range, parse_yes_no,
+)
+
+
+def names(products):
+    return [product["name"] for product in products]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 200 сом", 1200.0),
+    ("1 200 сом", 1200.0),
+    ("12,5%", 12.5),
+    ("10 000.50", 10000.5),
+    ("сом", None),
+    (None, None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 200 сом", 1200.0),
+    ("1000 сом", 1000.0),
+    ("акысыз", 0.0),
+    ("Бесплатно", 0.0),
+    ("free", 0.0),
+    ("5 USD", None),
+    ("банк менен макулдашуу боюнча", None),
+    (None, None),
+    (1000, None),
+])
+def test_parse_fee(text, expected):
+    assert parse_fee(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("13% жылдык (сомдо)", (13.0, 13.0)),
+    ("0.5% жылдык", (0.5, 0.5)),
+    ("10,5% жылдык", (10.5, 10.5)),
+    ("8% - 14%", (8.0, 14.0)),
+    ("сомдо 14%, долларда 4%", (4.0, 14.0)),
+    ("15%га чейин жылдык", (0.0, 15.0)),
+    ("до 18%", (0.0, 18.0)),
+    ("22% баштап", (22.0, None)),
+    ("от 19%", (19.0, None)),
+    ("пайыздар мөөнөтү аяктаганда төлөнөт", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_rate_range(text, expected):
+    assert parse_rate_range(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3–36 ай", (3, 36)),
+    ("3-36 мес", (3, 36)),
+    ("3 айдан 24 айга чейин", (3, 24)),
+    ("36 айга чейин", (0.0, 36)),
+    ("1 жыл", (12, 12)),
+    ("1 жылдан 3 жылга чейин", (12, 36)),
+    ("3, 6 жана 12 ай", (3, 12)),
+    ("7 күндөн 364 күнгө чейин", (0.23, 12.13)),
+    ("12", (12, 12)),
+    ("мөөнөтсүз", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_term_range(text, expected):
+    assert parse_term_range(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10 000 сом / 500 USD", {"KGS": 10000.0, "USD": 500.0}),
+    ("1000 сом / 50 USD / 50 EUR", {"KGS": 1000.0, "USD": 50.0, "EUR": 50.0}),
+    ("2 500 сом / 50 АКШ доллары / 2 500 орус рубли", {"KGS": 2500.0, "USD": 50.0, "RUB": 2500.0}),
+    ("100 €", {"EUR": 100.0}),
+    ("5000", {"KGS": 5000.0}),
+    ("чектелген эмес", {}),
+    (None, {}),
+])
+def test_parse_amounts(text, expected):
+    assert parse_amounts(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("5000", (5000.0, "KGS")),
+    ("1 000 сом", (1000.0, "KGS")),
+    ("100 USD", (100.0, "USD")),
+    ("$300", (300.0, "USD")),
+    ("200 евро", (200.0, "EUR")),
+    ("2500 рубль", (2500.0, "RUB")),
+    ("көп", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_amount_query(text, expected):
+    assert parse_amount_query(text) == expected
+
+
+# The range tools over the real generalInfo/retail catalogs
+
+@pytest.mark.parametrize("min_fee, max_fee, expected", [
+    (None, "0", ["Visa Classic Debit", "Mastercard Standard Debit"]),
+    ("1000", "1 500 сом", ["Visa Gold Debit", "Mastercard Gold Debit", "Visa Gold Credit", "Mastercard Gold Credit"]),
+    ("700", "900", ["Visa Classic Credit", "Mastercard Standard Credit"]),
+    # Cards without a listed fee count as infinitely expensive, as before the index
+    ("5000", None, ["Visa Platinum Debit", "Mastercard Platinum Debit", "Visa Platinum Credit",
+                    "Mastercard Platinum Credit", "Card Plus", "Virtual Card", "Elkart", "Visa Campus Card"]),
+])
+def test_cards_by_fee_range(min_fee, max_fee, expected):
+    assert names(demir_functions.get_cards_by_fee_range(min_fee, max_fee)) == expected
+
+
+@pytest.mark.parametrize("min_term, max_term, expected", [
+    ("2 жыл", None, ["Classic Term Deposit", "Standard Term Deposit", "Online Deposit", "Child Deposit"]),
+    (None, "1 ай", ["Standard Term Deposit", "Online Deposit", "NBKR Notes"]),
+    ("13 ай", "24 ай", ["Classic Term Deposit", "Standard Term Deposit", "Online Deposit", "Child Deposit"]),
+    (None, None, ["Demand Deposit", "Classic Term Deposit", "Replenishable Deposit", "Standard Term Deposit",
+                  "Online Deposit", "Child Deposit", "Government Treasury Bills", "NBKR Notes"]),
+])
+def test_deposits_by_term_range(min_term, max_term, expected):
+    assert names(demir_functions.get_deposits_by_term_range(min_term, max_term)) == expected
+
+
+@pytest.mark.parametrize("min_rate, max_rate, expected", [
+    ("12%", None, ["Classic Term Deposit", "Online Deposit"]),
+    (None, "10%", ["Demand Deposit", "Replenishable Deposit", "Online Deposit"]),
+    ("10", "11", ["Replenishable Deposit", "Online Deposit", "Child Deposit"]),
+    ("16%", None, []),
+])
+def test_deposits_by_rate_range(min_rate, max_rate, expected):
+    assert names(demir_functions.get_deposits_by_rate_range(min_rate, max_rate)) == expected
+
+
+@pytest.mark.parametrize("amount, expected", [
+    ("5000", ["Demand Deposit", "Replenishable Deposit", "Standard Term Deposit", "Online Deposit", "Child Deposit"]),
+    ("1 000 сом", ["Demand Deposit", "Child Deposit"]),
+    ("100 USD", ["Demand Deposit", "Standard Term Deposit"]),
+    ("2500 рубль", ["Standard Term Deposit"]),
+    ("10 EUR", []),
+    ("көп", []),
+])
+def test_deposits_by_min_amount(amount, expected):
+    assert names(demir_functions.get_deposits_by_min_amount(amount)) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("ооба", True),
+    ("Ооба, каалаган убакта", True),
+    ("Каалаган убакта", True),
+    ("Да", True),
+    ("жок", False),
+    ("Нет", False),
+    ("мөөнөттүн аягында", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_yes_no(text, expected):
+    assert parse_yes_no(text) == expected
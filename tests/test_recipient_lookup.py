@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from database import db
+from models import Account, User
+import bank_functions
+from recipient_lookup import find_recipient, recent_recipients_cache
+
+
+@pytest.fixture
+def people(app):
+    recent_recipients_cache.clear()
+    names = ["Айзада", "Бакыт", "Чыңгыз  Асанов", "Нурлан"]
+    users = [User(name=name, email=f"user{i}@example.com", password_hash="x") for i, name in enumerate(names)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([Account(user_id=u.id, account_type="checking", balance=Decimal("1000.00")) for u in users])
+    db.session.commit()
+    yield {u.name: u for u in users}
+    recent_recipients_cache.clear()
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_name_normalized_is_maintained(people):
+    user = people["Чыңгыз  Асанов"]
+    assert user.name_normalized == "чыңгыз асанов"
+    user.name = "Чыңгыз Асан"
+    db.session.commit()
+    assert user.name_normalized == "чыңгыз асан"
+
+
+def test_lookup_ignores_case_and_spacing(people):
+    sender = people["Айзада"]
+    assert find_recipient(sender, "  бакыт ").id == people["Бакыт"].id
+    assert find_recipient(sender, "ЧЫҢГЫЗ асанов").id == people["Чыңгыз  Асанов"].id
+    assert find_recipient(sender, "Белгисиз") is None
+
+
+def test_repeat_recipient_skips_user_name_lookup(people, statements):
+    sender = people["Айзада"]
+    ok, _ = bank_functions.transfer_money(sender, "Бакыт", 10)
+    assert ok
+
+    statements.clear()
+    ok, _ = bank_functions.transfer_money(sender, "бакыт", 10)
+    assert ok
+    assert not any("name_normalized =" in s for s in statements)
+
+
+def test_recent_recipients_cache_built_from_history(people, statements):
+    sender = people["Айзада"]
+    bank_functions.transfer_money(sender, "Нурлан", 10)
+    recent_recipients_cache.clear()
+
+    statements.clear()
+    assert find_recipient(sender, "Нурлан").id == people["Нурлан"].id
+    assert not any("name_normalized =" in s for s in statements)
+
+
+def test_renamed_recipient_is_not_served_from_cache(people):
+    sender = people["Айзада"]
+    bank_functions.transfer_money(sender, "Нурлан", 10)
+    people["Нурлан"].name = "Нурбек"
+    db.session.commit()
+    assert find_recipient(sender, "Нурлан") is None
+    assert find_recipient(sender, "Нурбек").id == people["Нурлан"].id
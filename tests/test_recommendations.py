@@ -0,0 +1,93 @@
+import copy
+import random
+
+import pytest
+
+import demir_functions
+from catalog_index import RankedProduct, top_k
+from product_catalog import cards_catalog, deposits_catalog, thaw
+
+CARD_CRITERIA = [
+    {"type": "debit", "max_fee": "1000", "currency": "USD", "features": ["бесконтакт"]},
+    {"type": "credit", "features": ["кэшбэк", "visa"]},
+    {"max_fee": "0"},
+]
+DEPOSIT_CRITERIA = [
+    {"currency": "USD", "min_amount": "100 USD", "term": "24 ай", "rate_preference": "12%"},
+    {"min_amount": "5000", "replenishment_needed": True, "capitalization_needed": True},
+    {"term": "1 жыл"},
+]
+
+
+def names(views):
+    return [view.product["name"] for view in views]
+
+
+def test_recommendations_leave_the_catalog_unmodified():
+    cards, deposits = thaw(cards_catalog.data()), thaw(deposits_catalog.data())
+    for criteria in CARD_CRITERIA:
+        for view in demir_functions.get_card_recommendations(criteria):
+            assert view.product is cards_catalog.data()[view.product_id]
+    for criteria in DEPOSIT_CRITERIA:
+        for view in demir_functions.get_deposit_recommendations(criteria):
+            assert view.product is deposits_catalog.data()[view.product_id]
+    assert thaw(cards_catalog.data()) == cards
+    assert thaw(deposits_catalog.data()) == deposits
+    assert not any("recommendation_score" in product for product in cards.values())
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("k", [1, 3, 5, 50])
+def test_top_k_matches_a_full_stable_sort(seed, k):
+    rng = random.Random(seed)
+    # Few distinct scores, so most of the ranking is decided by ties
+    ranked = [RankedProduct(f"p{i}", rng.choice([0, 2, 3, 5, 5, 10]), (), None) for i in range(rng.randint(0, 30))]
+    expected = sorted(ranked, key=lambda r: r.score, reverse=True)[:k]
+    assert top_k(iter(ranked), k) == expected
+    assert [r.product_id for r in top_k(ranked, k)] == [r.product_id for r in expected]
+
+
+def test_ties_keep_catalog_order():
+    views = demir_functions.get_deposit_recommendations({"min_amount": "5000"})
+    assert [view.score for view in views] == [3] * 5
+    assert names(views) == ["Demand Deposit", "Replenishable Deposit", "Standard Term Deposit",
+                            "Online Deposit", "Child Deposit"]
+
+
+@pytest.mark.parametrize("criteria, expected", [
+    # Opened with 100 USD, and the 24-month term is inside the deposit's term range
+    ({"currency": "USD", "min_amount": "100 USD", "term": "24 ай"},
+     [("Standard Term Deposit", ("currency", "min_amount", "term")),
+      ("Demand Deposit", ("currency", "min_amount")),
+      ("Classic Term Deposit", ("currency", "term")),
+      ("Online Deposit", ("currency", "term")),
+      ("Child Deposit", ("term",))]),
+    # A bare amount is in the currency of the currency criterion
+    ({"currency": "usd", "min_amount": "600"},
+     [("Demand Deposit", ("currency", "min_amount")),
+      ("Classic Term Deposit", ("currency", "min_amount")),
+      ("Standard Term Deposit", ("currency", "min_amount")),
+      ("Online Deposit", ("currency",))]),
+    # A single rate is a minimum; "15%га чейин" reaches 12%
+    ({"rate_preference": "12%"}, [("Classic Term Deposit", ("rate",)), ("Online Deposit", ("rate",))]),
+    ({"rate_preference": "10%га чейин"},
+     [("Demand Deposit", ("rate",)), ("Replenishable Deposit", ("rate",)), ("Online Deposit", ("rate",))]),
+    ({"rate_preference": "жогорку"}, []),
+    # "Каалаган убакта" (any time) counts as replenishable
+    ({"replenishment_needed": True},
+     [("Demand Deposit", ("replenishment",)), ("Replenishable Deposit", ("replenishment",)),
+      ("Child Deposit", ("replenishment",))]),
+    ({"capitalization_needed": True},
+     [("Classic Term Deposit", ("capitalization",)), ("Replenishable Deposit", ("capitalization",)),
+      ("Child Deposit", ("capitalization",))]),
+])
+def test_deposit_criteria_use_the_typed_facts(criteria, expected):
+    views = demir_functions.get_deposit_recommendations(criteria)
+    assert [(view.product["name"], view.matched) for view in views] == expected
+
+
+def test_result_views_can_be_copied_without_touching_the_catalog():
+    view = demir_functions.get_deposit_recommendations({"term": "1 жыл"})[0]
+    deposit = copy.deepcopy(view.product)
+    deposit["recommendation_score"] = view.score
+    assert "recommendation_score" not in view.product
@@ -0,0 +1,62 @@
+import string
+from decimal import Decimal
+
+import pytest
+
+from database import db
+from models import Account, User
+import bank_functions
+from response_templates import (
+    LANGUAGES, TEMPLATES, ChatReply, RENDER_TEMPLATE, fill_free_text, free_text,
+    free_text_fragments, normalize_language, render,
+)
+
+
+def _placeholders(template):
+    return {name for _, name, _, _ in string.Formatter().parse(template) if name}
+
+
+@pytest.mark.parametrize("key", sorted(TEMPLATES))
+def test_every_template_has_all_languages_with_same_fields(key):
+    variants = TEMPLATES[key]
+    assert set(variants) == set(LANGUAGES)
+    fields = {lang: _placeholders(text) for lang, text in variants.items()}
+    assert len({frozenset(f) for f in fields.values()}) == 1, fields
+
+
+def test_normalize_language():
+    assert normalize_language(None) == "ky"
+    assert normalize_language("RU") == "ru"
+    assert normalize_language("kg") == "ky"
+    assert normalize_language("de") == "ky"
+
+
+def test_free_text_is_only_marked_for_translation_outside_kyrgyz():
+    assert free_text("3 айдан 24 айга чейин", "ky") == "3 айдан 24 айга чейин"
+    text = f"Мөөнөт: {free_text('3 айдан 24 айга чейин', 'en')}"
+    assert free_text_fragments(text) == ["3 айдан 24 айга чейин"]
+    assert fill_free_text(text, {"3 айдан 24 айга чейин": "3 to 24 months"}) == "Мөөнөт: 3 to 24 months"
+    assert fill_free_text(text) == "Мөөнөт: 3 айдан 24 айга чейин"
+
+
+def test_chat_reply_keeps_render_path():
+    reply = ChatReply("ok", RENDER_TEMPLATE)
+    assert reply == "ok" and reply.render_path == RENDER_TEMPLATE
+
+
+def test_bank_functions_render_in_requested_language(app):
+    user = User(name="Айзада", email="a@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Account(user_id=user.id, account_type="checking", balance=Decimal("150.50")))
+    db.session.commit()
+
+    _, ky = bank_functions.get_balance(user)
+    _, ru = bank_functions.get_balance(user, language="ru")
+    _, en = bank_functions.get_balance(user, language="en")
+    assert ky == "Сиздин бардык эсептериңиздеги жалпы сумма: 150.50 сом."
+    assert ru == "Общая сумма на всех ваших счетах: 150.50 сом."
+    assert en == "Total across all your accounts: 150.50 KGS."
+
+    ok, message = bank_functions.transfer_money(user, "Nobody", 10, language="en")
+    assert not ok and message == render("recipient_not_found", "en", name="Nobody")
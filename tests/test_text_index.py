@@ -0,0 +1,71 @@
+import pytest
+
+import demir_functions
+from product_catalog import cards_catalog
+from text_index import WORD_RE, TextIndex, stem
+
+PRODUCTS = [
+    {"name": "Visa Gold", "features": ["Бесконтактная оплата", "Картаны онлайн бөгөттөө"]},
+    {"name": "Mastercard Standard", "descr": "Карталар үчүн кэшбэк", "annual_fee": "акысыз"},
+    {"name": "Elkart", "descr": "Карты для пенсионеров", "annual_fee": "500 сом акы"},
+]
+
+
+@pytest.mark.parametrize("words, expected", [
+    (["карта", "карталар", "картаны", "карталардын", "карты", "картой", "картами"], "карт"),
+    (["лимит", "лимиттер", "лимиттин", "лимитов", "лимитами"], "лимит"),
+    (["cards", "card"], "card"),
+])
+def test_suffix_variants_share_a_stem(words, expected):
+    assert {stem(word) for word in words} == {expected}
+
+
+def test_privative_suffix_is_kept():
+    assert stem("акысыз") != stem("акы")
+
+
+def test_kyrgyz_and_russian_variants_hit_the_same_postings():
+    index = TextIndex(PRODUCTS)
+    for variant in ["карта", "карталар", "картаны", "карты", "картой"]:
+        assert index.match(variant) == {0, 1, 2}, variant
+
+
+def test_unknown_words_match_as_prefixes_and_infixes():
+    index = TextIndex(PRODUCTS)
+    assert "бесконтакт" not in index.postings
+    assert index.match("бесконтакт") == {0}
+    assert index.match("card") == {1}
+    assert index.match("xyz") == set()
+
+
+def test_phrases_need_every_word():
+    index = TextIndex(PRODUCTS)
+    assert index.match("онлайн бөгөттөө") == {0}
+    assert index.match("кэшбэк онлайн") == set()
+    assert index.match_all(["карта", "акысыз"]) == {1}
+    assert index.match_all(["акы"]) == {1, 2}
+    assert index.match_all([]) == {0, 1, 2}
+
+
+def substring_scan(features):
+    """get_cards_with_features as it was before the index"""
+    features = [feature.lower() for feature in features]
+    return [card for card in cards_catalog.data().values()
+            if all(feature in str(card).lower() for feature in features)]
+
+
+def catalog_words():
+    return sorted({word for card in cards_catalog.data().values() for word in WORD_RE.findall(str(card).lower())})
+
+
+def test_features_find_every_card_the_substring_scan_found():
+    for word in catalog_words():
+        found = {card["name"] for card in demir_functions.get_cards_with_features([word])}
+        assert found >= {card["name"] for card in substring_scan([word])}, word
+
+
+@pytest.mark.parametrize("features", [
+    ["visa"], ["mastercard", "gold"], ["card"], ["USD"], ["акысыз"], ["кэшбэк"], ["3D Secure"], ["банк"],
+])
+def test_features_match_the_substring_scan(features):
+    assert demir_functions.get_cards_with_features(features) == substring_scan(features)
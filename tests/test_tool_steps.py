@@ -0,0 +1,124 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import app as chat_app  # noqa: F401  gemini_service is imported through the app, as in main.py
+import gemini_service
+import tool_dispatch
+from conftest import FakeGemini
+from response_templates import RENDER_LLM_TOOLS, RENDER_TEMPLATE
+
+USER = SimpleNamespace(id=7, name="Айбек", accounts=[])
+QUESTION = "Балансым канча жана кандай карталар бар?"
+
+
+def calls(*function_calls):
+    """Model content asking for `function_calls`, given as (name, args) pairs"""
+    return {"role": "model", "parts": [{"functionCall": {"name": name, "args": args}} for name, args in function_calls]}
+
+
+def text(answer):
+    return {"role": "model", "parts": [{"text": answer}]}
+
+
+@pytest.fixture
+def chatbot(gemini, monkeypatch):
+    """BankingChatbot on the fake Gemini server, with tools that record their calls"""
+    tool_calls = []
+
+    async def call_tool(tool_name, arguments, mode=None):
+        tool_calls.append((tool_name, arguments))
+        return SimpleNamespace(content=[SimpleNamespace(text=f"{tool_name} #{len(tool_calls)}")])
+
+    monkeypatch.setattr(gemini_service, "client", gemini)
+    monkeypatch.setattr(tool_dispatch, "call_tool", call_tool)
+    chatbot = gemini_service.BankingChatbot()
+    chatbot.tool_calls = tool_calls
+    return chatbot
+
+
+def generate_requests():
+    return [body for _, path, body in FakeGemini.calls if path.endswith(":generateContent")]
+
+
+def test_two_tool_steps_then_an_answer(chatbot):
+    FakeGemini.replies = [
+        calls(("get_balance", {"language": "ky"}), ("list_all_card_names", {"language": "ky"})),
+        calls(("get_card_details", {"card_name": "Visa Gold", "language": "ky"})),
+        text("Балансыңыз жана карталар тууралуу."),
+    ]
+    reply = asyncio.run(chatbot.get_response_async(QUESTION, user=USER))
+
+    assert (str(reply), reply.render_path) == ("Балансыңыз жана карталар тууралуу.", RENDER_LLM_TOOLS)
+    assert [name for name, _ in chatbot.tool_calls] == ["get_balance", "list_all_card_names", "get_card_details"]
+    requests = generate_requests()
+    assert len(requests) == 3
+    # Each step appends the model's calls and one user turn with the responses, in call order
+    step_1, step_2 = requests[1]["contents"][-2:], requests[2]["contents"][-2:]
+    assert requests[2]["contents"][:-2] == requests[1]["contents"]
+    assert [p["functionCall"]["name"] for p in step_1[0]["parts"]] == ["get_balance", "list_all_card_names"]
+    assert [(p["functionResponse"]["name"], p["functionResponse"]["response"]["result"])
+            for p in step_1[1]["parts"]] == [("get_balance", "get_balance #1"),
+                                             ("list_all_card_names", "list_all_card_names #2")]
+    assert step_2[1]["role"] == "user"
+    assert step_2[1]["parts"][0]["functionResponse"]["name"] == "get_card_details"
+
+
+def test_exhausted_budget_returns_the_last_tool_results(chatbot, monkeypatch):
+    monkeypatch.setattr(gemini_service, "MAX_TOOL_STEPS", 2)
+    FakeGemini.replies = [
+        calls(("get_balance", {}), ("list_all_card_names", {})),
+        calls(("get_card_details", {"card_name": "Visa Gold"}), ("get_card_limits", {"card_name": "Visa Gold"})),
+        calls(("get_card_benefits", {"card_name": "Visa Gold"})),
+    ]
+    reply = asyncio.run(chatbot.get_response_async(QUESTION, user=USER))
+
+    assert reply.render_path == RENDER_TEMPLATE
+    assert str(reply) == "get_card_details #3\n\nget_card_limits #4"
+    assert "get_card_benefits" not in [name for name, _ in chatbot.tool_calls]
+    assert len(generate_requests()) == 3
+
+
+def test_a_repeated_call_in_one_turn_reuses_its_idempotency_key(chatbot):
+    transfer = ("transfer_money", {"to_name": "Нурлан", "amount": 500})
+    turn = [calls(transfer, ("get_balance", {})), calls(transfer), text("Которулду.")]
+    FakeGemini.replies = list(turn)
+    asyncio.run(chatbot.get_response_async("Нурланга 500 сом котор жана балансымды айт", user=USER))
+    FakeGemini.replies = list(turn)
+    asyncio.run(chatbot.get_response_async("Нурланга 500 сом котор жана балансымды айт", user=USER))
+
+    keys = [arguments["idempotency_key"] for name, arguments in chatbot.tool_calls if name == "transfer_money"]
+    assert len(keys) == 4
+    assert keys[0] == keys[1] and keys[2] == keys[3]
+    assert keys[0] != keys[2]
+
+
+def test_local_tools_overlap_and_leave_the_loop_free(monkeypatch):
+    async def blocking_run(arguments):
+        time.sleep(0.2)  # like the tools' synchronous SQLAlchemy work
+        return arguments["n"]
+
+    monkeypatch.setattr(tool_dispatch, "_local_tools", {"slow": SimpleNamespace(run=blocking_run)})
+
+    async def turn():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(*[tool_dispatch.call_local_tool("slow", {"n": n}) for n in range(4)])
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(turn())
+    assert results == [0, 1, 2, 3]
+    assert elapsed < 0.5
+    assert ticks >= 5
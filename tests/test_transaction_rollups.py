@@ -0,0 +1,132 @@
+import multiprocessing
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from database import db
+from models import Account, DailyTransactionRollup, Transaction, User
+import bank_functions
+import transaction_rollups
+
+
+@pytest.fixture
+def users(app):
+    alice = User(name="Alice", email="alice@example.com", password_hash="x")
+    bob = User(name="Bob", email="bob@example.com", password_hash="x")
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    a1 = Account(user_id=alice.id, account_type="checking", balance=Decimal("100.10"))
+    a2 = Account(user_id=alice.id, account_type="savings", balance=Decimal("0.20"))
+    b1 = Account(user_id=bob.id, account_type="checking", balance=Decimal("50.00"))
+    db.session.add_all([a1, a2, b1])
+    db.session.flush()
+    start = datetime(2025, 1, 1, 6, 0)
+    # 90 days, three transfers a day at 06:00, 14:00 and 22:00
+    for i in range(270):
+        alice_sends = i % 3 != 0
+        db.session.add(Transaction(
+            account_from_id=a1.id if alice_sends else b1.id,
+            account_to_id=b1.id if alice_sends else a2.id,
+            type="Которуу",
+            amount=Decimal("0.10") + i,
+            timestamp=start + timedelta(hours=8 * i),
+        ))
+    db.session.commit()
+    db.session.refresh(alice)
+    db.session.refresh(bob)
+    return alice, bob
+
+
+def raw_total(acc_ids, column, start, end):
+    txs = Transaction.query.filter(column.in_(acc_ids), Transaction.timestamp >= start,
+                                   Transaction.timestamp <= end).all()
+    return sum((t.amount for t in txs), Decimal("0")), len(txs)
+
+
+@pytest.mark.parametrize("start,end", [
+    ("2025-01-01", "2025-03-31"),
+    ("2025-01-10 10:00", "2025-02-20 15:30"),
+    ("2025-02-01", "2025-02-01 23:59"),
+    ("2025-01-05 13:00", "2025-01-06 07:00"),
+])
+def test_period_sum_matches_raw_sum(users, start, end):
+    alice, _ = users
+    acc_ids = [a.id for a in alice.accounts]
+    start_dt, end_dt = datetime.fromisoformat(start), datetime.fromisoformat(end)
+    for direction, column in (("incoming", Transaction.account_to_id), ("outgoing", Transaction.account_from_id)):
+        expected = raw_total(acc_ids, column, start_dt, end_dt)
+        assert transaction_rollups.period_sum(alice, acc_ids, direction, start, end) == expected
+
+
+def test_period_sum_reads_rollups_for_whole_days(users):
+    alice, _ = users
+    scanned = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        scanned.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        total, message = bank_functions.get_outgoing_sum_for_period(alice, "2025-01-01", "2025-03-31")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    assert isinstance(total, Decimal)
+    assert "сом" in message
+    # accounts, rollup sum, edge sum
+    assert len(scanned) == 3
+    assert sum("daily_transaction_rollup" in s for s in scanned) == 1
+
+
+def test_rebuild_matches_incremental_rollups(users):
+    before = sorted((r.user_id, r.day, r.incoming_total, r.incoming_count, r.outgoing_total, r.outgoing_count)
+                    for r in DailyTransactionRollup.query.all())
+    transaction_rollups.rebuild_rollups()
+    after = sorted((r.user_id, r.day, r.incoming_total, r.incoming_count, r.outgoing_total, r.outgoing_count)
+                   for r in DailyTransactionRollup.query.all())
+    assert before == after
+    assert len(after) == 180
+
+
+def rollup_rows():
+    return sorted((r.user_id, r.day, r.incoming_total, r.incoming_count, r.outgoing_total, r.outgoing_count)
+                  for r in DailyTransactionRollup.query.all())
+
+
+def backfill_in_process(database_url, results):
+    """ensure_rollups from a separate process, as a deploy starting several instances would"""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    db.init_app(app)
+    with app.app_context():
+        results.put(transaction_rollups.ensure_rollups())
+
+
+def test_ensure_rollups_backfills_once_across_processes(users):
+    expected = rollup_rows()
+    db.session.execute(DailyTransactionRollup.__table__.delete())
+    db.session.commit()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=backfill_in_process, args=(str(db.engine.url), results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    built = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert sorted(built) == [False, False, False, True]
+
+    db.session.expire_all()
+    assert rollup_rows() == expected
+    assert transaction_rollups.ensure_rollups() is False
+
+
+def test_get_balance_is_decimal_exact(users):
+    alice, _ = users
+    total, message = bank_functions.get_balance(alice)
+    assert total == Decimal("100.30")
+    assert "100.30" in message
@@ -0,0 +1,162 @@
+"""
+Concurrency tests for transfer_money / transfer_engine on a file-backed SQLite
+database: many threads transfer between a handful of accounts at once, and the
+total amount of money must be conserved with no balance ever going negative.
+"""
+
+import multiprocessing
+import random
+import sqlite3
+import threading
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from database import db
+from models import Account, Transaction, TransferRequest, User
+import bank_functions
+import transfer_engine
+
+USERS = 6
+START_BALANCE = Decimal("100.00")
+
+
+@pytest.fixture
+def customers(app):
+    users = [User(name=f"User {i}", email=f"user{i}@example.com", password_hash="x") for i in range(USERS)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([Account(user_id=u.id, account_type="checking", balance=START_BALANCE) for u in users])
+    db.session.commit()
+    return [u.id for u in users]
+
+
+def run_in_threads(app, worker, threads):
+    errors = []
+
+    def target(n):
+        try:
+            with app.app_context():
+                worker(n)
+                db.session.remove()
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    pool = [threading.Thread(target=target, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    assert errors == []
+
+
+def test_concurrent_transfers_conserve_balance(app, customers):
+    succeeded = []
+
+    def worker(n):
+        rng = random.Random(n)
+        for _ in range(25):
+            sender, recipient = rng.sample(customers, 2)
+            user = db.session.get(User, sender)
+            # Large enough that many transfers must be refused for lack of funds
+            amount = Decimal(rng.randint(1, 6000)) / 100
+            ok, _ = bank_functions.transfer_money(user, f"User {customers.index(recipient)}", amount)
+            if ok:
+                succeeded.append(amount)
+
+    run_in_threads(app, worker, threads=8)
+
+    balances = [a.balance for a in Account.query.all()]
+    assert sum(balances) == START_BALANCE * USERS
+    assert min(balances) >= 0
+    assert Transaction.query.count() == len(succeeded)
+    assert sum(t.amount for t in Transaction.query.all()) == sum(succeeded)
+
+
+def test_concurrent_overdraft_is_refused(app, customers):
+    results = []
+
+    def worker(n):
+        user = db.session.get(User, customers[0])
+        results.append(bank_functions.transfer_money(user, "User 1", Decimal("30.00")))
+
+    run_in_threads(app, worker, threads=10)
+
+    assert sum(ok for ok, _ in results) == 3
+    assert db.session.get(Account, customers[0]).balance == Decimal("10.00")
+    assert db.session.get(Account, customers[1]).balance == Decimal("190.00")
+
+
+def test_idempotency_key_prevents_double_debit(app, customers):
+    results = []
+
+    def worker(n):
+        user = db.session.get(User, customers[0])
+        results.append(bank_functions.transfer_money(user, "User 1", 25, idempotency_key="call-1"))
+
+    run_in_threads(app, worker, threads=5)
+
+    assert all(ok for ok, _ in results)
+    assert len({message for _, message in results}) == 1
+    assert Transaction.query.count() == 1
+    assert TransferRequest.query.count() == 1
+    assert db.session.get(Account, customers[0]).balance == Decimal("75.00")
+
+    user = db.session.get(User, customers[0])
+    ok, _ = bank_functions.transfer_money(user, "User 1", 25, idempotency_key="call-2")
+    assert ok
+    assert db.session.get(Account, customers[0]).balance == Decimal("50.00")
+
+
+def test_sqlite_transfer_holds_the_write_lock_from_the_start(app, customers):
+    path = db.engine.url.database
+    with transfer_engine._account_locks():
+        other = sqlite3.connect(path, timeout=0)
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+        other.close()
+        db.session.rollback()
+    other = sqlite3.connect(path, timeout=0)
+    other.execute("BEGIN IMMEDIATE")
+    other.rollback()
+    other.close()
+
+
+def transfer_in_process(database_url, accounts, seed, results):
+    """Random transfers from a separate process, with its own engine and thread lock"""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    db.init_app(app)
+    rng = random.Random(seed)
+    moved = []
+    with app.app_context():
+        for _ in range(20):
+            (from_account, user_id), (to_account, _) = rng.sample(accounts, 2)
+            amount = Decimal(rng.randint(1, 6000)) / 100
+            try:
+                transfer_engine.transfer(from_account, to_account, amount, user_id)
+                moved.append(str(amount))
+            except transfer_engine.TransferError:
+                pass
+    results.put(moved)
+
+
+def test_transfers_from_several_processes_conserve_balance(app, customers):
+    accounts = [(a.id, a.user_id) for a in Account.query.order_by(Account.id)]
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=transfer_in_process, args=(str(db.engine.url), accounts, n, results))
+               for n in range(4)]
+    for worker in workers:
+        worker.start()
+    moved = [Decimal(amount) for _ in workers for amount in results.get(timeout=60)]
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    db.session.expire_all()
+    balances = [a.balance for a in Account.query.all()]
+    assert sum(balances) == START_BALANCE * USERS
+    assert min(balances) >= 0
+    assert Transaction.query.count() == len(moved)
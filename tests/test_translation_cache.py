@@ -0,0 +1,36 @@
+from models import TranslationCacheEntry
+from translation_cache import TranslationCache, cache_key
+
+
+def test_key_depends_on_text_language_and_prompt_version():
+    key = cache_key("мөөнөтсүз", "ru")
+    assert key == cache_key("мөөнөтсүз", "ru")
+    assert key != cache_key("мөөнөтсүз", "en")
+    assert key != cache_key("мөөнөтсүз ", "ru")
+    assert key != cache_key("мөөнөтсүз", "ru", prompt_version="2")
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = TranslationCache(max_entries=2)
+    cache.put_many({"бир": "one", "эки": "two"}, "en")
+    assert cache.get_many(["бир"], "en") == {"бир": "one"}
+    cache.put_many({"үч": "three"}, "en")
+    # "эки" was least recently used; without an app context there is no database tier
+    assert cache.get_many(["бир", "эки", "үч"], "en") == {"бир": "one", "үч": "three"}
+
+
+def test_database_tier_survives_process_memory(app):
+    cache = TranslationCache()
+    cache.put_many({"мөөнөтсүз": "бессрочный"}, "ru")
+    cache.put_many({"мөөнөтсүз": "бессрочный"}, "ru")  # already stored: no duplicate key error
+    assert TranslationCacheEntry.query.count() == 1
+
+    fresh = TranslationCache()
+    assert fresh.get_many(["мөөнөтсүз", "жок"], "ru") == {"мөөнөтсүз": "бессрочный"}
+    assert fresh.get_many(["мөөнөтсүз"], "en") == {}
+    assert fresh.hits == {"memory": 0, "database": 1, "miss": 2}
+    assert fresh.get_many(["мөөнөтсүз"], "ru") == {"мөөнөтсүз": "бессрочный"}
+    assert fresh.hits["memory"] == 1
+
+    bumped = TranslationCache(prompt_version="2")
+    assert bumped.get_many(["мөөнөтсүз"], "ru") == {}
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+from flask import current_app
+
+from database import db
+from models import User
+import worker_loop
+
+
+async def _loop_and_thread():
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop(), threading.current_thread().name
+
+
+def test_run_reuses_one_loop():
+    first_loop, thread_name = worker_loop.run(_loop_and_thread())
+    second_loop, _ = worker_loop.run(_loop_and_thread())
+    assert first_loop is second_loop is worker_loop.get_loop()
+    assert thread_name == "worker-loop"
+
+
+def test_run_pushes_app_context(app):
+    async def app_name():
+        return current_app.name
+
+    assert worker_loop.run(app_name(), app=app) == app.name
+
+
+def test_run_refuses_to_block_the_loop():
+    async def nested():
+        worker_loop.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        worker_loop.run(nested())
+
+
+def test_in_app_context_runs_blocking_work_off_the_loop(app):
+    db.session.add(User(name="Айзада", email="a@example.com", password_hash="x"))
+    db.session.commit()
+
+    def count_users():
+        return threading.current_thread().name, User.query.count()
+
+    async def both():
+        return await asyncio.gather(
+            worker_loop.in_app_context(app, count_users),
+            worker_loop.in_app_context(app, count_users),
+        )
+
+    for thread_name, count in worker_loop.run(both(), app=app):
+        assert thread_name.startswith("worker-loop_") and count == 1
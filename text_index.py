@@ -0,0 +1,124 @@
+import re
+import unicodedata
+from typing import Iterable, List, Set
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Light suffix stripping so "карталар", "картаны", "карты", "картой" all index
+# as "карт". Not a real morphological analyser: longest suffix first, at most
+# three rounds (plural + possessive + case in Kyrgyz), never leaving a stem
+# under 4 letters (with 3, "карта" lost its locative-looking "-та" to "кар").
+# The privative -сыз is not stripped: "акысыз" (free) is not "акы" (fee).
+KYRGYZ_SUFFIXES = [
+    "лардын", "лердин", "лордун", "лөрдүн", "дардын", "дердин", "тардын", "тердин",
+    "лар", "лер", "лор", "лөр", "дар", "дер", "дор", "дөр", "тар", "тер", "тор", "төр",
+    "дын", "дин", "дун", "дүн", "тын", "тин", "тун", "түн", "нын", "нин", "нун", "нүн",
+    "дан", "ден", "дон", "дөн", "тан", "тен", "тон", "төн", "нан", "нен", "нон", "нөн",
+    "дык", "дик", "дук", "дүк", "тык", "тик", "тук", "түк",
+    "лык", "лик", "лук", "лүк", "чы", "чи", "чу", "чү",
+    "га", "ге", "го", "гө", "ка", "ке", "ко", "кө", "на", "не",
+    "да", "де", "до", "дө", "та", "те", "то", "тө",
+    "ны", "ни", "ну", "нү", "ды", "ди", "ду", "дү", "ты", "ти", "ту", "тү",
+    "сы", "си", "су", "сү",
+]
+RUSSIAN_SUFFIXES = [
+    "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими", "ых", "их",
+    "ой", "ей", "ый", "ий", "ая", "яя", "ое", "ее", "ые", "ие", "ую", "юю",
+    "ов", "ев", "ах", "ях", "ам", "ям", "ом", "ем",
+    "а", "я", "ы", "и", "у", "ю", "е", "о", "ь",
+]
+SUFFIXES = sorted(set(KYRGYZ_SUFFIXES + RUSSIAN_SUFFIXES), key=len, reverse=True)
+MIN_STEM = 4
+
+
+def stem(token: str) -> str:
+    if token.isascii():
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+        return token
+    for _ in range(3):
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                token = token[:-len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+def words(text: str) -> List[str]:
+    return WORD_RE.findall(unicodedata.normalize("NFKC", str(text)).lower())
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(word) for word in words(text)]
+
+
+def iter_text(value) -> Iterable[str]:
+    """Every key and string value of a product, recursively"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from iter_text(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_text(item)
+    elif value is not None:
+        yield str(value)
+
+
+class TextIndex:
+    """
+    Token -> product positions, over all textual fields of a catalog section.
+
+    Every word is indexed both as written and stemmed. A query word matches
+    the indexed words that contain it, so a product matches whenever the old
+    substring scan over str(product) found the word ("card" in "Mastercard",
+    "банк" in "банкомат"), and the words with the same stem, so it also
+    matches when only the inflection differs ("карталар" / "картасы").
+    """
+
+    # Expansions of query words are cached; the cache is dropped when it grows past this
+    MAX_CACHED_WORDS = 4096
+
+    def __init__(self, products):
+        postings = {}
+        for pos, product in enumerate(products):
+            for text in iter_text(product):
+                for word in words(text):
+                    postings.setdefault(word, set()).add(pos)
+                    postings.setdefault(stem(word), set()).add(pos)
+        self.postings = {token: frozenset(p) for token, p in postings.items()}
+        self.vocabulary = sorted(self.postings)
+        self.all_positions = frozenset(range(len(products)))
+        self._expanded = {}
+
+    def _word_positions(self, word: str) -> Set[int]:
+        positions = self._expanded.get(word)
+        if positions is None:
+            found = set(self.postings.get(stem(word), ()))
+            for token in self.vocabulary:
+                if word in token:
+                    found |= self.postings[token]
+            if len(self._expanded) >= self.MAX_CACHED_WORDS:
+                self._expanded = {}
+            positions = self._expanded[word] = frozenset(found)
+        return positions
+
+    def match(self, phrase: str) -> Set[int]:
+        """Positions of products matching every word of `phrase`"""
+        result = None
+        for word in words(phrase):
+            positions = self._word_positions(word)
+            result = positions if result is None else result & positions
+            if not result:
+                return set()
+        return set(self.all_positions if result is None else result)
+
+    def match_all(self, phrases: Iterable[str]) -> Set[int]:
+        result = set(self.all_positions)
+        for phrase in phrases:
+            result &= self.match(phrase)
+            if not result:
+                break
+        return result
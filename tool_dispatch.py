@@ -0,0 +1,64 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import logging
+import threading
+
+import mcp_pool
+
+# "stdio" - call tools through the pooled banking_mcp_server.py processes
+# "local" - call the registered FastMCP tool functions in this process
+TOOL_DISPATCH_MODE = os.environ.get("TOOL_DISPATCH_MODE", "stdio").lower()
+
+_local_tools = None
+_thread_state = threading.local()
+
+
+async def get_local_tools():
+    """
+    Registered FastMCP tools of banking_mcp_server, keyed by name.
+    Imported lazily: the server module imports the Flask app, which imports us.
+    """
+    global _local_tools
+    if _local_tools is None:
+        from banking_mcp_server import server
+        _local_tools = await server.get_tools()
+    return _local_tools
+
+
+def _run_on_thread_loop(coro):
+    """Run `coro` to completion on the calling thread's own event loop, kept for the thread's next call"""
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+async def call_local_tool(tool_name, arguments):
+    """
+    Run a FastMCP tool in-process. Tool.run validates and coerces the
+    arguments exactly as the MCP server does, without JSON-RPC or a subprocess.
+
+    The tool functions are coroutines, but their database work is synchronous,
+    so they run in a thread of the loop's pool: concurrent calls overlap and the
+    worker loop keeps serving other chats meanwhile.
+    """
+    tools = await get_local_tools()
+    if tool_name not in tools:
+        raise KeyError(f"Unknown tool: {tool_name}")
+    return await asyncio.to_thread(_run_on_thread_loop, tools[tool_name].run(arguments))
+
+
+async def call_tool(tool_name, arguments, mode=None):
+    """
+    Dispatch a tool call in the configured mode.
+    Both modes return an object whose `content` is a list of MCP content blocks.
+    """
+    mode = (mode or TOOL_DISPATCH_MODE)
+    if mode == "local":
+        return await call_local_tool(tool_name, arguments)
+    if mode != "stdio":
+        logging.warning(f"Unknown TOOL_DISPATCH_MODE '{mode}', falling back to stdio")
+    return await mcp_pool.call_tool(tool_name, arguments)
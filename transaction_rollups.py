@@ -0,0 +1,216 @@
+"""
+Per-user daily transaction rollups.
+
+Every Transaction inserted through the ORM (transfer_money, the demo/seed
+scripts, ...) is added to its sender's and recipient's DailyTransactionRollup
+row in the same flush, so period totals read one row per day instead of
+scanning the transaction history. `rebuild_rollups` recomputes the table from
+scratch for data written outside the ORM or after transactions are edited.
+
+Rebuilds take a database-wide lock (pg_advisory_xact_lock on Postgres,
+BEGIN IMMEDIATE on SQLite), so two processes never delete and re-add the
+rows at the same time. ensure_rollups is a deploy step
+(supporting/migrate_db.py), not something to run on import.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import event, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import db
+from models import Account, DailyTransactionRollup, Transaction
+
+CENTS = Decimal("0.01")
+
+rollup_table = DailyTransactionRollup.__table__
+
+# pg_advisory_xact_lock key shared by every process that rebuilds the rollups
+REBUILD_LOCK_KEY = 73_010
+
+
+def to_decimal(value) -> Decimal:
+    """Decimal rounded to cents; SQLite hands numeric sums back as floats"""
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+def utc_day(timestamp) -> date:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+def _collect_increments(connection, transactions):
+    """{(user_id, day): [incoming_total, incoming_count, outgoing_total, outgoing_count]}"""
+    account_ids = {t.account_from_id for t in transactions} | {t.account_to_id for t in transactions}
+    account_ids.discard(None)
+    if not account_ids:
+        return {}
+    owners = dict(connection.execute(
+        select(Account.id, Account.user_id).where(Account.id.in_(account_ids))
+    ).all())
+    increments = defaultdict(lambda: [Decimal(0), 0, Decimal(0), 0])
+    for t in transactions:
+        day = utc_day(t.timestamp or datetime.utcnow())
+        amount = Decimal(str(t.amount))
+        if t.account_to_id in owners:
+            row = increments[(owners[t.account_to_id], day)]
+            row[0] += amount
+            row[1] += 1
+        if t.account_from_id in owners:
+            row = increments[(owners[t.account_from_id], day)]
+            row[2] += amount
+            row[3] += 1
+    return increments
+
+
+def _upsert(connection, increments):
+    dialect = connection.dialect.name
+    rows = [
+        {"user_id": user_id, "day": day,
+         "incoming_total": inc[0], "incoming_count": inc[1],
+         "outgoing_total": inc[2], "outgoing_count": inc[3]}
+        for (user_id, day), inc in increments.items()
+    ]
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = dialect_insert(rollup_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollup_table.c.user_id, rollup_table.c.day],
+            set_={
+                name: rollup_table.c[name] + stmt.excluded[name]
+                for name in ("incoming_total", "incoming_count", "outgoing_total", "outgoing_count")
+            },
+        )
+        for row in rows:
+            connection.execute(stmt, row)
+        return
+    for row in rows:
+        result = connection.execute(
+            update(rollup_table)
+            .where(rollup_table.c.user_id == row["user_id"], rollup_table.c.day == row["day"])
+            .values(
+                incoming_total=rollup_table.c.incoming_total + row["incoming_total"],
+                incoming_count=rollup_table.c.incoming_count + row["incoming_count"],
+                outgoing_total=rollup_table.c.outgoing_total + row["outgoing_total"],
+                outgoing_count=rollup_table.c.outgoing_count + row["outgoing_count"],
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(rollup_table), row)
+
+
+@event.listens_for(Session, "after_flush")
+def _rollup_new_transactions(session, flush_context):
+    transactions = [obj for obj in session.new if isinstance(obj, Transaction)]
+    if not transactions:
+        return
+    connection = session.connection()
+    increments = _collect_increments(connection, transactions)
+    if increments:
+        _upsert(connection, increments)
+
+
+def _lock_for_rebuild(connection):
+    """Hold the rebuild lock until the session's transaction ends"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REBUILD_LOCK_KEY})
+    elif connection.dialect.name == "sqlite" and not connection.connection.dbapi_connection.in_transaction:
+        # pysqlite opens no transaction for plain reads; if one is open this
+        # session already wrote and holds the write lock
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from the transaction table"""
+    connection = db.session.connection()
+    _lock_for_rebuild(connection)
+    connection.execute(rollup_table.delete())
+    transactions = Transaction.query.with_entities(
+        Transaction.account_from_id, Transaction.account_to_id, Transaction.amount, Transaction.timestamp
+    ).yield_per(1000)
+    batch = []
+    for t in transactions:
+        batch.append(t)
+        if len(batch) == 1000:
+            _upsert(connection, _collect_increments(connection, batch))
+            batch = []
+    if batch:
+        _upsert(connection, _collect_increments(connection, batch))
+    db.session.commit()
+
+
+def _needs_backfill():
+    return DailyTransactionRollup.query.first() is None and Transaction.query.first() is not None
+
+
+def ensure_rollups():
+    """
+    Backfill the rollup table once for databases created before it existed.
+    Returns True if this call built it.
+    """
+    if not _needs_backfill():
+        return False
+    _lock_for_rebuild(db.session.connection())
+    # Checked again under the lock: a process that waited finds the rows the first one built
+    if not _needs_backfill():
+        db.session.rollback()
+        return False
+    logging.info("Building daily transaction rollups")
+    rebuild_rollups()
+    return True
+
+
+def _parse_bound(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return datetime.fromisoformat(str(value).strip())
+
+
+def _raw_sum(column, acc_ids, start, end, end_inclusive=True):
+    upper = Transaction.timestamp <= end if end_inclusive else Transaction.timestamp < end
+    total, count = db.session.query(func.sum(Transaction.amount), func.count(Transaction.id)).filter(
+        column.in_(acc_ids), Transaction.timestamp >= start, upper
+    ).one()
+    return to_decimal(total), count
+
+
+def period_sum(user, acc_ids, direction, start_date, end_date):
+    """
+    (total, count) of `direction` ("incoming"/"outgoing") transactions with
+    start_date <= timestamp <= end_date. Whole days inside the range are read
+    from the rollup table; partial days at the edges are summed from the
+    transactions themselves.
+    """
+    column = Transaction.account_to_id if direction == "incoming" else Transaction.account_from_id
+    try:
+        start, end = _parse_bound(start_date), _parse_bound(end_date)
+    except ValueError:
+        return _raw_sum(column, acc_ids, start_date, end_date)
+
+    first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    last_day = end.date()  # exclusive: days [first_day, last_day) are whole days in range
+    if first_day >= last_day:
+        return _raw_sum(column, acc_ids, start, end)
+
+    total_col = getattr(DailyTransactionRollup, f"{direction}_total")
+    count_col = getattr(DailyTransactionRollup, f"{direction}_count")
+    total, count = db.session.query(func.sum(total_col), func.sum(count_col)).filter(
+        DailyTransactionRollup.user_id == user.id,
+        DailyTransactionRollup.day >= first_day,
+        DailyTransactionRollup.day < last_day,
+    ).one()
+    total, count = to_decimal(total), int(count or 0)
+
+    head_end = datetime.combine(first_day, time.min)
+    if start < head_end:
+        head_total, head_count = _raw_sum(column, acc_ids, start, head_end, end_inclusive=False)
+        total, count = total + head_total, count + head_count
+    tail_total, tail_count = _raw_sum(column, acc_ids, datetime.combine(last_day, time.min), end)
+    return total + tail_total, count + tail_count
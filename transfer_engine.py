@@ -0,0 +1,134 @@
+"""
+Atomic account-to-account transfers.
+
+Both accounts are locked in ascending id order (SELECT ... FOR UPDATE on
+Postgres), so two transfers touching the same pair of accounts can never
+deadlock. SQLite has no row locks: there the transaction starts with
+BEGIN IMMEDIATE, which takes the database write lock up front, so transfers
+from every process (gunicorn worker) run one at a time. The debit is a
+single conditional UPDATE ... WHERE balance >= :amount, so a concurrent
+transfer can never overdraw the account even if both saw enough money
+beforehand.
+
+An optional idempotency key records the completed transfer; calling again
+with the same key returns the first result without moving money again.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models import Account, Transaction, TransferRequest
+
+_serial_lock = threading.Lock()
+
+# response_templates keys of the rejection messages
+INSUFFICIENT_FUNDS = "insufficient_funds"
+ACCOUNTS_NOT_FOUND = "accounts_not_found"
+
+
+class TransferError(Exception):
+    """A transfer that was rejected; `key` names the response template shown to the user"""
+
+    def __init__(self, key):
+        super().__init__(key)
+        self.key = key
+
+
+class DuplicateTransfer(Exception):
+    """The idempotency key was used by a transfer that already completed"""
+
+
+@contextmanager
+def _account_locks():
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        yield
+        return
+    # Threads of this process queue here instead of polling SQLite's busy handler
+    with _serial_lock:
+        if dialect == "sqlite":
+            # Other processes wait for the write lock (up to the driver's busy
+            # timeout) instead of failing with "database is locked" when two
+            # deferred transactions both try to upgrade. pysqlite opens no
+            # transaction for plain reads, so one is open only if this session
+            # already wrote, and then it holds the write lock already.
+            connection = db.session.connection()
+            if not connection.connection.dbapi_connection.in_transaction:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+        yield
+
+
+def previous_result(user_id, idempotency_key):
+    """Message of a transfer already completed under `idempotency_key`, or None"""
+    if not idempotency_key:
+        return None
+    request = db.session.get(TransferRequest, idempotency_key)
+    if request is None or request.user_id != user_id:
+        return None
+    return request.message
+
+
+def transfer(from_account_id, to_account_id, amount, user_id, description=None,
+             message=None, idempotency_key=None) -> Transaction:
+    """
+    Move `amount` between two accounts in one database transaction and return
+    the recorded Transaction. Raises TransferError (after rolling back) if an
+    account is missing or the balance is insufficient. `message` is what a
+    retry with the same `idempotency_key` will be answered with.
+    """
+    amount = Decimal(str(amount))
+    with _account_locks():
+        try:
+            locked = db.session.execute(
+                select(Account.id)
+                .where(Account.id.in_([from_account_id, to_account_id]))
+                .order_by(Account.id)
+                .with_for_update()
+            ).scalars().all()
+            if len(set(locked)) != len({from_account_id, to_account_id}):
+                raise TransferError(ACCOUNTS_NOT_FOUND)
+
+            debited = db.session.execute(
+                update(Account)
+                .where(Account.id == from_account_id, Account.balance >= amount)
+                .values(balance=Account.balance - amount)
+                .execution_options(synchronize_session=False)
+            )
+            if debited.rowcount != 1:
+                raise TransferError(INSUFFICIENT_FUNDS)
+            db.session.execute(
+                update(Account)
+                .where(Account.id == to_account_id)
+                .values(balance=Account.balance + amount)
+                .execution_options(synchronize_session=False)
+            )
+
+            tx = Transaction(account_from_id=from_account_id, account_to_id=to_account_id,
+                             type="Которуу", amount=amount, description=description)
+            db.session.add(tx)
+            if idempotency_key:
+                db.session.flush()
+                db.session.add(TransferRequest(idempotency_key=idempotency_key, user_id=user_id,
+                                               transaction_id=tx.id, message=message or ""))
+            db.session.commit()
+        except TransferError:
+            db.session.rollback()
+            raise
+        except IntegrityError:
+            # Another call with the same idempotency key committed first
+            db.session.rollback()
+            if previous_result(user_id, idempotency_key) is None:
+                raise
+            logging.info(f"Duplicate transfer request ignored: {idempotency_key}")
+            raise DuplicateTransfer(idempotency_key)
+        except Exception:
+            db.session.rollback()
+            raise
+    # commit() expired the session, so balances changed by the UPDATEs reload on access
+    return tx
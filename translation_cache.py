@@ -0,0 +1,124 @@
+"""
+Content-addressed cache of Kyrgyz -> ru/en translations of product text.
+
+Entries are keyed by sha256(prompt version, target language, source text),
+so the same description asked about by different users is translated once,
+and changing the translation prompt (bump PROMPT_VERSION) or the catalog
+text simply misses the old entries. Lookups go through an in-process LRU
+first and then the translation_cache table; `supporting/warm_translations.py`
+fills both ahead of time for the whole generalInfo catalog.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import has_app_context
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import db
+from models import TranslationCacheEntry
+
+# Bump whenever the translation prompt in gemini_service changes meaning
+PROMPT_VERSION = "1"
+MAX_MEMORY_ENTRIES = int(os.environ.get("TRANSLATION_CACHE_SIZE", "5000"))
+
+cache_table = TranslationCacheEntry.__table__
+
+
+def cache_key(text: str, language: str, prompt_version: str = PROMPT_VERSION) -> str:
+    return hashlib.sha256(f"{prompt_version}\0{language}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """fragment -> translation for one target language at a time; LRU in memory, then the database"""
+
+    def __init__(self, max_entries=MAX_MEMORY_ENTRIES, prompt_version=PROMPT_VERSION):
+        self.max_entries = max_entries
+        self.prompt_version = prompt_version
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "database": 0, "miss": 0}
+
+    def _remember(self, key, translation):
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, fragments, language):
+        """{fragment: translation} for the fragments that are cached"""
+        keys = {cache_key(f, language, self.prompt_version): f for f in fragments}
+        found = {}
+        with self._lock:
+            for key, fragment in keys.items():
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[fragment] = self._memory[key]
+            self.hits["memory"] += len(found)
+        missing = [key for key, fragment in keys.items() if fragment not in found]
+        if missing and has_app_context():
+            try:
+                with db.engine.connect() as connection:
+                    rows = connection.execute(
+                        select(cache_table.c.key, cache_table.c.translation)
+                        .where(cache_table.c.key.in_(missing))
+                    ).all()
+            except Exception as e:
+                logging.warning(f"Translation cache lookup failed: {e}")
+                rows = []
+            with self._lock:
+                for key, translation in rows:
+                    self._remember(key, translation)
+                    found[keys[key]] = translation
+                self.hits["database"] += len(rows)
+        with self._lock:
+            self.hits["miss"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, translations, language):
+        """Store {fragment: translation} in memory and, inside an app context, in the database"""
+        rows = [
+            {"key": cache_key(f, language, self.prompt_version), "target_language": language,
+             "prompt_version": self.prompt_version, "source_text": f, "translation": t,
+             "created_at": datetime.utcnow()}
+            for f, t in translations.items()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._remember(row["key"], row["translation"])
+        if not has_app_context():
+            return
+        try:
+            with db.engine.begin() as connection:
+                _insert_missing(connection, rows)
+        except Exception as e:
+            logging.warning(f"Translation cache write failed: {e}")
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+
+def _insert_missing(connection, rows):
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        connection.execute(dialect_insert(cache_table).on_conflict_do_nothing(
+            index_elements=[cache_table.c.key]), rows)
+        return
+    existing = set(connection.execute(
+        select(cache_table.c.key).where(cache_table.c.key.in_([r["key"] for r in rows]))
+    ).scalars())
+    rows = [r for r in rows if r["key"] not in existing]
+    if rows:
+        connection.execute(insert(cache_table), rows)
+
+
+translation_cache = TranslationCache()
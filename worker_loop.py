@@ -0,0 +1,73 @@
+"""
+One persistent asyncio event loop per process (i.e. per gunicorn worker).
+
+Synchronous Flask views hand the async chat pipeline to this loop with
+`run()` instead of creating and tearing down a loop with asyncio.run() for
+every MCP call and translation. The MCP session pool lives on the same loop,
+so its sessions are reused by every request of the worker. Blocking work
+that has its own session (categorization batches) goes to the loop's thread
+pool through `in_app_context`.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WORKER_LOOP_THREADS = int(os.environ.get("WORKER_LOOP_THREADS", "32"))
+
+_loop = None
+_owner_pid = None
+_init_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    The event loop of the current process, started on first use.
+    Gunicorn forks workers after import, so the loop is keyed by pid.
+    """
+    global _loop, _owner_pid
+    if _loop is not None and _owner_pid == os.getpid():
+        return _loop
+    with _init_lock:
+        if _loop is None or _owner_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(WORKER_LOOP_THREADS, thread_name_prefix="worker-loop"))
+            thread = threading.Thread(target=loop.run_forever, name="worker-loop", daemon=True)
+            thread.start()
+            _loop, _owner_pid = loop, os.getpid()
+    return _loop
+
+
+def on_worker_loop():
+    try:
+        return asyncio.get_running_loop() is _loop and _owner_pid == os.getpid()
+    except RuntimeError:
+        return False
+
+
+async def _with_app_context(app, coro):
+    with app.app_context():
+        return await coro
+
+
+def run(coro, app=None, timeout=None):
+    """
+    Run `coro` on the worker loop and wait for its result from synchronous code.
+    With `app`, the coroutine runs inside its own app context (and so its own
+    db.session), like a request of its own.
+    """
+    if on_worker_loop():
+        coro.close()
+        raise RuntimeError("worker_loop.run() called on the worker loop; await the coroutine instead")
+    if app is not None:
+        coro = _with_app_context(app, coro)
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
+
+
+async def in_app_context(app, func, *args, **kwargs):
+    """Run blocking `func` in the loop's thread pool under a fresh app context"""
+    def call():
+        with app.app_context():
+            return func(*args, **kwargs)
+    return await asyncio.to_thread(call)